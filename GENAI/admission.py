@@ -0,0 +1,244 @@
+"""
+Admission control: size limits, per-client rate limiting and a per-process
+concurrency limit, checked before a request does any work.
+
+- Bodies over MAX_BODY_BYTES are refused (413) as they are read, and so are
+  requests whose texts hold more than MAX_REQUEST_WORDS words. Words are
+  estimated from whitespace, before anything is tokenized.
+- Each client has a token bucket of RATE_LIMIT_BURST cost units, refilled
+  at RATE_LIMIT units per second. A request costs one unit plus one per
+  COST_WORDS_PER_UNIT words; when the bucket cannot pay, the client gets
+  429 with the seconds until it can in Retry-After. Buckets are kept in
+  process memory or, to be shared by every worker process, in SQLite.
+- At most MAX_CONCURRENT requests per process do text work at once. A
+  request waits up to ADMISSION_WAIT seconds for a slot and is otherwise
+  shed with 503, so a burst queues briefly instead of slowing every request.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+
+# Largest request body accepted by the JSON endpoints, in bytes
+MAX_BODY_BYTES = int(os.environ.get('SUMMAI_MAX_BODY_BYTES', 16 * 1024 * 1024))
+# Largest body accepted by /api/summarize/stream, which never holds it whole
+MAX_STREAM_BYTES = int(os.environ.get('SUMMAI_MAX_STREAM_BYTES', 512 * 1024 * 1024))
+# Most words (estimated) one request may submit across all its texts; 0 for no limit
+MAX_REQUEST_WORDS = int(os.environ.get('SUMMAI_MAX_REQUEST_WORDS', 500000))
+# Cost units a client regains per second, and the most it can save up; 0 disables rate limiting
+RATE_LIMIT = float(os.environ.get('SUMMAI_RATE_LIMIT', 20))
+RATE_LIMIT_BURST = float(os.environ.get('SUMMAI_RATE_LIMIT_BURST', 200))
+# Words that cost one unit on top of the unit every request costs
+COST_WORDS_PER_UNIT = int(os.environ.get('SUMMAI_COST_WORDS_PER_UNIT', 1000))
+# Where buckets are kept: 'memory' (per process) or 'sqlite' (shared by every worker process)
+RATE_LIMIT_BACKEND = os.environ.get('SUMMAI_RATE_LIMIT_BACKEND', 'memory')
+RATE_LIMIT_DB = os.environ.get('SUMMAI_RATE_LIMIT_DB', 'ratelimit.db')
+# Requests per process doing text work at once, and seconds one waits for a slot; 0 for no limit
+MAX_CONCURRENT = int(os.environ.get('SUMMAI_MAX_CONCURRENT', 4))
+ADMISSION_WAIT = float(os.environ.get('SUMMAI_ADMISSION_WAIT', 1.0))
+# Bytes per word assumed for bodies whose words cannot be counted up front (streams, files)
+BYTES_PER_WORD = 6
+# Seconds between sweeps of buckets that have refilled completely
+BUCKET_SWEEP_INTERVAL = 60
+
+
+def estimate_words(text):
+    """Words in a text, estimated from its spaces and line breaks without splitting it"""
+    if not text or text.isspace():
+        return 0
+    return text.count(' ') + text.count('\n') + text.count('\t') + 1
+
+
+def payload_words(value):
+    """Estimated words in every string of a parsed JSON payload"""
+    if isinstance(value, str):
+        return estimate_words(value)
+    if isinstance(value, dict):
+        return sum(payload_words(item) for item in value.values())
+    if isinstance(value, list):
+        return sum(payload_words(item) for item in value)
+    return 0
+
+
+def request_cost(words, words_per_unit=COST_WORDS_PER_UNIT):
+    """Cost units of a request submitting `words` words"""
+    return 1 + words / words_per_unit
+
+
+def retry_after(seconds):
+    """Retry-After header value: whole seconds, at least one"""
+    return str(max(1, math.ceil(seconds)))
+
+
+def _refill(tokens, updated, now, rate, burst):
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryBucketStore:
+    """Token buckets in process memory; each worker process limits clients on its own"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets = {}  # client -> [tokens, updated]
+        self._last_sweep = 0.0
+
+    def take(self, client, cost, now, rate, burst):
+        with self.lock:
+            bucket = self.buckets.get(client)
+            tokens = burst if bucket is None else _refill(bucket[0], bucket[1], now, rate, burst)
+            wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+            self.buckets[client] = [tokens - cost if not wait else tokens, now]
+            if now - self._last_sweep > BUCKET_SWEEP_INTERVAL:
+                self._sweep(now - burst / rate)
+                self._last_sweep = now
+        return wait
+
+    def _sweep(self, before):
+        # A bucket untouched since `before` is full again, the same as no bucket at all
+        for client in [c for c, (_, updated) in self.buckets.items() if updated < before]:
+            del self.buckets[client]
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class SQLiteBucketStore:
+    """
+    Token buckets in a SQLite database in WAL mode, so a client's limit
+    holds across every worker process.
+    """
+
+    def __init__(self, filename=RATE_LIMIT_DB):
+        self.filename = filename
+        self._last_sweep = 0.0
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets ('
+                         'client TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS buckets_updated ON buckets (updated)')
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # A short-lived connection per operation is fork- and thread-safe
+        conn = sqlite3.connect(self.filename, timeout=30, isolation_level='IMMEDIATE')
+        # Buckets are worth losing in a power cut rather than an fsync per request
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def take(self, client, cost, now, rate, burst):
+        conn = self._connect()
+        try:
+            with conn:
+                # Take the write lock before reading, so concurrent requests cannot both spend
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute('SELECT tokens, updated FROM buckets WHERE client = ?',
+                                   (client,)).fetchone()
+                tokens = burst if row is None else _refill(row[0], row[1], now, rate, burst)
+                wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+                conn.execute('INSERT INTO buckets (client, tokens, updated) VALUES (?, ?, ?) '
+                             'ON CONFLICT (client) DO UPDATE SET tokens = excluded.tokens, '
+                             'updated = excluded.updated',
+                             (client, tokens - cost if not wait else tokens, now))
+                if now - self._last_sweep > BUCKET_SWEEP_INTERVAL:
+                    self._last_sweep = now
+                    conn.execute('DELETE FROM buckets WHERE updated < ?', (now - burst / rate,))
+        finally:
+            conn.close()
+        return wait
+
+    def clear(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM buckets')
+        finally:
+            conn.close()
+
+
+def create_bucket_store(name=RATE_LIMIT_BACKEND):
+    if name == 'memory':
+        return MemoryBucketStore()
+    if name == 'sqlite':
+        return SQLiteBucketStore()
+    raise ValueError(f'Unknown rate limit backend: {name}')
+
+
+class RateLimiter:
+    """Per-client token buckets; disabled when rate is 0"""
+
+    def __init__(self, store=None, rate=RATE_LIMIT, burst=RATE_LIMIT_BURST):
+        self.rate = rate
+        self.burst = burst
+        if store is None and rate > 0:
+            store = create_bucket_store()
+        self.store = store
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def take(self, client, cost):
+        """
+        Charge a client `cost` units; 0 when admitted, otherwise the seconds
+        until its bucket could pay. A request costing more than the whole
+        bucket is charged the whole bucket, so it is delayed but never
+        refused forever.
+        """
+        if not self.enabled:
+            return 0.0
+        # time.time() rather than monotonic, since the SQLite store is shared between processes
+        return self.store.take(client, min(cost, self.burst), time.time(), self.rate, self.burst)
+
+
+class ConcurrencyLimiter:
+    """At most `limit` requests in progress per process; disabled when limit is 0"""
+
+    def __init__(self, limit=MAX_CONCURRENT, wait=ADMISSION_WAIT):
+        self.limit = limit
+        self.wait = wait
+        self._reset()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        # Requests in progress in the parent at fork never finish in the child
+        self.lock = threading.Lock()
+        self.slots = threading.BoundedSemaphore(self.limit) if self.limit > 0 else None
+        self.in_flight = 0
+
+    def acquire(self):
+        """Wait for a slot; False when none freed up in time"""
+        if self.slots is not None and not self.slots.acquire(timeout=self.wait):
+            return False
+        with self.lock:
+            self.in_flight += 1
+        return True
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+        if self.slots is not None:
+            self.slots.release()
+
+
+class AdmissionStats:
+    """Requests refused per reason, for /api/metrics"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rejected = {}  # reason -> count
+
+    def record(self, reason):
+        with self.lock:
+            self.rejected[reason] = self.rejected.get(reason, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return dict(self.rejected)
+
+
+admission_stats = AdmissionStats()
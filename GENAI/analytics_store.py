@@ -0,0 +1,509 @@
+import atexit
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ANALYTICS_FILE = 'analytics_data.json'
+ANALYTICS_DB = 'analytics_data.db'
+
+# Which persistent store analytics are flushed into: 'sqlite' or 'json'
+ANALYTICS_BACKEND = os.environ.get('SUMMAI_ANALYTICS_BACKEND', 'sqlite')
+# Pending events that force a flush, and seconds between background flushes
+FLUSH_EVENTS = int(os.environ.get('SUMMAI_ANALYTICS_FLUSH_EVENTS', 50))
+FLUSH_INTERVAL = float(os.environ.get('SUMMAI_ANALYTICS_FLUSH_INTERVAL', 5))
+# Daily stats older than this are rolled up into monthly totals
+RETENTION_DAYS = int(os.environ.get('SUMMAI_ANALYTICS_RETENTION_DAYS', 90))
+# A client idle this many seconds starts a new session on its next request
+SESSION_TIMEOUT = float(os.environ.get('SUMMAI_SESSION_TIMEOUT', 1800))
+
+TOTAL_FIELDS = ('total_summaries', 'total_texts_processed', 'total_words_processed',
+                'total_words_generated', 'compression_ratio_sum', 'sessions')
+PERIOD_FIELDS = ('summaries', 'words_processed', 'words_generated')
+TRACKED_METHODS = ('normal', 'business_insights', 'textrank')
+
+
+def get_default_data():
+    """Get default analytics structure"""
+    return {
+        'total_summaries': 0,
+        'total_texts_processed': 0,
+        'total_words_processed': 0,
+        'total_words_generated': 0,
+        'average_compression_ratio': 0,
+        'methods_used': {method: 0 for method in TRACKED_METHODS},
+        'file_types_uploaded': {},
+        'daily_stats': {},
+        'monthly_stats': {},
+        'sessions': 0
+    }
+
+
+def empty_delta():
+    """Counter increments accumulated in memory between flushes"""
+    delta = {field: 0 for field in TOTAL_FIELDS}
+    delta.update({'events': 0, 'methods_used': {}, 'file_types_uploaded': {}, 'daily_stats': {}})
+    return delta
+
+
+def _merge_delta(data, delta):
+    """Apply a delta to data in the default analytics structure, in place"""
+    old_total = data['total_summaries']
+    for field in TOTAL_FIELDS:
+        if field != 'compression_ratio_sum':
+            data[field] = data.get(field, 0) + delta[field]
+    if data['total_summaries']:
+        data['average_compression_ratio'] = (
+            data['average_compression_ratio'] * old_total + delta['compression_ratio_sum']
+        ) / data['total_summaries']
+    for key in ('methods_used', 'file_types_uploaded'):
+        for name, count in delta[key].items():
+            data[key][name] = data[key].get(name, 0) + count
+    for day, stats in delta['daily_stats'].items():
+        day_stats = data['daily_stats'].setdefault(day, {field: 0 for field in PERIOD_FIELDS})
+        for field in PERIOD_FIELDS:
+            day_stats[field] += stats[field]
+    return data
+
+
+def _compact_periods(data, cutoff_day):
+    """Roll daily stats before cutoff_day into monthly_stats, in place"""
+    monthly = data.setdefault('monthly_stats', {})
+    for day in [d for d in data['daily_stats'] if d < cutoff_day]:
+        stats = data['daily_stats'].pop(day)
+        month_stats = monthly.setdefault(day[:7], {field: 0 for field in PERIOD_FIELDS})
+        for field in PERIOD_FIELDS:
+            month_stats[field] += stats[field]
+
+
+class JSONFileBackend:
+    """Whole-file JSON store, written atomically. Safe for a single process only."""
+
+    def __init__(self, filename=ANALYTICS_FILE):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.sessions = {}  # client -> last seen; not persisted
+
+    def load(self):
+        """Load analytics data from file"""
+        if os.path.exists(self.filename):
+            try:
+                with open(self.filename, 'r') as f:
+                    data = json.load(f)
+                # Migrate old method names to new ones
+                if 'methods_used' in data:
+                    old_methods = data['methods_used']
+                    if 'frequency' in old_methods or 'tfidf' in old_methods or 'hybrid' in old_methods:
+                        data['methods_used'] = {
+                            'normal': old_methods.get('frequency', 0),
+                            'business_insights': old_methods.get('hybrid', 0) + old_methods.get('tfidf', 0)
+                        }
+                return {**get_default_data(), **data}
+            except (OSError, ValueError):
+                return get_default_data()
+        return get_default_data()
+
+    def _write(self, data):
+        # Write to a temp file and rename so a crash never leaves a torn file
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, self.filename)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def apply(self, delta):
+        with self.lock:
+            self._write(_merge_delta(self.load(), delta))
+
+    def compact(self, cutoff_day):
+        with self.lock:
+            data = self.load()
+            _compact_periods(data, cutoff_day)
+            self._write(data)
+
+    def touch_session(self, client, now, timeout):
+        """Record a request from client; True when it starts a new session"""
+        with self.lock:
+            last_seen = self.sessions.get(client)
+            self.sessions[client] = now
+        return last_seen is None or last_seen < now - timeout
+
+    def expire_sessions(self, before):
+        with self.lock:
+            for client in [c for c, seen in self.sessions.items() if seen < before]:
+                del self.sessions[client]
+
+    def reset(self):
+        with self.lock:
+            self._write(get_default_data())
+            self.sessions.clear()
+
+
+class SQLiteBackend:
+    """
+    SQLite store in WAL mode. Every flush is one transaction of additive
+    upserts, so concurrent threads and worker processes never lose counts.
+    """
+
+    def __init__(self, filename=ANALYTICS_DB, legacy_file=ANALYTICS_FILE):
+        self.filename = filename
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS counters ('
+                         'scope TEXT NOT NULL, name TEXT NOT NULL, value REAL NOT NULL DEFAULT 0, '
+                         'PRIMARY KEY (scope, name))')
+            # period is YYYY-MM-DD for daily rows and YYYY-MM for compacted months
+            conn.execute('CREATE TABLE IF NOT EXISTS period_stats ('
+                         'period TEXT PRIMARY KEY, summaries INTEGER NOT NULL DEFAULT 0, '
+                         'words_processed INTEGER NOT NULL DEFAULT 0, '
+                         'words_generated INTEGER NOT NULL DEFAULT 0)')
+            # Last request per client, shared by every worker process
+            conn.execute('CREATE TABLE IF NOT EXISTS sessions ('
+                         'client TEXT PRIMARY KEY, last_seen REAL NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)')
+        finally:
+            conn.close()
+        if legacy_file and os.path.exists(legacy_file):
+            self._import_legacy(legacy_file)
+
+    def _connect(self):
+        # A short-lived connection per operation is fork- and thread-safe
+        return sqlite3.connect(self.filename, timeout=30, isolation_level='IMMEDIATE')
+
+    def _import_legacy(self, legacy_file):
+        """Seed an empty database from an existing analytics_data.json"""
+        conn = self._connect()
+        try:
+            with conn:
+                # The marker insert takes the write lock, so only one process imports
+                marker = conn.execute("INSERT OR IGNORE INTO counters (scope, name, value) "
+                                      "VALUES ('meta', 'legacy_imported', 1)")
+                if not marker.rowcount:
+                    return
+                data = JSONFileBackend(legacy_file).load()
+                delta = empty_delta()
+                for field in TOTAL_FIELDS:
+                    if field != 'compression_ratio_sum':
+                        delta[field] = data.get(field, 0)
+                delta['compression_ratio_sum'] = data['average_compression_ratio'] * data['total_summaries']
+                for key in ('methods_used', 'file_types_uploaded', 'daily_stats'):
+                    delta[key] = data.get(key, {})
+                self._apply(conn, delta)
+        finally:
+            conn.close()
+
+    def _apply(self, conn, delta):
+        counters = [('totals', field, delta[field]) for field in TOTAL_FIELDS]
+        for key in ('methods_used', 'file_types_uploaded'):
+            counters.extend((key, name, count) for name, count in delta[key].items())
+        conn.executemany('INSERT INTO counters (scope, name, value) VALUES (?, ?, ?) '
+                         'ON CONFLICT (scope, name) DO UPDATE SET value = value + excluded.value',
+                         counters)
+        self._add_periods(conn, delta['daily_stats'].items())
+
+    def _add_periods(self, conn, periods):
+        conn.executemany('INSERT INTO period_stats (period, summaries, words_processed, words_generated) '
+                         'VALUES (?, ?, ?, ?) ON CONFLICT (period) DO UPDATE SET '
+                         'summaries = summaries + excluded.summaries, '
+                         'words_processed = words_processed + excluded.words_processed, '
+                         'words_generated = words_generated + excluded.words_generated',
+                         [(period, *(stats[f] for f in PERIOD_FIELDS)) for period, stats in periods])
+
+    def apply(self, delta):
+        conn = self._connect()
+        try:
+            with conn:
+                self._apply(conn, delta)
+        finally:
+            conn.close()
+
+    def load(self):
+        data = get_default_data()
+        conn = self._connect()
+        try:
+            for scope, name, value in conn.execute('SELECT scope, name, value FROM counters'):
+                if scope == 'meta':
+                    continue
+                if scope == 'totals':
+                    data[name] = value if name == 'compression_ratio_sum' else int(value)
+                else:
+                    data[scope][name] = int(value)
+            for period, *values in conn.execute('SELECT period, summaries, words_processed, '
+                                                'words_generated FROM period_stats'):
+                bucket = 'daily_stats' if len(period) == 10 else 'monthly_stats'
+                data[bucket][period] = dict(zip(PERIOD_FIELDS, values))
+        finally:
+            conn.close()
+        ratio_sum = data.pop('compression_ratio_sum', 0)
+        if data['total_summaries']:
+            data['average_compression_ratio'] = ratio_sum / data['total_summaries']
+        return data
+
+    def compact(self, cutoff_day):
+        conn = self._connect()
+        try:
+            with conn:
+                rows = conn.execute('SELECT period, summaries, words_processed, words_generated '
+                                    'FROM period_stats WHERE length(period) = 10 AND period < ?',
+                                    (cutoff_day,)).fetchall()
+                conn.execute('DELETE FROM period_stats WHERE length(period) = 10 AND period < ?',
+                             (cutoff_day,))
+                self._add_periods(conn, ((period[:7], dict(zip(PERIOD_FIELDS, values)))
+                                         for period, *values in rows))
+        finally:
+            conn.close()
+
+    def touch_session(self, client, now, timeout):
+        """Record a request from client; True when it starts a new session"""
+        conn = self._connect()
+        try:
+            with conn:
+                # sqlite3 only begins a transaction at the first write; begin it before the
+                # check so the check and update are atomic across workers
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute('SELECT last_seen FROM sessions WHERE client = ?',
+                                   (client,)).fetchone()
+                conn.execute('INSERT INTO sessions (client, last_seen) VALUES (?, ?) '
+                             'ON CONFLICT (client) DO UPDATE SET last_seen = excluded.last_seen',
+                             (client, now))
+        finally:
+            conn.close()
+        return row is None or row[0] < now - timeout
+
+    def expire_sessions(self, before):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM sessions WHERE last_seen < ?', (before,))
+        finally:
+            conn.close()
+
+    def reset(self):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM counters WHERE scope != 'meta'")
+                conn.execute('DELETE FROM period_stats')
+                conn.execute('DELETE FROM sessions')
+        finally:
+            conn.close()
+
+
+def create_backend(name=ANALYTICS_BACKEND):
+    if name == 'json':
+        return JSONFileBackend()
+    if name == 'sqlite':
+        return SQLiteBackend()
+    raise ValueError(f'Unknown analytics backend: {name}')
+
+
+class AnalyticsTracker:
+    """
+    Accumulates analytics events in memory and flushes them to the backend
+    once FLUSH_EVENTS are pending, every FLUSH_INTERVAL seconds, and at exit.
+    """
+
+    def __init__(self, backend=None, flush_events=FLUSH_EVENTS, flush_interval=FLUSH_INTERVAL,
+                 retention_days=RETENTION_DAYS, session_timeout=SESSION_TIMEOUT):
+        self.backend = backend if backend is not None else create_backend()
+        self.flush_events = flush_events
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.session_timeout = session_timeout
+        # How long a process trusts its own record of a client before asking the backend
+        self.session_refresh = min(60.0, session_timeout / 2)
+        self.lock = threading.Lock()
+        self.pending = empty_delta()
+        self._seen = {}  # client -> last time this process touched its session
+        self._last_compaction = None
+        self._last_session_expiry = 0
+        self._stop = threading.Event()
+        self._flusher = None
+        self._pid = None
+        self.start()
+        atexit.register(self.close)
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork_in_child)
+
+    def start(self):
+        """Start this process's flush thread; cheap to call repeatedly"""
+        if self._pid == os.getpid():
+            return
+        with self.lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                if self.flush_interval > 0:
+                    self._flusher = threading.Thread(target=self._flush_periodically,
+                                                     name='summai-analytics-flush', daemon=True)
+                    self._flusher.start()
+
+    def _after_fork_in_child(self):
+        # The parent flushes its own pending events; a forked worker starts empty,
+        # with fresh locks, and restarts its flush thread on its first event
+        self.lock = threading.Lock()
+        self.pending = empty_delta()
+        self._seen = {}
+        self._stop = threading.Event()
+        self._flusher = None
+
+    def get_default_data(self):
+        """Get default analytics structure"""
+        return get_default_data()
+
+    def track_summary(self, method, original_length, summary_length, file_type=None):
+        """Track a summarization event"""
+        self.track_summaries([(method, original_length, summary_length, file_type)])
+
+    def track_summaries(self, events):
+        """Track many (method, original_length, summary_length, file_type) events at once"""
+        self.start()
+        today = datetime.now().strftime('%Y-%m-%d')
+        with self.lock:
+            for method, original_length, summary_length, file_type in events:
+                self._record_summary(today, method, original_length, summary_length, file_type)
+            flush_now = self.pending['events'] >= self.flush_events
+        if flush_now:
+            self.flush()
+
+    def _record_summary(self, today, method, original_length, summary_length, file_type=None):
+        pending = self.pending
+        compression_ratio = (summary_length / original_length * 100) if original_length > 0 else 0
+
+        pending['events'] += 1
+        pending['total_summaries'] += 1
+        pending['total_texts_processed'] += 1
+        pending['total_words_processed'] += original_length
+        pending['total_words_generated'] += summary_length
+        pending['compression_ratio_sum'] += compression_ratio
+
+        # Track method usage
+        if method in TRACKED_METHODS:
+            pending['methods_used'][method] = pending['methods_used'].get(method, 0) + 1
+
+        # Track file types
+        if file_type:
+            pending['file_types_uploaded'][file_type] = pending['file_types_uploaded'].get(file_type, 0) + 1
+
+        # Track daily stats
+        day_stats = pending['daily_stats'].setdefault(today, {field: 0 for field in PERIOD_FIELDS})
+        day_stats['summaries'] += 1
+        day_stats['words_processed'] += original_length
+        day_stats['words_generated'] += summary_length
+
+    def increment_sessions(self):
+        """Track new session"""
+        with self.lock:
+            self.pending['events'] += 1
+            self.pending['sessions'] += 1
+
+    def track_session(self, client):
+        """
+        Record a request from client (an opaque identifier) and count a new
+        session when it has been idle for session_timeout. Clients are tracked
+        in the backend, so a session spans every worker process it reaches.
+        """
+        self.start()
+        now = time.time()
+        with self.lock:
+            seen = self._seen.get(client)
+            if seen is not None and now - seen < self.session_refresh:
+                return False
+            self._seen[client] = now
+        if not self.backend.touch_session(client, now, self.session_timeout):
+            return False
+        self.increment_sessions()
+        return True
+
+    def flush(self):
+        """Write pending events to the backend"""
+        with self.lock:
+            delta, self.pending = self.pending, empty_delta()
+        if delta['events']:
+            try:
+                self.backend.apply(delta)
+            except Exception:
+                # Keep the counts for the next attempt rather than dropping them
+                with self.lock:
+                    self.pending = _merge_pending(delta, self.pending)
+                raise
+        self._maybe_compact()
+        self._maybe_expire_sessions()
+
+    def _maybe_compact(self):
+        today = datetime.now().date()
+        if self.retention_days > 0 and self._last_compaction != today:
+            self._last_compaction = today
+            cutoff = today - timedelta(days=self.retention_days)
+            self.backend.compact(cutoff.strftime('%Y-%m-%d'))
+
+    def _maybe_expire_sessions(self):
+        now = time.time()
+        if now - self._last_session_expiry >= self.session_refresh:
+            self._last_session_expiry = now
+            cutoff = now - self.session_timeout
+            self.backend.expire_sessions(cutoff)
+            with self.lock:
+                self._seen = {client: seen for client, seen in self._seen.items() if seen >= cutoff}
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                pass  # Retried on the next tick
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+    def reset(self):
+        """Discard all analytics, including events not yet flushed"""
+        with self.lock:
+            self.pending = empty_delta()
+            self._seen = {}
+            self.backend.reset()
+
+    @property
+    def data(self):
+        """Persisted analytics merged with events not yet flushed"""
+        with self.lock:
+            pending = _merge_pending(self.pending, empty_delta())
+        return _merge_delta(self.backend.load(), pending)
+
+    def get_stats(self):
+        """Get current analytics statistics"""
+        data = self.data
+        return {
+            'total_summaries': data['total_summaries'],
+            'total_texts_processed': data['total_texts_processed'],
+            'total_words_processed': data['total_words_processed'],
+            'total_words_generated': data['total_words_generated'],
+            'average_compression_ratio': round(data['average_compression_ratio'], 1),
+            'methods_used': data['methods_used'],
+            'file_types_uploaded': data['file_types_uploaded'],
+            'sessions': data['sessions']
+        }
+
+
+def _merge_pending(a, b):
+    """Sum two pending deltas into a new one"""
+    merged = empty_delta()
+    for delta in (a, b):
+        for field in TOTAL_FIELDS + ('events',):
+            merged[field] += delta[field]
+        for key in ('methods_used', 'file_types_uploaded'):
+            for name, count in delta[key].items():
+                merged[key][name] = merged[key].get(name, 0) + count
+        for day, stats in delta['daily_stats'].items():
+            day_stats = merged['daily_stats'].setdefault(day, {field: 0 for field in PERIOD_FIELDS})
+            for field in PERIOD_FIELDS:
+                day_stats[field] += stats[field]
+    return merged
@@ -1,460 +1,73 @@
-from flask import Flask, render_template, request, jsonify
-from flask_cors import CORS
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import sent_tokenize, word_tokenize
-
-import string
+import hashlib
+import hmac
 import os
-import re
-from collections import Counter
-from math import log
-
-
-from datetime import datetime
-import json
+import time
 
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt', quiet=True)
+from flask import Blueprint, Flask, Response, current_app, g, render_template, request, jsonify
+from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords', quiet=True)
+import resources
+from summarizer import SUMMARY_METHODS, business_weights
+from batch import summarize_batch, MAX_BATCH_SIZE
+from cache import summary_cache
+from streaming import StreamingSummarizer, iter_text_chunks
+from tokenization import resolve_tokenizer
+from instrumentation import METRICS_ENABLED, RequestTimings, metrics, profiler, stage
+from analytics_store import AnalyticsTracker
+from jobs import JobQueue, QueueFullError, MAX_JOB_TEXTS, JOB_POLL_INTERVAL
+from ingestion import DocumentReader, UnsupportedDocumentError, MAX_UPLOAD_BYTES, ingestion_stats
+from corpus_index import (
+    CorpusIndex, DocumentNotFoundError, MAX_CORPUS_BATCH, MAX_CORPUS_SUMMARY_DOCUMENTS,
+    CORPUS_SUMMARY_SENTENCES
+)
+from admission import (
+    ConcurrencyLimiter, RateLimiter, admission_stats, payload_words, request_cost, retry_after,
+    BYTES_PER_WORD, MAX_BODY_BYTES, MAX_REQUEST_WORDS, MAX_STREAM_BYTES
+)
 
-app = Flask(__name__)
-CORS(app)
+# Reverse proxies in front of the app whose X-Forwarded-* headers are trusted
+PROXY_COUNT = int(os.environ.get('SUMMAI_PROXY_COUNT', 0))
+# Development server for `python app.py`; production runs under gunicorn (gunicorn.conf.py)
+DEBUG = os.environ.get('SUMMAI_DEBUG', '1') == '1'
+HOST = os.environ.get('SUMMAI_HOST', '127.0.0.1')
+PORT = int(os.environ.get('SUMMAI_PORT', 5000))
+# Longest document_id accepted for incremental summaries and corpus documents
+MAX_DOCUMENT_ID_LENGTH = 128
+# Room for multipart boundaries and form fields on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+# Monitoring endpoints that do not count as client sessions
+UNTRACKED_ENDPOINTS = ('static', 'health', 'ready', 'prometheus_metrics')
+# Endpoints that summarize or analyze text within the request, and so take a concurrency slot
+WORK_ENDPOINTS = ('summarize', 'summarize_stream', 'summarize_upload', 'explain_summary', 'analyze',
+                  'batch_summarize', 'add_corpus_documents', 'search_corpus', 'summarize_corpus')
+# Bodies whose words cannot be counted before the view reads them
+UNPARSED_ENDPOINTS = ('summarize_stream', 'summarize_upload')
+# Bearer token for administrative endpoints; unset, they refuse every request
+ADMIN_TOKEN = os.environ.get('SUMMAI_ADMIN_TOKEN', '')
 
-ANALYTICS_FILE = 'analytics_data.json'
+api = Blueprint('summai', __name__)
 
-class AnalyticsTracker:
-    def __init__(self, filename=ANALYTICS_FILE):
-        self.filename = filename
-        self.data = self.load_data()
-    
-    def load_data(self):
-        """Load analytics data from file"""
-        if os.path.exists(self.filename):
-            try:
-                with open(self.filename, 'r') as f:
-                    data = json.load(f)
-                    # Migrate old method names to new ones
-                    if 'methods_used' in data:
-                        old_methods = data['methods_used']
-                        # Convert old method names to new ones
-                        if 'frequency' in old_methods or 'tfidf' in old_methods or 'hybrid' in old_methods:
-                            # Migrate old data
-                            new_methods = {
-                                'normal': old_methods.get('frequency', 0),
-                                'business_insights': old_methods.get('hybrid', 0) + old_methods.get('tfidf', 0)
-                            }
-                            data['methods_used'] = new_methods
-                            # Save migrated data
-                            with open(self.filename, 'w') as f:
-                                json.dump(data, f, indent=2)
-                    return data
-            except:
-                return self.get_default_data()
-        return self.get_default_data()
-    
-    def get_default_data(self):
-        """Get default analytics structure"""
-        return {
-            'total_summaries': 0,
-            'total_texts_processed': 0,
-            'total_words_processed': 0,
-            'total_words_generated': 0,
-            'average_compression_ratio': 0,
-            'methods_used': {
-                'normal': 0,
-                'business_insights': 0
-            },
-            'file_types_uploaded': {},
-            'daily_stats': {},
-            'sessions': 0
-        }
-    
-    def save_data(self):
-        """Save analytics data to file"""
-        with open(self.filename, 'w') as f:
-            json.dump(self.data, f, indent=2)
-    
-    def track_summary(self, method, original_length, summary_length, file_type=None):
-        """Track a summarization event"""
-        compression_ratio = (summary_length / original_length * 100) if original_length > 0 else 0
-        
-        self.data['total_summaries'] += 1
-        self.data['total_texts_processed'] += 1
-        self.data['total_words_processed'] += original_length
-        self.data['total_words_generated'] += summary_length
-        
-        # Update average compression ratio
-        total_summaries = self.data['total_summaries']
-        avg = self.data['average_compression_ratio']
-        self.data['average_compression_ratio'] = (avg * (total_summaries - 1) + compression_ratio) / total_summaries
-        
-        # Track method usage
-        if method in self.data['methods_used']:
-            self.data['methods_used'][method] += 1
-        
-        # Track file types
-        if file_type:
-            if file_type not in self.data['file_types_uploaded']:
-                self.data['file_types_uploaded'][file_type] = 0
-            self.data['file_types_uploaded'][file_type] += 1
-        
-        # Track daily stats
-        today = datetime.now().strftime('%Y-%m-%d')
-        if today not in self.data['daily_stats']:
-            self.data['daily_stats'][today] = {
-                'summaries': 0,
-                'words_processed': 0,
-                'words_generated': 0
-            }
-        
-        self.data['daily_stats'][today]['summaries'] += 1
-        self.data['daily_stats'][today]['words_processed'] += original_length
-        self.data['daily_stats'][today]['words_generated'] += summary_length
-        
-        self.save_data()
-    
-    def increment_sessions(self):
-        """Track new session"""
-        self.data['sessions'] += 1
-        self.save_data()
-    
-    def get_stats(self):
-        """Get current analytics statistics"""
-        return {
-            'total_summaries': self.data['total_summaries'],
-            'total_texts_processed': self.data['total_texts_processed'],
-            'total_words_processed': self.data['total_words_processed'],
-            'total_words_generated': self.data['total_words_generated'],
-            'average_compression_ratio': round(self.data['average_compression_ratio'], 1),
-            'methods_used': self.data['methods_used'],
-            'file_types_uploaded': self.data['file_types_uploaded'],
-            'sessions': self.data['sessions']
-        }
-
-# Initialize analytics tracker
+# Initialize analytics tracker; counters and sessions are shared through its backend
 analytics = AnalyticsTracker()
 
-def generate_summary(text, summary_ratio=0.4, method='normal'):
-    """
-    Generate summary using multiple methods
-    
-    Methods:
-    - normal: Standard word frequency-based summarization
-    - business_insights: Enhanced summarization with business-focused insights
-    """
-    
-    if not text or len(text.strip()) == 0:
-        return {
-            'success': False,
-            'message': 'Please enter some text to summarize',
-            'summary': '',
-            'original_length': 0,
-            'summary_length': 0
-        }
-    
-    # Clean text
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    if len(text.split()) < 3:
-        return {
-            'success': False,
-            'message': 'Text must contain at least 3 words',
-            'summary': '',
-            'original_length': len(text.split()),
-            'summary_length': 0
-        }
-    
-    try:
-        sentences = sent_tokenize(text)
-        
-        if len(sentences) == 0:
-            return {
-                'success': False,
-                'message': 'No sentences found in text',
-                'summary': '',
-                'original_length': 0,
-                'summary_length': 0
-            }
-        
-        stop_words = set(stopwords.words('english'))
-        
-        if method == 'business_insights':
-            sentence_scores = calculate_business_insights_scores(sentences, stop_words)
-        else:  # normal
-            sentence_scores = calculate_frequency_scores(sentences, stop_words)
-        
-        # Select sentences based on ratio
-        summary_count = max(1, int(len(sentences) * (summary_ratio / 100)))
-        
-        if sentence_scores:
-            sorted_indices = sorted(sentence_scores.keys(), 
-                                   key=lambda x: sentence_scores[x], 
-                                   reverse=True)[:summary_count]
-            sorted_indices.sort()  # Maintain original order
-            summary_sentences = [sentences[i] for i in sorted_indices]
-        else:
-            summary_sentences = sentences[:summary_count]
-        
-        summary = ' '.join(summary_sentences)
-        
-        return {
-            'success': True,
-            'summary': summary,
-            'original_length': len(text.split()),
-            'summary_length': len(summary.split()),
-            'sentence_count_original': len(sentences),
-            'sentence_count_summary': len(summary_sentences),
-            'compression_ratio': round((len(summary.split()) / len(text.split())) * 100, 1) if text.split() else 0,
-            'method': method
-        }
-    
-    except Exception as e:
-        return {
-            'success': False,
-            'message': f'Error processing text: {str(e)}',
-            'summary': '',
-            'original_length': 0,
-            'summary_length': 0
-        }
-
-def calculate_frequency_scores(sentences, stop_words):
-    """Original frequency-based scoring"""
-    words = word_tokenize(' '.join(sentences).lower())
-    
-    word_freq = {}
-    for word in words:
-        if word not in stop_words and word not in string.punctuation and len(word) > 2:
-            word_freq[word] = word_freq.get(word, 0) + 1
-    
-    if not word_freq:
-        return {}
-    
-    max_freq = max(word_freq.values())
-    for word in word_freq:
-        word_freq[word] = word_freq[word] / max_freq
-    
-    sentence_scores = {}
-    for i, sentence in enumerate(sentences):
-        sentence_words = word_tokenize(sentence.lower())
-        score = 0
-        for word in sentence_words:
-            if word in word_freq:
-                score += word_freq[word]
-        sentence_scores[i] = score
-    
-    return sentence_scores
-
-def calculate_tfidf_scores(sentences, stop_words):
-    """TF-IDF based scoring - better for longer documents"""
-    n_sentences = len(sentences)
-    words_in_sentences = [
-        [w.lower() for w in word_tokenize(s) 
-         if w.lower() not in stop_words and w not in string.punctuation and len(w) > 2]
-        for s in sentences
-    ]
-    
-    # Calculate IDF
-    word_doc_freq = Counter()
-    for words in words_in_sentences:
-        word_doc_freq.update(set(words))
-    
-    idf = {word: log(n_sentences / (freq + 1)) for word, freq in word_doc_freq.items()}
-    
-    # Calculate TF-IDF scores
-    sentence_scores = {}
-    for i, words in enumerate(words_in_sentences):
-        tf = Counter(words)
-        score = sum(tf[word] * idf.get(word, 0) for word in tf)
-        sentence_scores[i] = score / (len(words) + 1)  # Normalize by sentence length
-    
-    return sentence_scores
-
-def calculate_business_insights_scores(sentences, stop_words):
-    """Business-focused scoring - prioritizes business keywords, metrics, and insights"""
-    # Business keywords that indicate important business content
-    business_keywords = {
-        'revenue', 'profit', 'growth', 'sales', 'market', 'customer', 'client',
-        'strategy', 'performance', 'financial', 'quarter', 'annual', 'year',
-        'increase', 'decrease', 'improve', 'decline', 'target', 'goal', 'objective',
-        'investment', 'capital', 'budget', 'cost', 'expense', 'income', 'earnings',
-        'margin', 'roi', 'return', 'value', 'stakeholder', 'shareholder', 'equity',
-        'revenue', 'profitability', 'efficiency', 'productivity', 'competitor',
-        'competitive', 'market share', 'pricing', 'forecast', 'projection', 'trend',
-        'metric', 'kpi', 'indicator', 'benchmark', 'milestone', 'achievement',
-        'partnership', 'acquisition', 'merger', 'expansion', 'launch', 'initiative',
-        'outcome', 'result', 'impact', 'benefit', 'advantage', 'opportunity', 'risk'
-    }
-    
-    # Calculate base frequency scores
-    freq_scores = calculate_frequency_scores(sentences, stop_words)
-    
-    # Business keyword bonus
-    business_scores = {}
-    for i, sentence in enumerate(sentences):
-        sentence_lower = sentence.lower()
-        words = word_tokenize(sentence_lower)
-        
-        # Count business keywords
-        business_count = sum(1 for word in words if word in business_keywords)
-        
-        # Check for numbers/percentages (financial metrics)
-        has_numbers = bool(re.search(r'\d+[%$]?|\$\d+', sentence))
-        number_bonus = 1.5 if has_numbers else 0
-        
-        # Check for action words (decisions, outcomes)
-        action_words = {'decided', 'announced', 'achieved', 'reached', 'exceeded', 
-                       'completed', 'launched', 'implemented', 'improved', 'increased',
-                       'decreased', 'reduced', 'optimized', 'expanded', 'acquired'}
-        has_action = any(word in sentence_lower for word in action_words)
-        action_bonus = 1.2 if has_action else 0
-        
-        # Position bonus (executive summaries often at beginning)
-        position_bonus = 1.0 - (i / len(sentences)) * 0.3  # 1.0 for first, 0.7 for last
-        
-        # Length preference (business summaries prefer medium-length sentences)
-        word_count = len(words)
-        if 8 <= word_count <= 25:
-            length_bonus = 1.0
-        elif word_count < 8:
-            length_bonus = 0.6
-        else:
-            length_bonus = 0.8
-        
-        # Combine all factors
-        base_score = freq_scores.get(i, 0)
-        keyword_bonus = business_count * 0.3
-        business_scores[i] = (base_score * 0.4) + (keyword_bonus * 0.2) + \
-                            (number_bonus * 0.2) + (action_bonus * 0.1) + \
-                            (position_bonus * 0.05) + (length_bonus * 0.05)
-    
-    return business_scores
-
-def calculate_hybrid_scores(sentences, stop_words):
-    """Hybrid scoring - combines frequency, position, and length"""
-    freq_scores = calculate_frequency_scores(sentences, stop_words)
-    
-    # Position bonus (earlier sentences score higher)
-    position_scores = {i: 1 - (i / len(sentences)) for i in range(len(sentences))}
-    
-    # Length penalty (avoid very short sentences)
-    length_scores = {}
-    for i, sent in enumerate(sentences):
-        word_count = len(word_tokenize(sent))
-        length_scores[i] = 1 if word_count > 5 else 0.5
-    
-    # Combine scores
-    hybrid_scores = {}
-    for i in range(len(sentences)):
-        freq = freq_scores.get(i, 0)
-        pos = position_scores.get(i, 0)
-        length = length_scores.get(i, 0)
-        hybrid_scores[i] = (freq * 0.6) + (pos * 0.2) + (length * 0.2)
-    
-    return hybrid_scores
+# Background jobs for work too slow to finish within a request
+job_queue = JobQueue(tracker=analytics)
 
-def extract_keywords(text, num_keywords=10):
-    """Extract top keywords from text using TF-IDF"""
-    sentences = sent_tokenize(text)
-    n_sentences = len(sentences)
-    
-    words_in_sentences = [
-        [w.lower() for w in word_tokenize(s) 
-         if w.lower() not in set(stopwords.words('english')) 
-         and w not in string.punctuation and len(w) > 2]
-        for s in sentences
-    ]
-    
-    word_doc_freq = Counter()
-    for words in words_in_sentences:
-        word_doc_freq.update(set(words))
-    
-    idf = {word: log(n_sentences / (freq + 1)) for word, freq in word_doc_freq.items()}
-    
-    word_freq = Counter()
-    for words in words_in_sentences:
-        word_freq.update(words)
-    
-    tfidf_scores = {word: word_freq[word] * idf.get(word, 0) for word in word_freq}
-    
-    top_keywords = sorted(tfidf_scores.items(), key=lambda x: x[1], reverse=True)[:num_keywords]
-    return [word for word, score in top_keywords]
+# Stored documents and their inverted index, for corpus IDF and cross-document summaries
+corpus_index = CorpusIndex()
 
-def calculate_readability_metrics(text):
-    """Calculate text readability metrics"""
-    sentences = sent_tokenize(text)
-    words = word_tokenize(text)
-    
-    if not sentences or not words:
-        return {
-            'avg_words_per_sentence': 0,
-            'avg_chars_per_word': 0,
-            'flesch_kincaid_grade': 0,
-            'reading_time_minutes': 0
-        }
-    
-    # Average words per sentence
-    avg_words_per_sentence = len(words) / len(sentences)
-    
-    # Average characters per word
-    total_chars = sum(len(word) for word in words)
-    avg_chars_per_word = total_chars / len(words) if words else 0
-    
-    # Simplified Flesch-Kincaid Grade Level
-    # Grade = 0.39 * (words / sentences) + 11.8 * (syllables / words) - 15.59
-    # Using approximation: syllables ≈ vowel count
-    syllable_count = 0
-    for word in words:
-        syllable_count += count_syllables(word)
-    
-    flesch_kincaid = (
-        0.39 * avg_words_per_sentence + 
-        11.8 * (syllable_count / len(words)) - 
-        15.59
-    ) if len(words) > 0 else 0
-    
-    # Reading time (average reading speed: 200 words/minute)
-    reading_time = len(words) / 200
-    
-    return {
-        'avg_words_per_sentence': round(avg_words_per_sentence, 2),
-        'avg_chars_per_word': round(avg_chars_per_word, 2),
-        'flesch_kincaid_grade': max(0, round(flesch_kincaid, 1)),
-        'reading_time_minutes': round(reading_time, 2)
-    }
-
-def count_syllables(word):
-    """Approximate syllable count using vowel groups"""
-    word = word.lower()
-    syllable_count = 0
-    vowels = "aeiouy"
-    previous_was_vowel = False
-    
-    for char in word:
-        is_vowel = char in vowels
-        if is_vowel and not previous_was_vowel:
-            syllable_count += 1
-        previous_was_vowel = is_vowel
-    
-    # Adjust for silent e
-    if word.endswith('e'):
-        syllable_count -= 1
-    
-    return max(1, syllable_count)
+# Per-client token buckets and the per-process limit on requests doing text work
+rate_limiter = RateLimiter()
+concurrency = ConcurrencyLimiter()
 
 
-@app.route('/')
+@api.route('/')
 def index():
     return render_template('index.html')
 
-@app.route('/api/summarize', methods=['POST'])
+@api.route('/api/summarize', methods=['POST'])
 def summarize():
     try:
         data = request.get_json()
@@ -462,19 +75,110 @@ def summarize():
         ratio = data.get('ratio', 40)
         method = data.get('method', 'normal')
         file_type = data.get('file_type', None)
+        tokenizer = resolve_tokenizer(data.get('tokenizer'))
+        # Optional client-chosen id; resubmitting an edited text under it re-analyzes only the changes
+        document_id = data.get('document_id')
+        extended_readability = bool(data.get('extended_readability', False))
+        
+        if document_id is not None and (not isinstance(document_id, str) or
+                                        not 0 < len(document_id) <= MAX_DOCUMENT_ID_LENGTH):
+            return jsonify({
+                'success': False,
+                'message': f'document_id must be a string of 1 to {MAX_DOCUMENT_ID_LENGTH} characters',
+                'summary': ''
+            }), 400
         
         ratio = max(10, min(90, float(ratio)))
-        method = method if method in ['normal', 'business_insights'] else 'normal'
+        method = method if method in SUMMARY_METHODS else 'normal'
         
-        result = generate_summary(text, ratio, method)
+        result = summary_cache.summarize(text, ratio, method, num_keywords=8, tokenizer=tokenizer,
+                                         document_id=document_id,
+                                         extended_readability=extended_readability)
+        
+        if result['success']:
+            with stage('analytics'):
+                analytics.track_summary(method, result['original_length'], result['summary_length'], file_type)
+        
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error. Please try again.',
+            'summary': ''
+        }), 500
+
+@api.route('/api/summarize/explain', methods=['POST'])
+def explain_summary():
+    """
+    Per-sentence business insights features, weights, scores and selection.
+    Follow-up requests pass the returned analysis_id instead of the text to
+    re-rank for another ratio or other weights without re-tokenizing.
+    """
+    try:
+        data = request.get_json()
+        text = data.get('text', '')
+        analysis_id = data.get('analysis_id')
+        ratio = max(10, min(90, float(data.get('ratio', 40))))
+        tokenizer = resolve_tokenizer(data.get('tokenizer'))
+        weights = data.get('weights') or {}
+        
+        if not isinstance(weights, dict):
+            raise ValueError('weights must map feature names to numbers')
+        if analysis_id is not None and not isinstance(analysis_id, str):
+            raise ValueError('analysis_id must be a string')
+        
+        result = summary_cache.explain(ratio, text=text, analysis_id=analysis_id,
+                                       weights=business_weights(weights), tokenizer=tokenizer)
+        if result is None:
+            return jsonify({
+                'success': False,
+                'message': 'Analysis expired or unknown; resend the text'
+            }), 404
+        return jsonify(result), 200 if result['success'] else 400
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Invalid request: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error. Please try again.'
+        }), 500
+
+@api.route('/api/summarize/stream', methods=['POST'])
+def summarize_stream():
+    """Summarize a chunked plain-text or NDJSON body without holding it in memory"""
+    try:
+        ratio = max(10, min(90, float(request.args.get('ratio', 40))))
+        method = request.args.get('method', 'normal')
+        method = method if method in SUMMARY_METHODS else 'normal'
+        file_type = request.args.get('file_type', None)
+        tokenizer = resolve_tokenizer(request.args.get('tokenizer'))
+        # The body is never held whole, so it may be far larger than a JSON one
+        request.max_content_length = MAX_STREAM_BYTES
+        ndjson = request.mimetype in ('application/x-ndjson', 'application/jsonl')
+        
+        summarizer = StreamingSummarizer(ratio, method, tokenizer=tokenizer)
+        with stage('stream_ingest'):
+            for chunk in iter_text_chunks(request.stream, ndjson=ndjson):
+                summarizer.feed(chunk)
+        with stage('stream_finish'):
+            result = summarizer.close(num_keywords=8)
         
         if result['success']:
-            result['keywords'] = extract_keywords(text, num_keywords=8)
-            result['readability'] = calculate_readability_metrics(text)
-            
-            analytics.track_summary(method, result['original_length'], result['summary_length'], file_type)
+            with stage('analytics'):
+                analytics.track_summary(method, result['original_length'], result['summary_length'], file_type)
         
         return jsonify(result)
+    except RequestEntityTooLarge:
+        raise  # Answered with 413 by body_too_large
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Invalid stream: {str(e)}',
+            'summary': ''
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -482,7 +186,66 @@ def summarize():
             'summary': ''
         }), 500
 
-@app.route('/api/analyze', methods=['POST'])
+@api.route('/api/summarize/upload', methods=['POST'])
+def summarize_upload():
+    """Summarize an uploaded PDF, DOCX or text file, extracting it a page or paragraph at a time"""
+    try:
+        # Checked as the body is parsed, before anything is spooled to disk
+        request.max_content_length = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES
+        upload = request.files.get('file')
+        if upload is None:
+            return jsonify({
+                'success': False,
+                'message': 'No file uploaded; send it as the multipart field "file"',
+                'summary': ''
+            }), 400
+        
+        options = request.form or request.args
+        ratio = max(10, min(90, float(options.get('ratio', 40))))
+        method = options.get('method', 'normal')
+        method = method if method in SUMMARY_METHODS else 'normal'
+        tokenizer = resolve_tokenizer(options.get('tokenizer'))
+        
+        reader = DocumentReader(upload.stream, upload.filename)
+        summarizer = StreamingSummarizer(ratio, method, tokenizer=tokenizer)
+        for text in reader:
+            summarizer.feed(text)
+        with stage('stream_finish'):
+            result = summarizer.close(num_keywords=8)
+        result['document'] = reader.info()
+        
+        if result['success']:
+            with stage('analytics'):
+                analytics.track_summary(method, result['original_length'], result['summary_length'],
+                                        reader.format)
+        
+        return jsonify(result)
+    except RequestEntityTooLarge:
+        return jsonify({
+            'success': False,
+            'message': f'File is larger than {MAX_UPLOAD_BYTES} bytes',
+            'summary': ''
+        }), 413
+    except UnsupportedDocumentError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'summary': ''
+        }), 415
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Invalid document: {str(e)}',
+            'summary': ''
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'Server error. Please try again.',
+            'summary': ''
+        }), 500
+
+@api.route('/api/analyze', methods=['POST'])
 def analyze():
     """Analyze text for keywords and readability metrics"""
     try:
@@ -495,46 +258,175 @@ def analyze():
                 'message': 'Please provide text to analyze'
             }), 400
         
-        text = re.sub(r'\s+', ' ', text).strip()
+        result = summary_cache.analyze(text, num_keywords=15,
+                                       tokenizer=resolve_tokenizer(data.get('tokenizer')),
+                                       extended_readability=bool(data.get('extended_readability', False)))
+        # Keywords ranked against the corpus rather than the text's own sentences
+        if data.get('idf') == 'corpus':
+            result['keywords'] = corpus_index.keywords(text, num_keywords=15)
+        
+        return jsonify({'success': True, **result})
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Analysis error: {str(e)}'
+        }), 500
+
+def valid_document_id(document_id):
+    return isinstance(document_id, str) and 0 < len(document_id) <= MAX_DOCUMENT_ID_LENGTH
+
+@api.route('/api/corpus', methods=['GET'])
+def corpus_stats():
+    """Size of the corpus"""
+    return jsonify({'success': True, **corpus_index.get_stats()})
+
+@api.route('/api/corpus/documents', methods=['POST'])
+def add_corpus_documents():
+    """Add documents ({id, text}, or `documents` of them) to the corpus, replacing any with the same id"""
+    denied = check_admin()
+    if denied is not None:
+        return denied
+    try:
+        data = request.get_json()
+        documents = data.get('documents', [data] if 'text' in data else [])
+        
+        if not isinstance(documents, list) or len(documents) == 0:
+            return jsonify({
+                'success': False,
+                'message': 'Provide a document {id, text} or an array of documents to add'
+            }), 400
+        
+        if len(documents) > MAX_CORPUS_BATCH:
+            return jsonify({
+                'success': False,
+                'message': f'Maximum {MAX_CORPUS_BATCH} documents per request'
+            }), 400
+        
+        pairs = []
+        for document in documents:
+            if not isinstance(document, dict) or not valid_document_id(document.get('id')):
+                return jsonify({
+                    'success': False,
+                    'message': f'Each document needs an id of 1 to {MAX_DOCUMENT_ID_LENGTH} characters'
+                }), 400
+            text = document.get('text')
+            if not isinstance(text, str) or not text.strip():
+                return jsonify({
+                    'success': False,
+                    'message': f'Document {document["id"]} has no text'
+                }), 400
+            pairs.append((document['id'], text))
+        
+        added = corpus_index.add(pairs)
         
         return jsonify({
             'success': True,
-            'keywords': extract_keywords(text, num_keywords=15),
-            'readability': calculate_readability_metrics(text),
-            'word_count': len(text.split()),
-            'sentence_count': len(sent_tokenize(text))
-        })
+            'added': added,
+            'ids': [document_id for document_id, _ in pairs]
+        }), 201
     except Exception as e:
         return jsonify({
             'success': False,
-            'message': f'Analysis error: {str(e)}'
+            'message': f'Corpus error: {str(e)}'
+        }), 500
+
+@api.route('/api/corpus/documents/<document_id>', methods=['DELETE'])
+def delete_corpus_document(document_id):
+    """Remove a document from the corpus"""
+    denied = check_admin()
+    if denied is not None:
+        return denied
+    if not corpus_index.delete(document_id):
+        return jsonify({'success': False, 'message': 'Document not found'}), 404
+    return jsonify({'success': True, 'id': document_id})
+
+@api.route('/api/corpus/search', methods=['GET'])
+def search_corpus():
+    """Corpus documents ranked against the query `q`"""
+    query = request.args.get('q', '')
+    if not query.strip():
+        return jsonify({'success': False, 'message': 'Provide a query in q'}), 400
+    limit = max(1, min(100, request.args.get('limit', 10, type=int)))
+    return jsonify({'success': True, 'results': corpus_index.search(query, limit)})
+
+@api.route('/api/corpus/summarize', methods=['POST'])
+def summarize_corpus():
+    """One summary across several corpus documents"""
+    try:
+        data = request.get_json()
+        document_ids = data.get('ids', [])
+        try:
+            ratio = max(10, min(90, float(data.get('ratio', 40))))
+            max_sentences = int(data.get('max_sentences', CORPUS_SUMMARY_SENTENCES))
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'message': 'ratio must be a number and max_sentences an integer'
+            }), 400
+        
+        if (not isinstance(document_ids, list) or len(document_ids) == 0 or
+                not all(valid_document_id(document_id) for document_id in document_ids)):
+            return jsonify({
+                'success': False,
+                'message': 'Provide an array of document ids to summarize'
+            }), 400
+        
+        if len(document_ids) > MAX_CORPUS_SUMMARY_DOCUMENTS:
+            return jsonify({
+                'success': False,
+                'message': f'Maximum {MAX_CORPUS_SUMMARY_DOCUMENTS} documents per summary'
+            }), 400
+        
+        result = corpus_index.summarize(list(dict.fromkeys(document_ids)), ratio,
+                                        max_sentences=max(1, max_sentences))
+        return jsonify(result), 200 if result['success'] else 400
+    
+    except DocumentNotFoundError as e:
+        return jsonify({
+            'success': False,
+            'message': 'Documents not found in the corpus',
+            'missing': e.args[0]
+        }), 404
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Corpus summary error: {str(e)}'
         }), 500
 
-@app.route('/api/analytics', methods=['GET'])
+@api.route('/api/analytics', methods=['GET'])
 def get_analytics():
     """Get current analytics statistics"""
     return jsonify({
         'success': True,
-        'stats': analytics.get_stats()
+        'stats': analytics.get_stats(),
+        'cache': summary_cache.get_stats()
     })
 
-@app.route('/api/analytics/reset', methods=['POST'])
+@api.route('/api/analytics/reset', methods=['POST'])
 def reset_analytics():
     """Reset analytics data"""
-    analytics.data = analytics.get_default_data()
-    analytics.save_data()
+    denied = check_admin()
+    if denied is not None:
+        return denied
+    analytics.reset()
     return jsonify({
         'success': True,
         'message': 'Analytics data reset'
     })
 
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/health', methods=['GET'])
 def health():
-    return jsonify({'status': 'healthy', 'version': '2.0'})
+    return jsonify({'status': 'healthy', 'version': '2.0', 'startup': resources.get_status()})
 
+@api.route('/api/health/ready', methods=['GET'])
+def ready():
+    """Readiness probe: 503 until the NLTK models are loaded"""
+    status = resources.get_status()
+    return jsonify(status), 200 if status['ready'] else 503
 
 
-@app.route('/api/batch-summarize', methods=['POST'])
+
+@api.route('/api/batch-summarize', methods=['POST'])
 def batch_summarize():
     """Process multiple texts in batch"""
     try:
@@ -542,6 +434,7 @@ def batch_summarize():
         texts = data.get('texts', [])
         ratio = data.get('ratio', 40)
         method = data.get('method', 'normal')
+        tokenizer = resolve_tokenizer(data.get('tokenizer'))
         
         if not isinstance(texts, list) or len(texts) == 0:
             return jsonify({
@@ -549,26 +442,23 @@ def batch_summarize():
                 'message': 'Provide array of texts to summarize'
             }), 400
         
-        if len(texts) > 50:
+        if len(texts) > MAX_BATCH_SIZE:
             return jsonify({
                 'success': False,
-                'message': 'Maximum 50 texts per batch'
+                'message': f'Maximum {MAX_BATCH_SIZE} texts per batch'
             }), 400
         
         ratio = max(10, min(90, float(ratio)))
-        method = method if method in ['normal', 'business_insights'] else 'normal'
-        
-        results = []
-        for idx, text in enumerate(texts):
-            result = generate_summary(text, ratio, method)
-            if result['success']:
-                result['index'] = idx
-                result['keywords'] = extract_keywords(text, num_keywords=5)
-                result['readability'] = calculate_readability_metrics(text)
-                
-                # Track each summary
-                analytics.track_summary(method, result['original_length'], result['summary_length'])
-            results.append(result)
+        method = method if method in SUMMARY_METHODS else 'normal'
+        
+        results = summarize_batch(texts, ratio, method, num_keywords=5, tokenizer=tokenizer)
+        
+        # One aggregated analytics write for the whole batch
+        with stage('analytics'):
+            analytics.track_summaries(
+                (method, r['original_length'], r['summary_length'], None)
+                for r in results if r['success']
+            )
         
         return jsonify({
             'success': True,
@@ -583,12 +473,296 @@ def batch_summarize():
             'message': f'Batch processing error: {str(e)}'
         }), 500
 
-@app.before_request
+@api.route('/api/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage and request latency histograms in the Prometheus text format"""
+    cache_stats = summary_cache.get_stats()
+    ingested = ingestion_stats.snapshot()
+    gauges = [
+        ('summai_cache_hits_total', 'Result cache hits', 'counter',
+         {(('layer', layer),): stats['hits'] for layer, stats in cache_stats.items()}),
+        ('summai_cache_misses_total', 'Result cache misses', 'counter',
+         {(('layer', layer),): stats['misses'] for layer, stats in cache_stats.items()}),
+        ('summai_cache_bytes', 'Approximate result cache size', 'gauge',
+         {(('layer', layer),): stats['bytes'] for layer, stats in cache_stats.items()}),
+        ('summai_documents_ingested_total', 'Uploaded documents extracted per format', 'counter',
+         {(('format', fmt),): counts[0] for fmt, counts in ingested.items()}),
+        ('summai_ingested_bytes_total', 'Bytes of uploaded documents per format', 'counter',
+         {(('format', fmt),): counts[1] for fmt, counts in ingested.items()}),
+        ('summai_extracted_characters_total', 'Characters of text extracted per format', 'counter',
+         {(('format', fmt),): counts[2] for fmt, counts in ingested.items()}),
+        ('summai_ready', 'Whether the NLTK models are loaded', 'gauge',
+         {(): int(resources.is_ready())}),
+        ('summai_admission_rejected_total', 'Requests refused by admission control', 'counter',
+         {(('reason', reason),): count for reason, count in admission_stats.snapshot().items()}),
+        ('summai_requests_in_flight', 'Requests doing text work in this process', 'gauge',
+         {(): concurrency.in_flight}),
+    ]
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
+@api.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Queue a summary (`text`) or batch (`texts`) job and return its id"""
+    try:
+        data = request.get_json()
+        kind = 'summary' if 'text' in data else 'batch'
+        texts = [data.get('text', '')] if kind == 'summary' else data.get('texts', [])
+        ratio = data.get('ratio', 40)
+        method = data.get('method', 'normal')
+        tokenizer = resolve_tokenizer(data.get('tokenizer'))
+        
+        if not isinstance(texts, list) or len(texts) == 0:
+            return jsonify({
+                'success': False,
+                'message': 'Provide text or array of texts to summarize'
+            }), 400
+        
+        if len(texts) > MAX_JOB_TEXTS:
+            return jsonify({
+                'success': False,
+                'message': f'Maximum {MAX_JOB_TEXTS} texts per job'
+            }), 400
+        
+        ratio = max(10, min(90, float(ratio)))
+        method = method if method in SUMMARY_METHODS else 'normal'
+        num_keywords = 8 if kind == 'summary' else 5
+        
+        job_id = job_queue.submit(texts, ratio, method, kind=kind,
+                                  num_keywords=num_keywords, tokenizer=tokenizer)
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/jobs/{job_id}',
+            'result_url': f'/api/jobs/{job_id}/result'
+        }), 202
+    
+    except QueueFullError as e:
+        response = jsonify({
+            'success': False,
+            'message': f'Job queue is full, retry later ({str(e)})'
+        })
+        response.headers['Retry-After'] = str(max(1, int(JOB_POLL_INTERVAL * 5)))
+        return response, 429
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Job submission error: {str(e)}'
+        }), 500
+
+@api.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Status and progress of a job"""
+    status = job_queue.status(job_id)
+    if status is None:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    return jsonify({'success': True, **status})
+
+@api.route('/api/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    """Results of a completed job; 202 while it is still queued or running"""
+    status, results = job_queue.result(job_id)
+    if status is None:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    
+    if status in ('queued', 'running'):
+        return jsonify({'success': False, 'status': status, 'message': 'Job not finished'}), 202
+    if status != 'completed':
+        job = job_queue.status(job_id)
+        return jsonify({
+            'success': False,
+            'status': status,
+            'message': job['error'] or f'Job {status}'
+        }), 409
+    
+    job = job_queue.status(job_id)
+    if job['kind'] == 'summary':
+        result = dict(results[0])
+        result.pop('index', None)
+        return jsonify({'job_id': job_id, 'status': status, **result})
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': status,
+        'total': len(results),
+        'processed': sum(1 for r in results if r.get('success')),
+        'results': results
+    })
+
+@api.route('/api/jobs/<job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued job, or ask a running one to stop"""
+    status = job_queue.cancel(job_id)
+    if status is None:
+        return jsonify({'success': False, 'message': 'Job not found'}), 404
+    if status in ('completed', 'failed'):
+        return jsonify({'success': False, 'status': status, 'message': 'Job already finished'}), 409
+    return jsonify({
+        'success': True,
+        'status': status,
+        'cancel_requested': status == 'running'
+    }), 200 if status == 'cancelled' else 202
+
+def endpoint_name():
+    """The view name without the blueprint prefix, as used in metrics and profiles"""
+    return request.endpoint.rpartition('.')[2] if request.endpoint else 'unknown'
+
+def client_id():
+    """
+    Opaque per-client identifier for session tracking: a hash of the client
+    address and user agent, so no address is stored
+    """
+    key = f'{request.remote_addr}|{request.headers.get("User-Agent", "")}'
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+def address_key():
+    """Hash of the client address alone, which a client cannot vary to dodge its rate limit"""
+    return hashlib.sha256(f'{request.remote_addr}'.encode('utf-8')).hexdigest()[:32]
+
+def check_admin():
+    """
+    None when the request carries the SUMMAI_ADMIN_TOKEN as an
+    `Authorization: Bearer` token, otherwise the error response. Without a
+    configured token every request is refused: behind a proxy on the same
+    host, any client's address can look local.
+    """
+    if not ADMIN_TOKEN:
+        current_app.logger.warning('Refused %s: set SUMMAI_ADMIN_TOKEN to enable it', request.path)
+        return jsonify({
+            'success': False,
+            'message': 'Administrative endpoints are disabled; set SUMMAI_ADMIN_TOKEN'
+        }), 403
+    
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token:
+        response = jsonify({'success': False, 'message': 'Admin token required'})
+        response.headers['WWW-Authenticate'] = 'Bearer'
+        return response, 401
+    if not hmac.compare_digest(token.strip().encode('utf-8'), ADMIN_TOKEN.encode('utf-8')):
+        return jsonify({'success': False, 'message': 'Invalid admin token'}), 403
+    return None
+
+def reject(status, reason, message, wait=None):
+    admission_stats.record(reason)
+    response = jsonify({'success': False, 'message': message})
+    if wait is not None:
+        response.headers['Retry-After'] = retry_after(wait)
+    return response, status
+
+def wants_timings():
+    """Clients opt in to a per-stage breakdown with ?timings=1 or \"timings\": true"""
+    if request.args.get('timings') in ('1', 'true'):
+        return True
+    # The streaming endpoint's body must not be read here
+    if request.is_json and endpoint_name() != 'summarize_stream':
+        data = request.get_json(silent=True)
+        return isinstance(data, dict) and data.get('timings') is True
+    return False
+
+@api.before_app_request
+def start_instrumentation():
+    """Start request timing, the opt-in stage breakdown and sampled profiling"""
+    g.request_started = time.perf_counter()
+    g.timings = RequestTimings().__enter__() if wants_timings() else None
+    g.profile = profiler.start()
+
+@api.before_app_request
+def admit_request():
+    """
+    Admission control, before any text work: the word limit, the client's
+    rate limit, then a concurrency slot for endpoints that do text work
+    """
+    endpoint = endpoint_name()
+    if endpoint in UNTRACKED_ENDPOINTS:
+        return None
+    
+    if endpoint in UNPARSED_ENDPOINTS:
+        # Costed from the declared length; the view enforces its own byte limit
+        words = (request.content_length or 0) // BYTES_PER_WORD
+    elif request.is_json:
+        words = payload_words(request.get_json(silent=True))
+        if MAX_REQUEST_WORDS and words > MAX_REQUEST_WORDS and endpoint in WORK_ENDPOINTS:
+            return reject(413, 'too_many_words',
+                          f'Request has about {words} words; the limit is {MAX_REQUEST_WORDS}. '
+                          'Submit larger texts as a job (/api/jobs)')
+    else:
+        words = 0
+    
+    wait = rate_limiter.take(address_key(), request_cost(words))
+    if wait > 0:
+        return reject(429, 'rate_limited', 'Rate limit exceeded, retry later', wait)
+    
+    if endpoint in WORK_ENDPOINTS:
+        if not concurrency.acquire():
+            return reject(503, 'overloaded', 'Server is busy, retry later', concurrency.wait)
+        g.admitted = True
+    return None
+
+@api.app_errorhandler(RequestEntityTooLarge)
+def body_too_large(e):
+    limit = request.max_content_length
+    return reject(413, 'body_too_large', f'Request body is larger than {limit} bytes')
+
+@api.after_app_request
+def finish_instrumentation(response):
+    elapsed = time.perf_counter() - g.get('request_started', time.perf_counter())
+    if g.get('profile') is not None:
+        profiler.stop(g.profile, endpoint_name())
+        g.profile = None
+    if METRICS_ENABLED:
+        metrics.observe_request(endpoint_name(), response.status_code, elapsed)
+    
+    timings = g.get('timings')
+    if timings is not None and response.is_json:
+        data = response.get_json()
+        if isinstance(data, dict):
+            data['timings'] = {**timings.as_ms(), 'total': round(elapsed * 1000, 3)}
+            response.set_data(current_app.json.dumps(data))
+    return response
+
+@api.teardown_app_request
+def end_instrumentation(exc):
+    if g.pop('admitted', False):
+        concurrency.release()
+    if g.get('timings') is not None:
+        g.timings.__exit__(None, None, None)
+        g.timings = None
+    if g.get('profile') is not None:
+        profiler.stop(g.profile, endpoint_name())
+        g.profile = None
+
+@api.before_app_request
 def before_request():
     """Track new session"""
-    if not hasattr(app, '_session_tracked'):
-        analytics.increment_sessions()
-        app._session_tracked = True
+    # Job threads do not survive fork, so each worker process starts its own
+    job_queue.start()
+    if endpoint_name() not in UNTRACKED_ENDPOINTS:
+        analytics.track_session(client_id())
+
+def create_app(config=None):
+    """
+    Build the WSGI application. `config` entries override Flask settings and
+    PROXY_COUNT. Analytics, jobs, the result cache and the NLTK models are
+    per-process state shared by every app built in the process.
+    """
+    app = Flask(__name__)
+    app.config['PROXY_COUNT'] = PROXY_COUNT
+    # Refused as the body is read; streaming and upload endpoints raise their own limit
+    app.config['MAX_CONTENT_LENGTH'] = MAX_BODY_BYTES
+    app.config.update(config or {})
+    CORS(app)
+    if app.config['PROXY_COUNT']:
+        hops = app.config['PROXY_COUNT']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+    app.register_blueprint(api)
+    # Load the NLTK models now (or in the background) rather than on the first request
+    resources.start_warm_up()
+    return app
+
+resources.record_timing('app_import', resources.IMPORTED_AT)
+app = create_app()
 
 if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    job_queue.start()
+    app.run(debug=DEBUG, host=HOST, port=PORT)
@@ -0,0 +1,86 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import resources
+from cache import summary_cache
+
+# Worker processes for the batch pool; 0 or 1 runs batches inline on the request thread
+BATCH_WORKERS = int(os.environ.get('SUMMAI_BATCH_WORKERS', os.cpu_count() or 1))
+# Texts handed to a worker per dispatch; 0 picks a size from the batch length
+BATCH_CHUNKSIZE = int(os.environ.get('SUMMAI_BATCH_CHUNKSIZE', 0))
+# Largest batch accepted per request, scaled with the worker count by default
+MAX_BATCH_SIZE = int(os.environ.get('SUMMAI_MAX_BATCH_SIZE', max(50, 25 * BATCH_WORKERS)))
+# Batches smaller than this are not worth the inter-process round trip
+MIN_PARALLEL_BATCH = int(os.environ.get('SUMMAI_MIN_PARALLEL_BATCH', 4))
+# Workers start from a fresh interpreter: a fork of the multithreaded server could copy
+# a lock (metrics, cache, NLTK loading) that another thread holds, and deadlock on it
+POOL_START_METHOD = ('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods()
+                     else 'spawn')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def summarize_one(task):
+    """Summarize one batch item; runs inside a pool worker"""
+    idx, text, ratio, method, num_keywords, tokenizer = task
+    result = summary_cache.summarize(text, ratio, method, num_keywords=num_keywords,
+                                     tokenizer=tokenizer)
+    if result['success']:
+        result['index'] = idx
+    return result
+
+
+def get_pool():
+    """Return the shared process pool, starting it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Each worker loads the NLTK models as it starts, not the server
+            _pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS,
+                                        mp_context=multiprocessing.get_context(POOL_START_METHOD),
+                                        initializer=resources.warm_up)
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _chunksize(n_tasks, workers):
+    if BATCH_CHUNKSIZE > 0:
+        return BATCH_CHUNKSIZE
+    # Roughly four chunks per worker balances load without per-item IPC
+    return max(1, n_tasks // (workers * 4))
+
+
+def summarize_batch(texts, ratio, method, num_keywords=5, tokenizer=None,
+                    min_parallel=MIN_PARALLEL_BATCH, start_index=0):
+    """
+    Summarize every text in the batch, returning results in input order.
+
+    CPU-bound NLTK work is spread across the shared process pool in chunks;
+    small batches or a single configured worker run inline instead.
+    Result indices are numbered from `start_index`.
+    """
+    tasks = [(idx, text, ratio, method, num_keywords, tokenizer)
+             for idx, text in enumerate(texts, start_index)]
+
+    if BATCH_WORKERS <= 1 or len(tasks) < min_parallel:
+        return [summarize_one(task) for task in tasks]
+
+    try:
+        # Executor.map yields results in submission order
+        return list(get_pool().map(summarize_one, tasks,
+                                   chunksize=_chunksize(len(tasks), BATCH_WORKERS)))
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed); start a fresh pool next time
+        shutdown_pool()
+        raise
@@ -0,0 +1,308 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from summarizer import (
+    AnalyzedDocument, normalize_text, validate_text, generate_summary, summary_indices,
+    score_sentences, extract_keywords, calculate_readability_metrics, business_feature_matrix,
+    weighted_scores, EXTENDED_READABILITY, BUSINESS_FEATURES, BUSINESS_WEIGHTS
+)
+from incremental import DocumentRevision
+from redundancy import dedup_applies
+from instrumentation import stage
+from tokenization import resolve_tokenizer
+
+# Entries, approximate memory budget and lifetime shared by the cache layers
+CACHE_MAX_ENTRIES = int(os.environ.get('SUMMAI_CACHE_ENTRIES', 256))
+CACHE_MAX_BYTES = int(os.environ.get('SUMMAI_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+CACHE_TTL = float(os.environ.get('SUMMAI_CACHE_TTL', 3600))
+# Methods scored as soon as a text is analyzed; graph-based textrank waits until requested
+EAGER_METHODS = ('normal', 'business_insights')
+# Keywords are ranked once to this depth and sliced for each request
+KEYWORD_CACHE_DEPTH = 50
+# Edited documents whose latest revision is kept for incremental re-analysis
+DOCUMENT_CACHE_ENTRIES = int(os.environ.get('SUMMAI_DOCUMENT_CACHE_ENTRIES', 128))
+# Approximate bytes a document revision holds per character of text (tokens, records, counts)
+REVISION_BYTES_PER_CHAR = 20
+
+
+def text_key(normalized_text):
+    """Content address of a normalized text"""
+    return hashlib.blake2b(normalized_text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def estimate_size(value):
+    """Rough deep size in bytes of the plain containers stored in the cache"""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(estimate_size(v) for v in value)
+    elif hasattr(value, '__dict__'):
+        size += estimate_size(vars(value))
+    return size
+
+
+class LRUCache:
+    """Thread-safe LRU cache bounded by entry count and approximate bytes, with TTL expiry"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()  # key -> (expires_at, size, value)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, size, value = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, size=None):
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl, size, value)
+            self.total_bytes += size
+            while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self.entries.pop(key)
+        self.total_bytes -= size
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def get_stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'bytes': self.total_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups * 100, 1) if lookups else 0
+            }
+
+
+class CachedAnalysis:
+    """Ratio-independent results for one document: sentence scores, keywords and readability"""
+
+    def __init__(self, doc):
+        self.sentences = doc.sentences
+        self.tokenizer = doc.tokenizer
+        # Frequency scoring is cheap once tokenized, so switching between those never re-tokenizes
+        self.scores = {method: score_sentences(doc, method) for method in EAGER_METHODS}
+        self.keywords = extract_keywords(doc, num_keywords=KEYWORD_CACHE_DEPTH)
+        # The extended metrics come from the same totals, so they are always kept
+        self.readability = calculate_readability_metrics(doc, extended=True)
+        self.signatures = doc.signatures if dedup_applies(len(doc.sentences)) else None
+        # Business feature matrix, built the first time a request explains the scores
+        self.features = None
+
+
+class SummaryCache:
+    """
+    Two-layer content-addressed cache. The analysis layer holds the
+    ratio-independent work per text hash, so a new ratio or method only
+    re-selects sentences; the summary layer holds final results keyed by
+    (hash, method, ratio). Both are also keyed by tokenizer, since it
+    changes every score.
+
+    Requests naming a document_id also keep that document's latest
+    revision, so the next edit re-analyzes only the changed sentences.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES, ttl=CACHE_TTL,
+                 document_entries=DOCUMENT_CACHE_ENTRIES):
+        # Analyses and revisions carry every sentence, so they get most of the memory budget
+        self.analyses = LRUCache(max_entries, max_bytes // 2, ttl)
+        self.documents = LRUCache(document_entries, max_bytes // 4, ttl)
+        self.summaries = LRUCache(max_entries * 4, max_bytes // 4, ttl)
+
+    def _analysis(self, text, method=None, tokenizer=None, features=False):
+        """Return the cached analysis for a normalized text, building it on a miss"""
+        tokenizer = resolve_tokenizer(tokenizer)
+        key = (text_key(text), tokenizer)
+        analysis = self.analyses.get(key)
+        if (analysis is None or (method and method not in analysis.scores) or
+                (features and analysis.features is None)):
+            doc = AnalyzedDocument(text, tokenizer=tokenizer)
+            analysis = analysis or CachedAnalysis(doc)
+            if method and method not in analysis.scores:
+                analysis.scores[method] = score_sentences(doc, method)
+            if features and analysis.features is None:
+                with stage('business_features'):
+                    analysis.features = business_feature_matrix(doc, analysis.scores['normal'])
+            self.analyses.put(key, analysis)
+        return analysis
+
+    def _revision(self, document_id, text, tokenizer=None):
+        """Analysis of a normalized text as the latest revision of document_id"""
+        tokenizer = resolve_tokenizer(tokenizer)
+        previous = self.documents.get(document_id)
+        if previous is not None and previous.tokenizer == tokenizer:
+            with stage('revise'):
+                revision = previous.revise(text)
+        else:
+            revision = DocumentRevision(text, tokenizer, KEYWORD_CACHE_DEPTH)
+        if revision is not previous:
+            self.documents.put(document_id, revision, size=len(text) * REVISION_BYTES_PER_CHAR)
+        return revision
+
+    def analyze(self, text, num_keywords=15, tokenizer=None, extended_readability=False):
+        """Keywords, readability and sentence count for a text, reusing cached analysis"""
+        normalized = normalize_text(text)
+        analysis = self._analysis(normalized, tokenizer=tokenizer)
+        return {
+            'keywords': _top_keywords(analysis, normalized, num_keywords),
+            'readability': _readability(analysis.readability, extended_readability),
+            'word_count': len(normalized.split()),
+            'sentence_count': len(analysis.sentences)
+        }
+
+    def summarize(self, text, ratio, method, num_keywords=8, tokenizer=None, document_id=None,
+                  extended_readability=False):
+        """
+        generate_summary plus keywords and readability, served from cache when
+        possible. With a document_id, the text is analyzed as a revision of the
+        document's previous text.
+        """
+        normalized = normalize_text(text)
+        tokenizer = resolve_tokenizer(tokenizer)
+        summary_key = (text_key(normalized), tokenizer, method, ratio, num_keywords)
+
+        with stage('cache_lookup'):
+            result = self.summaries.get(summary_key)
+        if result is not None:
+            return _copy_result(result, extended_readability)
+
+        error = validate_text(text)
+        if error:
+            return error
+
+        if document_id is None:
+            analysis = self._analysis(normalized, method, tokenizer)
+            scores = analysis.scores[method]
+        else:
+            analysis = self._revision(document_id, normalized, tokenizer)
+            scores = analysis.score(method)
+        result = generate_summary(normalized, ratio, method, doc=analysis, sentence_scores=scores)
+        if result['success']:
+            result['keywords'] = _top_keywords(analysis, normalized, num_keywords)
+            result['readability'] = dict(analysis.readability)
+            self.summaries.put(summary_key, _copy_result(result, extended_readability=True))
+            result['readability'] = _readability(analysis.readability, extended_readability)
+        return result
+
+    def explain(self, ratio, text=None, analysis_id=None, weights=BUSINESS_WEIGHTS, tokenizer=None):
+        """
+        The business insights features, weighted score and selection of every
+        sentence of a text, or of the analysis already cached as analysis_id.
+        The feature matrix is built once per text; other ratios and weights
+        re-rank it without tokenizing again. None when analysis_id is no
+        longer cached.
+        """
+        tokenizer = resolve_tokenizer(tokenizer)
+        if analysis_id is None:
+            error = validate_text(text)
+            if error:
+                return error
+            normalized = normalize_text(text)
+            analysis_id = text_key(normalized)
+            analysis = self._analysis(normalized, tokenizer=tokenizer, features=True)
+        else:
+            analysis = self.analyses.get((analysis_id, tokenizer))
+            if analysis is None or analysis.features is None:
+                return None
+
+        sentences = analysis.sentences
+        if len(sentences) == 0:
+            return {'success': False, 'message': 'No sentences found in text'}
+
+        with stage('select'):
+            scores = weighted_scores(analysis.features, weights)
+            selected = summary_indices(len(sentences), scores, ratio, analysis.signatures)
+        width = len(BUSINESS_FEATURES)
+        matrix = analysis.features
+        chosen = set(selected)
+        return {
+            'success': True,
+            'analysis_id': analysis_id,
+            'feature_names': list(BUSINESS_FEATURES),
+            'weights': dict(zip(BUSINESS_FEATURES, weights)),
+            'sentences': [{
+                'index': i,
+                'text': sentence,
+                'features': matrix[i * width:(i + 1) * width].tolist(),
+                'score': scores[i],
+                'selected': i in chosen
+            } for i, sentence in enumerate(sentences)],
+            'selected': selected,
+            'summary': ' '.join(sentences[i] for i in selected),
+            'sentence_count_original': len(sentences),
+            'sentence_count_summary': len(selected)
+        }
+
+    def clear(self):
+        self.analyses.clear()
+        self.documents.clear()
+        self.summaries.clear()
+
+    def get_stats(self):
+        return {
+            'analysis': self.analyses.get_stats(),
+            'documents': self.documents.get_stats(),
+            'summary': self.summaries.get_stats()
+        }
+
+
+def _top_keywords(analysis, normalized_text, num_keywords):
+    if num_keywords <= KEYWORD_CACHE_DEPTH:
+        return analysis.keywords[:num_keywords]
+    doc = AnalyzedDocument(normalized_text, tokenizer=analysis.tokenizer)
+    return extract_keywords(doc, num_keywords=num_keywords)
+
+
+def _readability(readability, extended):
+    """A copy of cached readability metrics, without the extended ones unless asked for"""
+    if extended:
+        return dict(readability)
+    return {name: value for name, value in readability.items() if name not in EXTENDED_READABILITY}
+
+
+def _copy_result(result, extended_readability=False):
+    copied = dict(result)
+    if 'keywords' in copied:
+        copied['keywords'] = list(copied['keywords'])
+    if 'readability' in copied:
+        copied['readability'] = _readability(copied['readability'], extended_readability)
+    return copied
+
+
+summary_cache = SummaryCache()
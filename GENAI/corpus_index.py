@@ -0,0 +1,366 @@
+"""
+A persistent corpus of documents for corpus-level IDF and cross-document
+summaries.
+
+Documents are stored in SQLite together with an inverted index: a posting
+(term, document, count) for every content word of every document and the
+number of documents each term occurs in. Adding, replacing and deleting a
+document adjust those counts in one transaction, without reindexing the
+rest of the corpus.
+
+Readers never query the terms table. After the index changes, the next
+reader writes the document frequencies to a snapshot file, an open
+addressing hash table keyed by a 64-bit hash of each term. Every process
+memory-maps the snapshot read-only, so a lookup is a hash and a probe into
+pages the processes share.
+"""
+import hashlib
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+from collections import Counter
+from itertools import chain
+from math import log
+
+from redundancy import DEDUP_ENABLED, select_diverse
+from summarizer import (
+    AnalyzedDocument, calculate_tfidf_scores, extract_keywords, ranked_keys, top_k
+)
+from tokenization import resolve_tokenizer
+
+CORPUS_DB = os.environ.get('SUMMAI_CORPUS_DB', 'corpus.db')
+# Memory-mapped snapshot of the document frequencies, rewritten after the index changes
+CORPUS_IDF_FILE = os.environ.get('SUMMAI_CORPUS_IDF_FILE', 'corpus_idf.bin')
+# Documents accepted in one ingest request
+MAX_CORPUS_BATCH = int(os.environ.get('SUMMAI_MAX_CORPUS_BATCH', 100))
+# Documents one cross-document summary may combine
+MAX_CORPUS_SUMMARY_DOCUMENTS = int(os.environ.get('SUMMAI_MAX_CORPUS_SUMMARY_DOCUMENTS', 200))
+# Sentences in a cross-document summary unless the request asks for another limit
+CORPUS_SUMMARY_SENTENCES = int(os.environ.get('SUMMAI_CORPUS_SUMMARY_SENTENCES', 20))
+
+# magic, generation, documents, slots
+_HEADER = struct.Struct('<8sQQQ')
+# term hash (0 marks an empty slot), document frequency
+_SLOT = struct.Struct('<QQ')
+_MAGIC = b'SUMAIIDF'
+
+
+def term_hash(term):
+    """Stable non-zero 64-bit hash of a term"""
+    value = int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little')
+    return value or 1
+
+
+class DocumentNotFoundError(KeyError):
+    """Raised for document ids that are not in the corpus"""
+
+
+class IDFSnapshot:
+    """
+    Read-only, memory-mapped document frequencies of one index generation.
+    Behaves as a mapping from word to IDF, so it can stand in for the dict
+    calculate_idf returns.
+    """
+
+    def __init__(self, filename):
+        with open(filename, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.generation, self.documents, self.slots = _HEADER.unpack_from(self._map)
+        if magic != _MAGIC:
+            self._map.close()
+            raise ValueError(f'{filename} is not a corpus IDF snapshot')
+        self._mask = self.slots - 1
+
+    @staticmethod
+    def write(filename, generation, documents, frequencies):
+        """Write a list of (term, document frequency) pairs as a snapshot, replacing any old one"""
+        slots = 16
+        while slots < 2 * len(frequencies):
+            slots *= 2
+        mask = slots - 1
+        buffer = bytearray(_HEADER.size + slots * _SLOT.size)
+        _HEADER.pack_into(buffer, 0, _MAGIC, generation, documents, slots)
+        for term, df in frequencies:
+            h = term_hash(term)
+            slot = h & mask
+            while _SLOT.unpack_from(buffer, _HEADER.size + slot * _SLOT.size)[0]:
+                slot = (slot + 1) & mask
+            _SLOT.pack_into(buffer, _HEADER.size + slot * _SLOT.size, h, df)
+
+        # Readers map either the old file or the new one, never a partial write
+        temp = f'{filename}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temp, 'wb') as f:
+            f.write(buffer)
+        os.replace(temp, filename)
+
+    def document_frequency(self, term):
+        h = term_hash(term)
+        slot = h & self._mask
+        while True:
+            found, df = _SLOT.unpack_from(self._map, _HEADER.size + slot * _SLOT.size)
+            if found == h:
+                return df
+            if not found:
+                return 0
+            slot = (slot + 1) & self._mask
+
+    def get(self, term, default=None):
+        """Smoothed IDF of a term: 0 for a term in every document, highest for unseen terms"""
+        return log((self.documents + 1) / (self.document_frequency(term) + 1))
+
+    def __getitem__(self, term):
+        return self.get(term)
+
+    def lookup(self, terms):
+        """IDF of each of the terms as a dict, for scoring loops that look words up repeatedly"""
+        return {term: self.get(term) for term in terms}
+
+    def close(self):
+        self._map.close()
+
+
+class CorpusIndex:
+    """
+    Documents and their inverted index in a SQLite database in WAL mode,
+    shared by every worker process. Terms are the content words of the
+    default tokenizer.
+    """
+
+    def __init__(self, filename=CORPUS_DB, idf_filename=CORPUS_IDF_FILE):
+        self.filename = filename
+        self.idf_filename = idf_filename
+        self.lock = threading.Lock()
+        self._snapshot = None
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS documents ('
+                         'id TEXT PRIMARY KEY, text TEXT NOT NULL, terms INTEGER NOT NULL, '
+                         'added_at REAL NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS postings ('
+                         'term TEXT NOT NULL, document TEXT NOT NULL, count INTEGER NOT NULL, '
+                         'PRIMARY KEY (term, document)) WITHOUT ROWID')
+            conn.execute('CREATE INDEX IF NOT EXISTS postings_document ON postings (document)')
+            conn.execute('CREATE TABLE IF NOT EXISTS terms ('
+                         'term TEXT PRIMARY KEY, df INTEGER NOT NULL) WITHOUT ROWID')
+            conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+            with conn:
+                conn.execute("INSERT OR IGNORE INTO meta VALUES ('generation', 0)")
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # A short-lived connection per operation is fork- and thread-safe
+        return sqlite3.connect(self.filename, timeout=30, isolation_level='IMMEDIATE')
+
+    def add(self, documents):
+        """
+        Index (document id, text) pairs, replacing any stored document with
+        the same id. Returns the number of documents indexed.
+        """
+        # Tokenize before taking the write lock
+        tokenizer = resolve_tokenizer(None)
+        indexed = []
+        for document_id, text in documents:
+            doc = AnalyzedDocument(text, tokenizer=tokenizer)
+            counts = Counter(chain.from_iterable(doc.content_tokens))
+            indexed.append((document_id, doc.text, counts))
+
+        conn = self._connect()
+        try:
+            with conn:
+                # _remove reads before the first write, so take the write lock up front
+                conn.execute('BEGIN IMMEDIATE')
+                now = time.time()
+                for document_id, text, counts in indexed:
+                    self._remove(conn, document_id)
+                    conn.execute('INSERT INTO documents (id, text, terms, added_at) VALUES (?, ?, ?, ?)',
+                                 (document_id, text, len(counts), now))
+                    conn.executemany('INSERT INTO postings (term, document, count) VALUES (?, ?, ?)',
+                                     ((term, document_id, count) for term, count in counts.items()))
+                    conn.executemany('INSERT INTO terms (term, df) VALUES (?, 1) '
+                                     'ON CONFLICT (term) DO UPDATE SET df = df + 1',
+                                     ((term,) for term in counts))
+                if indexed:
+                    self._bump_generation(conn)
+        finally:
+            conn.close()
+        return len(indexed)
+
+    def delete(self, document_id):
+        """Remove a document from the corpus; False if it was not there"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                removed = self._remove(conn, document_id)
+                if removed:
+                    self._bump_generation(conn)
+        finally:
+            conn.close()
+        return removed
+
+    def _remove(self, conn, document_id):
+        terms = [row[0] for row in conn.execute('SELECT term FROM postings WHERE document = ?',
+                                                (document_id,))]
+        if not terms and conn.execute('SELECT 1 FROM documents WHERE id = ?',
+                                      (document_id,)).fetchone() is None:
+            return False
+        conn.executemany('UPDATE terms SET df = df - 1 WHERE term = ?', ((term,) for term in terms))
+        conn.executemany('DELETE FROM terms WHERE term = ? AND df <= 0', ((term,) for term in terms))
+        conn.execute('DELETE FROM postings WHERE document = ?', (document_id,))
+        conn.execute('DELETE FROM documents WHERE id = ?', (document_id,))
+        return True
+
+    def _bump_generation(self, conn):
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+
+    def _generation(self, conn):
+        return conn.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()[0]
+
+    def idf(self):
+        """The IDFSnapshot of the current index, rewriting the snapshot file if it is stale"""
+        conn = self._connect()
+        try:
+            generation = self._generation(conn)
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.generation == generation:
+                return snapshot
+            with self.lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.generation != generation:
+                    snapshot = self._load_snapshot(conn, generation)
+                    # Lookups still running on the old map keep it open until they finish
+                    self._snapshot = snapshot
+                return snapshot
+        finally:
+            conn.close()
+
+    def _load_snapshot(self, conn, generation):
+        try:
+            snapshot = IDFSnapshot(self.idf_filename)
+            if snapshot.generation == generation:
+                return snapshot  # Another process already wrote it
+        except (OSError, ValueError, struct.error):
+            pass
+        # One read transaction, so the counts and the generation written agree
+        conn.execute('BEGIN')
+        try:
+            generation = self._generation(conn)
+            documents = conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+            frequencies = conn.execute('SELECT term, df FROM terms').fetchall()
+        finally:
+            conn.rollback()
+        IDFSnapshot.write(self.idf_filename, generation, documents, frequencies)
+        return IDFSnapshot(self.idf_filename)
+
+    def get_stats(self):
+        conn = self._connect()
+        try:
+            return {
+                'documents': conn.execute('SELECT COUNT(*) FROM documents').fetchone()[0],
+                'terms': conn.execute('SELECT COUNT(*) FROM terms').fetchone()[0],
+                'generation': self._generation(conn)
+            }
+        finally:
+            conn.close()
+
+    def texts(self, document_ids):
+        """Stored text of each document id, in order; DocumentNotFoundError names any missing"""
+        conn = self._connect()
+        try:
+            found = {}
+            for start in range(0, len(document_ids), 500):
+                chunk = document_ids[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(conn.execute(f'SELECT id, text FROM documents WHERE id IN ({placeholders})',
+                                          chunk).fetchall())
+        finally:
+            conn.close()
+        missing = [document_id for document_id in document_ids if document_id not in found]
+        if missing:
+            raise DocumentNotFoundError(missing)
+        return [found[document_id] for document_id in document_ids]
+
+    def search(self, query, limit=10):
+        """Documents ranked by the TF-IDF of the query's content words, best first"""
+        doc = AnalyzedDocument(query)
+        terms = list(dict.fromkeys(chain.from_iterable(doc.content_tokens)))
+        if not terms:
+            return []
+        idf = self.idf().lookup(terms)
+        scores = Counter()
+        conn = self._connect()
+        try:
+            for term in terms:
+                for document_id, count in conn.execute(
+                        'SELECT document, count FROM postings WHERE term = ?', (term,)):
+                    scores[document_id] += count * idf[term]
+        finally:
+            conn.close()
+        return [{'id': document_id, 'score': round(scores[document_id], 4)}
+                for document_id in top_k(scores, limit)]
+
+    def keywords(self, text, num_keywords=10, tokenizer=None):
+        """Keywords of a text ranked against the corpus's document frequencies"""
+        doc = text if isinstance(text, AnalyzedDocument) else AnalyzedDocument(text, tokenizer=tokenizer)
+        return extract_keywords(doc, num_keywords, idf=self.idf().lookup(doc.term_counts))
+
+    def summarize(self, document_ids, summary_ratio=40, max_sentences=CORPUS_SUMMARY_SENTENCES,
+                  num_keywords=8):
+        """
+        One summary of several stored documents. Sentences of every document
+        compete on TF-IDF against the corpus, near-duplicates across documents
+        are skipped, and the chosen sentences keep the documents' order.
+        """
+        texts = self.texts(document_ids)
+        docs = [AnalyzedDocument(text) for text in texts]
+        term_counts = Counter()
+        for doc in docs:
+            term_counts.update(doc.term_counts)
+        idf = self.idf().lookup(term_counts)
+
+        # Sentences of all documents, as (document index, sentence index)
+        sentences = []
+        scores = {}
+        signatures = []
+        for d, doc in enumerate(docs):
+            for i, score in calculate_tfidf_scores(doc, idf).items():
+                scores[len(sentences)] = score
+                sentences.append((d, i))
+            signatures.extend(doc.signatures if DEDUP_ENABLED else [b''] * len(doc.sentences))
+
+        original_length = sum(len(doc.text.split()) for doc in docs)
+        if not sentences:
+            return {
+                'success': False,
+                'message': 'The documents contain no sentences',
+                'summary': '',
+                'original_length': original_length,
+                'summary_length': 0
+            }
+
+        summary_count = max(1, int(len(sentences) * (summary_ratio / 100)))
+        if max_sentences:
+            summary_count = min(summary_count, max_sentences)
+        chosen = sorted(select_diverse(ranked_keys(scores), signatures, summary_count))
+        picked = [{'document_id': document_ids[sentences[k][0]],
+                   'sentence': docs[sentences[k][0]].sentences[sentences[k][1]]} for k in chosen]
+        summary = ' '.join(item['sentence'] for item in picked)
+        summary_length = len(summary.split())
+
+        return {
+            'success': True,
+            'summary': summary,
+            'sentences': picked,
+            'documents': len(docs),
+            'original_length': original_length,
+            'summary_length': summary_length,
+            'sentence_count_original': len(sentences),
+            'sentence_count_summary': len(picked),
+            'compression_ratio': round(summary_length / original_length * 100, 1) if original_length else 0,
+            'keywords': top_k({word: count * idf[word] for word, count in term_counts.items()}, num_keywords)
+        }
@@ -0,0 +1,60 @@
+"""
+Production server settings: run `gunicorn` from GENAI/ (this file is picked
+up automatically) or `gunicorn -c GENAI/gunicorn.conf.py --chdir GENAI`.
+
+The app is imported once in the master and the NLTK models are loaded
+before the workers fork, so every worker starts warm and shares the loaded
+models copy-on-write. Each SUMMAI_* variable below has a gunicorn
+command-line flag that overrides it as well.
+"""
+import os
+
+# Worker processes; one per core uses the whole node for CPU-bound summarizing
+WORKERS = int(os.environ.get('SUMMAI_WORKERS', os.cpu_count() or 1))
+
+# Warm up synchronously in the master; a warm-up thread must not be mid-import at fork
+os.environ.setdefault('SUMMAI_WARMUP', 'eager')
+# The workers already cover every core, so batches run inline unless a core is spare
+os.environ.setdefault('SUMMAI_BATCH_WORKERS', str(max(1, (os.cpu_count() or 1) // WORKERS)))
+# Every worker claims jobs from the shared queue; one thread each is enough
+os.environ.setdefault('SUMMAI_JOB_WORKERS', '1')
+# Rate-limit buckets in process memory would give each client a separate allowance per worker
+if WORKERS > 1:
+    os.environ.setdefault('SUMMAI_RATE_LIMIT_BACKEND', 'sqlite')
+
+wsgi_app = 'app:app'
+bind = os.environ.get('SUMMAI_BIND', '0.0.0.0:5000')
+workers = WORKERS
+# Threads per worker (the gthread worker); they overlap I/O, the GIL serializes scoring
+threads = int(os.environ.get('SUMMAI_THREADS', 4))
+# Seconds a worker may spend on one request before it is killed and replaced
+timeout = int(os.environ.get('SUMMAI_WORKER_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers after this many requests (plus jitter) to bound memory growth; 0 never
+max_requests = int(os.environ.get('SUMMAI_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+preload_app = True
+accesslog = os.environ.get('SUMMAI_ACCESS_LOG', '-')
+
+
+def when_ready(server):
+    import resources
+    from analytics_store import ANALYTICS_BACKEND
+
+    # Blocks until any warm-up still running (SUMMAI_WARMUP=background) finishes
+    resources.warm_up()
+    if ANALYTICS_BACKEND == 'json' and server.cfg.workers > 1:
+        server.log.warning('The json analytics backend is not safe for several workers; '
+                           'use SUMMAI_ANALYTICS_BACKEND=sqlite')
+
+
+def post_fork(server, worker):
+    # Threads do not survive fork: start this worker's job threads before its first request
+    from app import job_queue
+    job_queue.start()
+
+
+def worker_exit(server, worker):
+    from app import analytics
+    analytics.close()
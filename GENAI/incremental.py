@@ -0,0 +1,257 @@
+"""
+Incremental re-analysis of a document that is edited and resubmitted.
+
+Each DocumentRevision keeps per-sentence records (tokens, content words,
+readability counts and, once needed, business features) along with the
+document-wide term counts, sentence frequencies and readability totals. A
+new revision is diffed against the previous one as text: only the
+sentences around the changed span are re-split and re-tokenized, and the
+global statistics are adjusted by the removed and added sentences alone.
+Scores are then recomputed from the maintained statistics, which is cheap
+next to tokenizing.
+
+Results are identical to a full analysis of the new text. Punkt decides
+each boundary from the tokens around it, so a window that starts and ends
+in unchanged sentences re-splits exactly as the whole text would; the
+window is widened until its split ends in those unchanged sentences.
+"""
+from bisect import bisect_right
+from collections import Counter
+from itertools import chain
+from math import log
+
+from instrumentation import stage
+from redundancy import sentence_signature
+from resources import sent_tokenize, stop_words as load_stop_words
+from textrank import textrank_scores
+from summarizer import (
+    content_words, top_k, business_sentence_features, combine_business_score,
+    readability_totals, readability_from_totals
+)
+from tokenization import get_tokenizer, resolve_tokenizer
+
+# Unchanged sentences re-split on each side of an edit, so punkt sees the same context
+SPLIT_CONTEXT = 2
+
+
+class SentenceRecord:
+    """Tokenization of one sentence; shared by every revision that contains it unchanged"""
+
+    __slots__ = ('text', 'tokens', 'words', 'readability', '_features', '_signature')
+
+    def __init__(self, text, tokenize, stop_words):
+        self.text = text
+        self.tokens = tokenize(text)
+        self.words = content_words(self.tokens, stop_words)
+        self.readability = readability_totals(Counter(self.tokens))
+        self._features = None
+        self._signature = None
+
+    @property
+    def features(self):
+        """Business features, computed the first time business_insights scores the sentence"""
+        if self._features is None:
+            self._features = business_sentence_features(self.text, self.tokens)
+        return self._features
+
+    @property
+    def signature(self):
+        """MinHash signature, computed the first time a summary is selected with it"""
+        if self._signature is None:
+            self._signature = sentence_signature(self.tokens)
+        return self._signature
+
+
+class DocumentRevision:
+    """
+    Analysis of one revision of a document. Offers the sentences, scores,
+    keywords and readability that SummaryCache reads from a CachedAnalysis.
+    Revisions are never modified, so concurrent requests can share them.
+    """
+
+    def __init__(self, text, tokenizer=None, keyword_depth=50):
+        """Analyze `text` (already normalized) from scratch"""
+        self.text = text
+        self.tokenizer = resolve_tokenizer(tokenizer)
+        self.keyword_depth = keyword_depth
+        with stage('split_sentences'):
+            sentences = sent_tokenize(text) if text else []
+        self.starts = _offsets(text, sentences, 0)
+        with stage('tokenize'):
+            self.records = self._build_records(sentences, {})
+        self.term_counts = Counter()
+        self.doc_freq = Counter()
+        self.totals = [0, 0, 0, 0]  # words, characters, syllables, polysyllabic words
+        _apply(self, self.records, 1)
+        self._finish()
+
+    def _build_records(self, sentences, reusable):
+        tokenize = get_tokenizer(self.tokenizer)
+        stop_words = load_stop_words()
+        return [reusable.get(s) or SentenceRecord(s, tokenize, stop_words) for s in sentences]
+
+    def _finish(self):
+        self.sentences = [record.text for record in self.records]
+        self.readability = readability_from_totals(len(self.records), *self.totals, extended=True)
+        self.scores = {}
+        self._keywords = None
+
+    def revise(self, text):
+        """The revision for the normalized `text`, re-analyzing only what changed"""
+        if text == self.text:
+            return self
+        with stage('diff'):
+            start, old_end, new_end = changed_span(self.text, text)
+            n = len(self.records)
+            if n == 0:
+                return DocumentRevision(text, self.tokenizer, self.keyword_depth)
+            shift = new_end - old_end
+            # Sentences touching the edit, widened by unchanged context on both sides
+            first = max(0, bisect_right(self.starts, start) - 1 - SPLIT_CONTEXT)
+            window_start = self.starts[first] if first > 0 else 0
+            # A sentence starting right where the edit ends has new text before it
+            edited_through = bisect_right(self.starts, old_end) - 1
+
+        context = SPLIT_CONTEXT
+        with stage('split_sentences'):
+            while True:
+                last = min(n - 1, edited_through + context)
+                if last < n - 1:
+                    window_end = self.starts[last] + len(self.records[last].text) + shift
+                else:
+                    window_end = len(text)
+                window = text[window_start:window_end]
+                sentences = sent_tokenize(window) if window.strip() else []
+                # Punkt looks past the token after a period ('.!' splits differently at the
+                # end of a text), so the window's end is only trusted once its split ends
+                # with the unchanged context sentences
+                if last == n - 1 or sentences[-SPLIT_CONTEXT:] == [
+                        record.text for record in self.records[last - SPLIT_CONTEXT + 1:last + 1]]:
+                    break
+                context *= 2
+        removed = self.records[first:last + 1]
+        with stage('tokenize'):
+            added = self._build_records(sentences, {record.text: record for record in removed})
+
+        revision = DocumentRevision.__new__(DocumentRevision)
+        revision.text = text
+        revision.tokenizer = self.tokenizer
+        revision.keyword_depth = self.keyword_depth
+        revision.records = self.records[:first] + added + self.records[last + 1:]
+        revision.starts = (self.starts[:first] + _offsets(text, sentences, window_start) +
+                           [offset + shift for offset in self.starts[last + 1:]])
+        revision.term_counts = self.term_counts.copy()
+        revision.doc_freq = self.doc_freq.copy()
+        revision.totals = list(self.totals)
+        _apply(revision, removed, -1)
+        _apply(revision, added, 1)
+        revision._finish()
+        return revision
+
+    @property
+    def content_tokens(self):
+        return [record.words for record in self.records]
+
+    @property
+    def sentence_tokens(self):
+        return [record.tokens for record in self.records]
+
+    @property
+    def signatures(self):
+        return [record.signature for record in self.records]
+
+    def score(self, method):
+        """Sentence scores for a summary method, computed once per revision"""
+        scores = self.scores.get(method)
+        if scores is None:
+            with stage(f'score_{method}'):
+                if method == 'business_insights':
+                    scores = self._business_scores()
+                elif method == 'textrank':
+                    scores = textrank_scores(self.content_tokens, self.doc_freq)
+                else:
+                    scores = self._frequency_scores()
+            self.scores[method] = scores
+        return scores
+
+    def _frequency_scores(self):
+        # Same per-word quotients, summed in the same order, as calculate_frequency_scores
+        if not self.term_counts:
+            return {}
+        max_freq = max(self.term_counts.values())
+        word_freq = {word: count / max_freq for word, count in self.term_counts.items()}
+        return {i: sum(word_freq[word] for word in record.words)
+                for i, record in enumerate(self.records)}
+
+    def _business_scores(self):
+        freq_scores = self.score('normal')
+        n = len(self.records)
+        return {i: combine_business_score(freq_scores.get(i, 0), record.features, i, n)
+                for i, record in enumerate(self.records)}
+
+    @property
+    def keywords(self):
+        """The keyword_depth best keywords by TF-IDF, as extract_keywords ranks them"""
+        if self._keywords is None:
+            with stage('keywords'):
+                n_sentences = len(self.records)
+                # Ties rank by first occurrence, as with a freshly counted document
+                order = dict.fromkeys(chain.from_iterable(self.content_tokens))
+                tfidf_scores = {
+                    word: self.term_counts[word] * log(n_sentences / (self.doc_freq[word] + 1))
+                    for word in order
+                }
+                self._keywords = top_k(tfidf_scores, self.keyword_depth)
+        return self._keywords
+
+
+def _apply(revision, records, sign):
+    """Add (sign 1) or remove (sign -1) the records' contribution to the statistics"""
+    term_counts = revision.term_counts
+    doc_freq = revision.doc_freq
+    totals = revision.totals
+    for record in records:
+        for counts, words in ((term_counts, record.words), (doc_freq, set(record.words))):
+            for word in words:
+                value = counts[word] + sign
+                if value:
+                    counts[word] = value
+                else:
+                    del counts[word]
+        for i, value in enumerate(record.readability):
+            totals[i] += sign * value
+
+
+def _offsets(text, sentences, position):
+    """Start offset in text of each sentence, searching from position"""
+    offsets = []
+    for sentence in sentences:
+        position = text.find(sentence, position)
+        offsets.append(position)
+        position += len(sentence)
+    return offsets
+
+
+def changed_span(old, new):
+    """
+    (start, old_end, new_end) such that new is old with old[start:old_end]
+    replaced by new[start:new_end]
+    """
+    # Binary searches over slice comparisons run at memcmp speed
+    low, high = 0, min(len(old), len(new))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[:mid] == new[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    start = low
+
+    low, high = 0, min(len(old), len(new)) - start
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            low = mid
+        else:
+            high = mid - 1
+    return start, len(old) - low, len(new) - low
@@ -0,0 +1,238 @@
+"""
+Text extraction for uploaded PDF, DOCX and plain-text files.
+
+A DocumentReader yields a document's text a page (PDF), paragraph (DOCX)
+or chunk (plain text) at a time, so the text is never held in memory as a
+whole and can be fed straight into a StreamingSummarizer. DOCX files are
+parsed as a stream of XML events; plain-text files at least MMAP_THRESHOLD
+bytes long are memory-mapped instead of read. PDF extraction needs the
+optional pypdf package.
+"""
+import codecs
+import io
+import mmap
+import os
+import threading
+import time
+import zipfile
+from xml.etree.ElementTree import ParseError, iterparse
+
+from instrumentation import record_stage
+from streaming import STREAM_CHUNK_BYTES
+
+# Largest file accepted by the upload endpoint, in bytes
+MAX_UPLOAD_BYTES = int(os.environ.get('SUMMAI_MAX_UPLOAD_BYTES', 50 * 1024 * 1024))
+# Characters of text extracted from one file before it is rejected
+MAX_EXTRACTED_CHARS = int(os.environ.get('SUMMAI_MAX_EXTRACTED_CHARS', 20 * 1024 * 1024))
+# Plain-text files at least this large are memory-mapped rather than read
+MMAP_THRESHOLD = int(os.environ.get('SUMMAI_MMAP_THRESHOLD', 1024 * 1024))
+# DOCX markup is several times larger than its text; anything beyond this is refused unread
+MAX_DOCX_XML_BYTES = 10 * MAX_EXTRACTED_CHARS
+
+FORMATS = ('pdf', 'docx', 'txt')
+# What one extracted piece is, per format
+UNITS = {'pdf': 'pages', 'docx': 'paragraphs', 'txt': 'chunks'}
+TEXT_EXTENSIONS = ('', '.txt', '.text', '.md')
+
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+
+class UnsupportedDocumentError(Exception):
+    """Raised for a file whose format cannot be extracted"""
+
+
+def detect_format(stream, filename=None):
+    """'pdf', 'docx' or 'txt', from the file's leading bytes and then its extension"""
+    head = stream.read(4096)
+    stream.seek(0)
+    if head.startswith(b'%PDF-'):
+        return 'pdf'
+    if head.startswith(b'PK\x03\x04'):
+        return 'docx'
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension in ('.pdf', '.docx'):
+        raise ValueError(f'File is not a valid {extension[1:].upper()} document')
+    if extension not in TEXT_EXTENSIONS or b'\x00' in head:
+        raise UnsupportedDocumentError(
+            f'Unsupported file type{" " + extension if extension else ""}; '
+            'upload a PDF, DOCX or UTF-8 text file')
+    return 'txt'
+
+
+def iter_txt(stream, size):
+    """UTF-8 text in chunks, memory-mapping large files"""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')(errors='replace')
+    fileno = _fileno(stream) if size >= MMAP_THRESHOLD else None
+    if fileno is not None:
+        with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mapped, 'madvise'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            for offset in range(0, len(mapped), STREAM_CHUNK_BYTES):
+                text = decoder.decode(mapped[offset:offset + STREAM_CHUNK_BYTES])
+                if text:
+                    yield text
+    else:
+        while True:
+            raw = stream.read(STREAM_CHUNK_BYTES)
+            if not raw:
+                break
+            text = decoder.decode(raw)
+            if text:
+                yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+
+def iter_docx(stream, size):
+    """Paragraphs of the main document body, parsed as a stream of XML events"""
+    try:
+        archive = zipfile.ZipFile(stream)
+    except zipfile.BadZipFile:
+        raise ValueError('File is not a valid DOCX document')
+    with archive:
+        try:
+            info = archive.getinfo('word/document.xml')
+        except KeyError:
+            raise UnsupportedDocumentError('ZIP archive is not a DOCX document')
+        if info.file_size > MAX_DOCX_XML_BYTES:
+            raise ValueError('DOCX document is too large to extract')
+
+        with archive.open(info) as xml:
+            body = None
+            parts = []
+            try:
+                for event, element in iterparse(xml, events=('start', 'end')):
+                    tag = element.tag
+                    if event == 'start':
+                        if tag == _W + 'body':
+                            body = element
+                    elif tag == _W + 't':
+                        parts.append(element.text or '')
+                    elif tag == _W + 'tab':
+                        parts.append('\t')
+                    elif tag in (_W + 'br', _W + 'cr'):
+                        parts.append('\n')
+                    elif tag == _W + 'p':
+                        yield ''.join(parts) + '\n'
+                        parts = []
+                        # Drop finished paragraphs so the parsed tree stays small
+                        element.clear()
+                        if body is not None:
+                            del body[:]
+            except ParseError as e:
+                raise ValueError(f'DOCX document is corrupt: {e}')
+
+
+def iter_pdf(stream, size):
+    """Text of each page in turn"""
+    try:
+        from pypdf import PdfReader
+        from pypdf.errors import PdfReadError
+    except ImportError:
+        raise UnsupportedDocumentError('PDF support requires the pypdf package; '
+                                       'install it with `pip install -r requirements.txt`')
+
+    try:
+        reader = PdfReader(stream)
+        if reader.is_encrypted and not reader.decrypt(''):
+            raise ValueError('PDF document is password protected')
+        for page in reader.pages:
+            yield (page.extract_text() or '') + '\n'
+    except PdfReadError as e:
+        raise ValueError(f'File is not a valid PDF document: {e}')
+
+
+EXTRACTORS = {'pdf': iter_pdf, 'docx': iter_docx, 'txt': iter_txt}
+
+
+def _fileno(stream):
+    try:
+        return stream.fileno()
+    except (AttributeError, OSError):
+        return None  # An in-memory upload
+
+
+def _size(stream):
+    position = stream.tell()
+    size = stream.seek(0, io.SEEK_END)
+    stream.seek(position)
+    return size
+
+
+class IngestionStats:
+    """Documents fully extracted, their bytes and their characters per format, for /api/metrics"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counts = {}  # format -> [documents, bytes, characters]
+
+    def record(self, fmt, size, characters):
+        with self.lock:
+            counts = self.counts.setdefault(fmt, [0, 0, 0])
+            counts[0] += 1
+            counts[1] += size
+            counts[2] += characters
+
+    def snapshot(self):
+        with self.lock:
+            return {fmt: list(counts) for fmt, counts in self.counts.items()}
+
+
+ingestion_stats = IngestionStats()
+
+
+class DocumentReader:
+    """
+    Iterate over the text of an uploaded file one piece at a time:
+
+        reader = DocumentReader(upload.stream, upload.filename)
+        for text in reader:
+            summarizer.feed(text)
+
+    The stream must be seekable. Time spent extracting is recorded as the
+    extract_<format> stage, apart from the work done on each piece.
+    """
+
+    def __init__(self, stream, filename=None):
+        self.stream = stream
+        self.size = _size(stream)
+        if self.size > MAX_UPLOAD_BYTES:
+            raise ValueError(f'File is larger than {MAX_UPLOAD_BYTES} bytes')
+        self.format = detect_format(stream, filename)
+        self.units = 0
+        self.characters = 0
+        self.seconds = 0.0
+
+    def __iter__(self):
+        pieces = EXTRACTORS[self.format](self.stream, self.size)
+        complete = False
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    text = next(pieces, None)
+                finally:
+                    self.seconds += time.perf_counter() - started
+                if text is None:
+                    complete = True
+                    break
+                self.units += 1
+                self.characters += len(text)
+                if self.characters > MAX_EXTRACTED_CHARS:
+                    raise ValueError(f'File contains more than {MAX_EXTRACTED_CHARS} characters of text')
+                yield text
+        finally:
+            pieces.close()
+            record_stage(f'extract_{self.format}', self.seconds)
+            if complete:
+                ingestion_stats.record(self.format, self.size, self.characters)
+
+    def info(self):
+        return {
+            'format': self.format,
+            'bytes': self.size,
+            UNITS[self.format]: self.units,
+            'characters': self.characters,
+            'extract_ms': round(self.seconds * 1000, 3)
+        }
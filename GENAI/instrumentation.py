@@ -0,0 +1,259 @@
+"""
+Per-stage latency histograms, per-request timing breakdowns and sampled
+profiling.
+
+Code marks a stage with `with stage('tokenize'):`. Durations feed in-memory
+histograms rendered in the Prometheus text format by /api/metrics, and are
+also summed into the current request's breakdown when the client asked for
+`timings`. Stages may nest, so breakdown entries can overlap. With metrics
+disabled and no breakdown requested, stage() returns a shared no-op.
+
+Metrics live in process memory: each worker process reports its own.
+"""
+import cProfile
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+# Collect stage and request histograms ('0' turns stage() into a no-op)
+METRICS_ENABLED = os.environ.get('SUMMAI_METRICS', '1') == '1'
+# Fraction of requests profiled with cProfile; 0 disables profiling
+PROFILE_SAMPLE_RATE = float(os.environ.get('SUMMAI_PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = os.environ.get('SUMMAI_PROFILE_DIR', 'profiles')
+# Profiles kept on disk; the oldest are deleted beyond this
+PROFILE_KEEP = int(os.environ.get('SUMMAI_PROFILE_KEEP', 50))
+
+# Histogram upper bounds in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Stage name -> accumulated seconds for the current request, when requested
+_request_timings = ContextVar('summai_request_timings', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram, as Prometheus expects it"""
+
+    __slots__ = ('counts', 'total', 'count')
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.total += seconds
+        self.count += 1
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+
+
+class MetricsRegistry:
+    """Stage and request histograms plus request counters for one process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.requests = {}  # endpoint -> Histogram
+        self.responses = {}  # (endpoint, status) -> count
+
+    def observe_stage(self, name, seconds):
+        with self.lock:
+            histogram = self.stages.get(name)
+            if histogram is None:
+                histogram = self.stages[name] = Histogram()
+            histogram.observe(seconds)
+
+    def observe_request(self, endpoint, status, seconds):
+        with self.lock:
+            histogram = self.requests.get(endpoint)
+            if histogram is None:
+                histogram = self.requests[endpoint] = Histogram()
+            histogram.observe(seconds)
+            key = (endpoint, status)
+            self.responses[key] = self.responses.get(key, 0) + 1
+
+    def reset(self):
+        with self.lock:
+            self.stages.clear()
+            self.requests.clear()
+            self.responses.clear()
+
+    def render(self, gauges=()):
+        """
+        Prometheus text exposition of every metric. `gauges` adds extra
+        (name, help, type, {label pairs: value}) series, such as cache counters.
+        """
+        with self.lock:
+            stages = {name: _copy(h) for name, h in self.stages.items()}
+            requests = {name: _copy(h) for name, h in self.requests.items()}
+            responses = dict(self.responses)
+
+        lines = []
+        _render_histogram(lines, 'summai_stage_duration_seconds',
+                          'Time spent in each pipeline stage', 'stage', stages)
+        _render_histogram(lines, 'summai_request_duration_seconds',
+                          'Request handling time per endpoint', 'endpoint', requests)
+        lines.append('# HELP summai_requests_total Responses per endpoint and status code')
+        lines.append('# TYPE summai_requests_total counter')
+        for (endpoint, status), count in sorted(responses.items()):
+            lines.append(f'summai_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        for name, help_text, kind, series in gauges:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, value in series.items():
+                label_text = ','.join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _copy(histogram):
+    copied = Histogram()
+    copied.counts = list(histogram.counts)
+    copied.total = histogram.total
+    copied.count = histogram.count
+    return copied
+
+
+def _render_histogram(lines, name, help_text, label, histograms):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for key, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{label}="{key}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{label}="{key}",le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{label}="{key}"}} {histogram.total:.6f}')
+        lines.append(f'{name}_count{{{label}="{key}"}} {histogram.count}')
+
+
+metrics = MetricsRegistry()
+
+
+class _Stage:
+    __slots__ = ('name', 'timings', 'started')
+
+    def __init__(self, name, timings):
+        self.name = name
+        self.timings = timings
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        if METRICS_ENABLED:
+            metrics.observe_stage(self.name, elapsed)
+        if self.timings is not None:
+            self.timings[self.name] = self.timings.get(self.name, 0.0) + elapsed
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name):
+    """Context manager timing one pipeline stage"""
+    timings = _request_timings.get()
+    if not METRICS_ENABLED and timings is None:
+        return _NO_STAGE
+    return _Stage(name, timings)
+
+
+def record_stage(name, seconds):
+    """Record a stage the caller timed itself, such as work interleaved with other stages"""
+    if METRICS_ENABLED:
+        metrics.observe_stage(name, seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+class RequestTimings:
+    """
+    Collect a per-stage breakdown for the code run inside the block:
+
+        with RequestTimings() as timings:
+            ...
+        timings.as_ms()
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self._token = None
+
+    def __enter__(self):
+        self._token = _request_timings.set(self.timings)
+        return self
+
+    def __exit__(self, *exc):
+        _request_timings.reset(self._token)
+        return False
+
+    def as_ms(self):
+        return {name: round(seconds * 1000, 3) for name, seconds in self.timings.items()}
+
+
+class RequestProfiler:
+    """
+    Profiles a random sample of requests with cProfile and writes each
+    profile to PROFILE_DIR as <endpoint>-<time>-<pid>.prof, readable with
+    pstats or snakeviz. One request is profiled at a time per process.
+    """
+
+    def __init__(self, sample_rate=PROFILE_SAMPLE_RATE, directory=PROFILE_DIR, keep=PROFILE_KEEP):
+        self.sample_rate = sample_rate
+        self.directory = directory
+        self.keep = keep
+        self._busy = threading.Lock()
+
+    def start(self):
+        """Return a running profiler if this request is sampled, else None"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler (a debugger, or one per interpreter on 3.12+) is active
+            self._busy.release()
+            return None
+        return profiler
+
+    def stop(self, profiler, endpoint):
+        profiler.disable()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            name = f'{endpoint or "unknown"}-{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}.prof'
+            profiler.dump_stats(os.path.join(self.directory, name))
+            self._prune()
+        finally:
+            self._busy.release()
+
+    def _prune(self):
+        profiles = sorted(
+            (os.path.join(self.directory, f) for f in os.listdir(self.directory) if f.endswith('.prof')),
+            key=os.path.getmtime
+        )
+        for path in profiles[:-self.keep] if self.keep > 0 else []:
+            os.remove(path)
+
+
+profiler = RequestProfiler()
@@ -0,0 +1,319 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from batch import summarize_batch, BATCH_WORKERS, MAX_BATCH_SIZE
+
+JOBS_DB = os.environ.get('SUMMAI_JOBS_DB', 'jobs.db')
+# Threads per process that claim jobs; the summarizing itself runs on the batch pool
+JOB_WORKERS = int(os.environ.get('SUMMAI_JOB_WORKERS', 2))
+# Queued jobs accepted before submissions are rejected with 429
+JOB_QUEUE_DEPTH = int(os.environ.get('SUMMAI_JOB_QUEUE_DEPTH', 100))
+# Largest number of texts in a single job
+MAX_JOB_TEXTS = int(os.environ.get('SUMMAI_MAX_JOB_TEXTS', 10 * MAX_BATCH_SIZE))
+# Seconds finished jobs and their results are kept
+JOB_TTL = float(os.environ.get('SUMMAI_JOB_TTL', 24 * 3600))
+# A running job whose process stopped reporting progress this long ago is requeued
+JOB_STALE_SECONDS = float(os.environ.get('SUMMAI_JOB_STALE_SECONDS', 600))
+# Seconds between checks for jobs submitted through other processes
+JOB_POLL_INTERVAL = float(os.environ.get('SUMMAI_JOB_POLL_INTERVAL', 1))
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = 'queued', 'running', 'completed', 'failed', 'cancelled'
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while JOB_QUEUE_DEPTH jobs are already waiting"""
+
+
+class JobLostError(Exception):
+    """Raised to a worker whose job went stale and was claimed by another worker"""
+
+
+class JobStore:
+    """
+    Jobs in a SQLite table in WAL mode. The table is also the queue: a job
+    is claimed with a conditional UPDATE, so any thread or worker process
+    sharing the database can pick it up, and queued jobs survive restarts.
+    Each claim gets a new token; progress and results are only recorded for
+    the current one, so a worker whose job was requeued cannot overwrite the
+    worker that took it over.
+    """
+
+    def __init__(self, filename=JOBS_DB):
+        self.filename = filename
+        conn = self._connect()
+        try:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS jobs ('
+                         'id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, '
+                         'params TEXT NOT NULL, total INTEGER NOT NULL, '
+                         'completed INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, '
+                         'cancel_requested INTEGER NOT NULL DEFAULT 0, '
+                         'created_at REAL NOT NULL, started_at REAL, finished_at REAL, '
+                         'heartbeat_at REAL, claim_token TEXT)')
+            conn.execute('CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)')
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+            if 'claim_token' not in columns:
+                # Databases created before claim tokens existed
+                conn.execute('ALTER TABLE jobs ADD COLUMN claim_token TEXT')
+        finally:
+            conn.close()
+
+    def _connect(self):
+        # A short-lived connection per operation is fork- and thread-safe
+        conn = sqlite3.connect(self.filename, timeout=30, isolation_level='IMMEDIATE')
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def create(self, kind, params, total, max_queued=JOB_QUEUE_DEPTH):
+        """Insert a queued job and return its id, or raise QueueFullError"""
+        job_id = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            with conn:
+                # The write lock is taken before the count, so the depth check is exact
+                conn.execute('BEGIN IMMEDIATE')
+                queued = conn.execute('SELECT COUNT(*) FROM jobs WHERE status = ?',
+                                      (QUEUED,)).fetchone()[0]
+                if queued >= max_queued:
+                    raise QueueFullError(f'{queued} jobs already queued')
+                conn.execute('INSERT INTO jobs (id, kind, status, params, total, created_at) '
+                             'VALUES (?, ?, ?, ?, ?, ?)',
+                             (job_id, kind, QUEUED, json.dumps(params), total, time.time()))
+        finally:
+            conn.close()
+        return job_id
+
+    def get(self, job_id):
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        finally:
+            conn.close()
+        return dict(row) if row else None
+
+    def claim(self, stale_seconds=JOB_STALE_SECONDS):
+        """
+        Mark the oldest queued (or abandoned running) job as running and
+        return it, with the claim_token its progress and finish must carry
+        """
+        now = time.time()
+        token = uuid.uuid4().hex
+        conn = self._connect()
+        try:
+            with conn:
+                # Without the write lock two workers could select and claim the same job
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute(
+                    'SELECT * FROM jobs WHERE status = ? OR (status = ? AND heartbeat_at < ?) '
+                    'ORDER BY created_at LIMIT 1', (QUEUED, RUNNING, now - stale_seconds)
+                ).fetchone()
+                if row is None:
+                    return None
+                conn.execute('UPDATE jobs SET status = ?, started_at = ?, heartbeat_at = ?, '
+                             'completed = 0, claim_token = ? WHERE id = ?',
+                             (RUNNING, now, now, token, row['id']))
+        finally:
+            conn.close()
+        job = dict(row)
+        job['status'] = RUNNING
+        job['claim_token'] = token
+        return job
+
+    def progress(self, job_id, completed, token):
+        """
+        Record progress and return whether cancellation was requested; raises
+        JobLostError once the job has been claimed under another token
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                updated = conn.execute(
+                    'UPDATE jobs SET completed = ?, heartbeat_at = ? '
+                    'WHERE id = ? AND status = ? AND claim_token = ?',
+                    (completed, time.time(), job_id, RUNNING, token)
+                ).rowcount
+                row = conn.execute('SELECT cancel_requested FROM jobs WHERE id = ?',
+                                   (job_id,)).fetchone()
+        finally:
+            conn.close()
+        if not updated:
+            raise JobLostError(job_id)
+        return bool(row['cancel_requested'])
+
+    def finish(self, job_id, status, token, result=None, error=None):
+        """Record the outcome of a claimed job; False when the claim is no longer current"""
+        # The input texts are no longer needed once the job is done
+        conn = self._connect()
+        try:
+            with conn:
+                updated = conn.execute(
+                    "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, "
+                    "params = '{}' WHERE id = ? AND status = ? AND claim_token = ?",
+                    (status, None if result is None else json.dumps(result), error,
+                     time.time(), job_id, RUNNING, token)
+                ).rowcount
+        finally:
+            conn.close()
+        return bool(updated)
+
+    def cancel(self, job_id):
+        """
+        Cancel a job: queued jobs stop at once, running ones at their next
+        progress check. Returns the job's status after the request, or None.
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute('SELECT status FROM jobs WHERE id = ?', (job_id,)).fetchone()
+                if row is None:
+                    return None
+                if row['status'] == QUEUED:
+                    conn.execute("UPDATE jobs SET status = ?, finished_at = ?, params = '{}' "
+                                 "WHERE id = ?", (CANCELLED, time.time(), job_id))
+                    return CANCELLED
+                if row['status'] == RUNNING:
+                    conn.execute('UPDATE jobs SET cancel_requested = 1 WHERE id = ?', (job_id,))
+                return row['status']
+        finally:
+            conn.close()
+
+    def expire(self, ttl=JOB_TTL):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute('DELETE FROM jobs WHERE status IN (?, ?, ?) AND finished_at < ?',
+                             (*FINISHED_STATES, time.time() - ttl))
+        finally:
+            conn.close()
+
+
+class JobQueue:
+    """
+    Runs summarization jobs in the background. Worker threads claim jobs
+    from the store and feed their texts to the shared batch process pool in
+    slices, recording progress and checking for cancellation between slices.
+    """
+
+    def __init__(self, store=None, workers=JOB_WORKERS, tracker=None):
+        self.store = store if store is not None else JobStore()
+        self.workers = workers
+        self.tracker = tracker
+        self._wake = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._pid = None
+        self._last_expiry = 0
+
+    def start(self):
+        """Start the worker threads of this process; cheap to call repeatedly"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._threads = [
+                    threading.Thread(target=self._run, name=f'summai-job-{i}', daemon=True)
+                    for i in range(self.workers)
+                ]
+                for thread in self._threads:
+                    thread.start()
+
+    def submit(self, texts, ratio, method, kind='batch', num_keywords=5, tokenizer=None):
+        """Queue a job and return its id; raises QueueFullError when the queue is full"""
+        params = {'texts': texts, 'ratio': ratio, 'method': method,
+                  'num_keywords': num_keywords, 'tokenizer': tokenizer}
+        job_id = self.store.create(kind, params, len(texts))
+        self.start()
+        self._wake.set()
+        return job_id
+
+    def status(self, job_id):
+        job = self.store.get(job_id)
+        if job is None:
+            return None
+        return {
+            'job_id': job['id'],
+            'kind': job['kind'],
+            'status': job['status'],
+            'total': job['total'],
+            'completed': job['completed'],
+            'progress': round(job['completed'] / job['total'] * 100, 1) if job['total'] else 0,
+            'cancel_requested': bool(job['cancel_requested']),
+            'created_at': job['created_at'],
+            'started_at': job['started_at'],
+            'finished_at': job['finished_at'],
+            'error': job['error']
+        }
+
+    def result(self, job_id):
+        """(status, results) where results is the list of per-text results once completed"""
+        job = self.store.get(job_id)
+        if job is None:
+            return None, None
+        results = json.loads(job['result']) if job['result'] else None
+        return job['status'], results
+
+    def cancel(self, job_id):
+        return self.store.cancel(job_id)
+
+    def _run(self):
+        while True:
+            try:
+                job = self.store.claim()
+            except sqlite3.Error:
+                job = None
+            if job is None:
+                self._maybe_expire()
+                self._wake.wait(JOB_POLL_INTERVAL)
+                self._wake.clear()
+                continue
+            try:
+                self._execute(job)
+            except sqlite3.Error:
+                pass  # The job stops heartbeating and is requeued once stale
+
+    def _execute(self, job):
+        params = json.loads(job['params'])
+        texts = params['texts']
+        # Slices big enough to keep every pool worker busy, small enough for timely progress
+        step = max(1, BATCH_WORKERS) * 4
+        token = job['claim_token']
+        results = []
+        try:
+            for start in range(0, len(texts), step):
+                results.extend(summarize_batch(
+                    texts[start:start + step], params['ratio'], params['method'],
+                    num_keywords=params['num_keywords'], tokenizer=params['tokenizer'],
+                    min_parallel=2, start_index=start
+                ))
+                if self.store.progress(job['id'], len(results), token):
+                    self.store.finish(job['id'], CANCELLED, token)
+                    return
+        except JobLostError:
+            return  # Another worker runs the job now and records its outcome
+        except Exception as e:
+            self.store.finish(job['id'], FAILED, token, error=str(e))
+            return
+
+        # Only the worker holding the current claim records results and analytics
+        recorded = self.store.finish(job['id'], COMPLETED, token, result=results)
+        if recorded and self.tracker is not None:
+            self.tracker.track_summaries(
+                (params['method'], r['original_length'], r['summary_length'], None)
+                for r in results if r['success']
+            )
+
+    def _maybe_expire(self):
+        now = time.monotonic()
+        if now - self._last_expiry > 60:
+            self._last_expiry = now
+            try:
+                self.store.expire()
+            except sqlite3.Error:
+                pass  # Retried on the next idle minute
@@ -0,0 +1,66 @@
+import re
+from collections import Counter
+
+# Business terms that indicate important business content. Single words are
+# matched against tokens, multi-word phrases against the sentence text
+BUSINESS_TERMS = frozenset({
+    'revenue', 'profit', 'growth', 'sales', 'market', 'customer', 'client',
+    'strategy', 'performance', 'financial', 'quarter', 'annual', 'year',
+    'increase', 'decrease', 'improve', 'decline', 'target', 'goal', 'objective',
+    'investment', 'capital', 'budget', 'cost', 'expense', 'income', 'earnings',
+    'margin', 'roi', 'return', 'value', 'stakeholder', 'shareholder', 'equity',
+    'profitability', 'efficiency', 'productivity', 'competitor',
+    'competitive', 'market share', 'pricing', 'forecast', 'projection', 'trend',
+    'metric', 'kpi', 'indicator', 'benchmark', 'milestone', 'achievement',
+    'partnership', 'acquisition', 'merger', 'expansion', 'launch', 'initiative',
+    'outcome', 'result', 'impact', 'benefit', 'advantage', 'opportunity', 'risk'
+})
+BUSINESS_KEYWORDS = frozenset(term for term in BUSINESS_TERMS if ' ' not in term)
+BUSINESS_PHRASES = frozenset(term for term in BUSINESS_TERMS if ' ' in term)
+# A phrase is a more specific signal than any one of its words, so it
+# outweighs a bare keyword
+BUSINESS_PHRASE_WEIGHT = 2
+
+# Action words signal decisions and outcomes; they match anywhere in the
+# sentence, so 'increased' also counts inside 'reincreased'
+ACTION_WORDS = frozenset({
+    'decided', 'announced', 'achieved', 'reached', 'exceeded',
+    'completed', 'launched', 'implemented', 'improved', 'increased',
+    'decreased', 'reduced', 'optimized', 'expanded', 'acquired'
+})
+
+
+def _alternation(terms, whole_words=False):
+    """One compiled regex matching any of the terms, longest first"""
+    parts = [r'\s+'.join(map(re.escape, term.split()))
+             for term in sorted(terms, key=len, reverse=True)]
+    pattern = '|'.join(parts)
+    if whole_words:
+        pattern = r'\b(?:' + pattern + r')\b'
+    return re.compile(pattern, re.IGNORECASE)
+
+
+BUSINESS_PHRASE_PATTERN = _alternation(BUSINESS_PHRASES, whole_words=True)
+ACTION_PATTERN = _alternation(ACTION_WORDS)
+
+
+def count_business_terms(sentence, tokens):
+    """
+    Business keywords among the lowercased tokens plus phrase occurrences in
+    the sentence, each phrase weighted BUSINESS_PHRASE_WEIGHT. A keyword
+    token covered by a matched phrase ('market' in 'market share') counts
+    only as part of the phrase.
+    """
+    keywords = Counter(token for token in tokens if token in BUSINESS_KEYWORDS)
+    count = 0
+    if BUSINESS_PHRASES:
+        for match in BUSINESS_PHRASE_PATTERN.finditer(sentence):
+            count += BUSINESS_PHRASE_WEIGHT
+            for word in match.group().lower().split():
+                if keywords[word] > 0:
+                    keywords[word] -= 1
+    return count + sum(keywords.values())
+
+
+def has_action_word(sentence):
+    return ACTION_PATTERN.search(sentence) is not None
@@ -0,0 +1,96 @@
+"""
+Redundancy-aware sentence selection.
+
+Each sentence gets a MinHash signature of its set of words, stopwords and
+punctuation aside: for each of NUM_HASHES hash functions, the smallest
+hash of any of its words. The share of positions where two signatures
+agree estimates the Jaccard similarity of the two word sets. Signatures
+are split into LSH bands, so near-duplicates are found by bucket lookups
+rather than by comparing every pair of sentences.
+
+Selection walks the sentences best first, as top-k does, but skips any
+sentence whose estimated similarity to one already chosen reaches
+DEDUP_THRESHOLD: the greedy, thresholded form of maximal marginal
+relevance. Only chosen sentences sharing a band bucket with a candidate
+are compared with it, so each step costs a few lookups.
+"""
+import hashlib
+import os
+import string
+from array import array
+from functools import lru_cache
+from operator import eq
+
+from resources import stop_words
+
+# Skip near-duplicate sentences when selecting a summary ('0' selects plain top-k)
+DEDUP_ENABLED = os.environ.get('SUMMAI_DEDUP', '1') == '1'
+# Documents shorter than this rarely repeat themselves and are selected by plain top-k
+DEDUP_MIN_SENTENCES = int(os.environ.get('SUMMAI_DEDUP_MIN_SENTENCES', 20))
+# Estimated Jaccard similarity of word sets at which a sentence counts as a near-duplicate
+DEDUP_THRESHOLD = float(os.environ.get('SUMMAI_DEDUP_THRESHOLD', 0.8))
+
+# One 64-byte blake2b digest gives 32 16-bit hash values per word
+NUM_HASHES = 32
+# 8 bands of 4 values: pairs at 0.8 similarity share a bucket 98% of the time, at 0.3 only 6%
+BANDS = 8
+BAND_BYTES = NUM_HASHES // BANDS * 2
+
+PUNCTUATION = frozenset(string.punctuation)
+
+
+def dedup_applies(n_sentences):
+    """Whether a document of n_sentences is selected with redundancy checks"""
+    return DEDUP_ENABLED and n_sentences >= DEDUP_MIN_SENTENCES
+
+
+@lru_cache(maxsize=65536)
+def _word_hashes(word):
+    # blake2b rather than hash(), so signatures agree across processes; an array
+    # of 16-bit values is a tenth the size of a tuple of int objects
+    return array('H', hashlib.blake2b(word.encode('utf-8'), digest_size=NUM_HASHES * 2).digest())
+
+
+def sentence_signature(tokens):
+    """MinHash signature of a sentence's words as bytes; empty when it has none"""
+    # Stopwords are in nearly every sentence and would make unrelated sentences look alike
+    words = set(tokens) - PUNCTUATION - stop_words()
+    if not words:
+        return b''
+    return array('H', map(min, zip(*map(_word_hashes, words)))).tobytes()
+
+
+def sentence_signatures(sentence_tokens):
+    return [sentence_signature(tokens) for tokens in sentence_tokens]
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the word sets behind two signatures"""
+    return sum(map(eq, array('H', a), array('H', b))) / NUM_HASHES
+
+
+def select_diverse(ranked, signatures, k, threshold=DEDUP_THRESHOLD):
+    """
+    Up to k indices from `ranked` (best first), skipping each one that is a
+    near-duplicate of an index already chosen. `signatures` maps an index
+    to its signature.
+    """
+    min_matches = threshold * NUM_HASHES
+    chosen = []
+    chosen_values = {}  # chosen index -> signature values
+    buckets = [{} for _ in range(BANDS)]  # per band: band bytes -> chosen indices
+    for i in ranked:
+        signature = signatures[i]
+        if signature:
+            keys = [signature[band * BAND_BYTES:(band + 1) * BAND_BYTES] for band in range(BANDS)]
+            colliding = {j for band, key in enumerate(keys) for j in buckets[band].get(key, ())}
+            values = array('H', signature)
+            if any(sum(map(eq, values, chosen_values[j])) >= min_matches for j in colliding):
+                continue
+            for band, key in enumerate(keys):
+                buckets[band].setdefault(key, []).append(i)
+            chosen_values[i] = values
+        chosen.append(i)
+        if len(chosen) == k:
+            break
+    return chosen
@@ -0,0 +1,210 @@
+"""
+NLTK data location, lazy loading and warm-up.
+
+Nothing here imports NLTK or touches its data at import time. The punkt
+tokenizer and stopword corpus are loaded by warm_up(), which runs at startup
+(in the background by default), before workers fork when the server preloads
+the app, or on the first request that needs them.
+
+Run `python resources.py` at build time to bundle the data into nltk_data/
+so that neither startup nor the first request needs the network. Warm-up
+fails when data is missing unless SUMMAI_NLTK_DOWNLOAD=1.
+"""
+import os
+import sys
+import threading
+import time
+
+# Searched before NLTK's default locations; bundled data lives here
+NLTK_DATA_DIR = os.environ.get(
+    'SUMMAI_NLTK_DATA', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'nltk_data')
+)
+# Download missing data into NLTK_DATA_DIR during warm-up instead of failing.
+# Off by default: missing data is a build error, not something to fetch at startup
+NLTK_DOWNLOAD = os.environ.get('SUMMAI_NLTK_DOWNLOAD', '0') == '1'
+# 'background' warms up in a thread at startup, 'eager' blocks startup until
+# ready (use with preloading servers), 'lazy' waits for the first request
+WARMUP_MODE = os.environ.get('SUMMAI_WARMUP', 'background')
+
+# (resource path, download package) needed by the summarizer
+NLTK_RESOURCES = (
+    ('tokenizers/punkt_tab', 'punkt_tab'),
+    ('corpora/stopwords', 'stopwords'),
+)
+
+_WARMUP_TEXT = 'Revenue grew 12% this quarter. The team launched two products.'
+
+IMPORTED_AT = time.monotonic()
+
+_lock = threading.RLock()
+_tokenizers = None  # (sent_tokenize, word_tokenize, span_tokenize)
+_stop_words = None
+
+state = {
+    'status': 'cold',  # cold -> warming -> ready | failed
+    'error': None,
+    'timings_ms': {},
+    'preloaded': False,
+    'pid': os.getpid()
+}
+
+
+def record_timing(name, started):
+    """Store the milliseconds elapsed since `started` (a time.monotonic() value)"""
+    state['timings_ms'][name] = round((time.monotonic() - started) * 1000, 1)
+
+
+def ensure_nltk_data():
+    """Make the bundled data directory searchable and check every resource is present"""
+    import nltk
+
+    if os.path.isdir(NLTK_DATA_DIR) and NLTK_DATA_DIR not in nltk.data.path:
+        nltk.data.path.insert(0, NLTK_DATA_DIR)
+
+    for path, package in NLTK_RESOURCES:
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            if not NLTK_DOWNLOAD:
+                raise LookupError(
+                    f'NLTK resource {path!r} not found; run `python resources.py` '
+                    f'to bundle it into {NLTK_DATA_DIR}, or set SUMMAI_NLTK_DOWNLOAD=1'
+                )
+            download(package)
+
+
+def download(package, download_dir=NLTK_DATA_DIR):
+    import nltk
+
+    os.makedirs(download_dir, exist_ok=True)
+    if not nltk.download(package, download_dir=download_dir, quiet=True):
+        raise LookupError(f'Could not download NLTK resource {package!r}')
+    if download_dir not in nltk.data.path:
+        nltk.data.path.insert(0, download_dir)
+
+
+def warm_up():
+    """
+    Load the tokenizer models and stopwords once per process. Safe to call
+    repeatedly and from several threads; returns the readiness state.
+    """
+    global _tokenizers, _stop_words
+
+    with _lock:
+        if state['status'] == 'ready':
+            return state
+        state['status'] = 'warming'
+        state['error'] = None
+        started = time.monotonic()
+        try:
+            step = time.monotonic()
+            from nltk.corpus import stopwords
+            from nltk.tokenize import PunktTokenizer, word_tokenize
+            record_timing('import_nltk', step)
+
+            step = time.monotonic()
+            ensure_nltk_data()
+            record_timing('find_data', step)
+
+            # The first call unpickles punkt and compiles the tokenizer regexes
+            step = time.monotonic()
+            # The model nltk.sent_tokenize loads, kept so sentences can also be split into offsets
+            punkt = PunktTokenizer('english')
+            punkt.tokenize(_WARMUP_TEXT)
+            word_tokenize(_WARMUP_TEXT.lower(), preserve_line=True)
+            record_timing('load_tokenizers', step)
+
+            step = time.monotonic()
+            _stop_words = frozenset(stopwords.words('english'))
+            record_timing('load_stopwords', step)
+
+            _tokenizers = (punkt.tokenize, word_tokenize, punkt.span_tokenize)
+            record_timing('warm_up', started)
+            state['timings_ms']['ready_since_import'] = round(
+                (time.monotonic() - IMPORTED_AT) * 1000, 1)
+            state['status'] = 'ready'
+        except Exception as e:
+            state['status'] = 'failed'
+            state['error'] = str(e)
+            raise
+        return state
+
+
+def start_warm_up(mode=WARMUP_MODE):
+    """Begin warming up according to the configured mode"""
+    if mode == 'eager':
+        warm_up()
+        state['preloaded'] = True
+    elif mode == 'background':
+        threading.Thread(target=_warm_up_quietly, name='summai-warmup', daemon=True).start()
+
+
+def _warm_up_quietly():
+    try:
+        warm_up()
+    except Exception:
+        # Reported through the readiness state; requests retry the warm-up
+        pass
+
+
+def _after_fork_in_child():
+    # A warm-up thread does not survive fork; a child that forked mid-warm-up
+    # must not wait on its lock, and loads again on first use
+    global _lock
+    _lock = threading.RLock()
+    state['pid'] = os.getpid()
+    if state['status'] != 'ready':
+        state['status'] = 'cold'
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def is_ready():
+    return state['status'] == 'ready'
+
+
+def get_status():
+    return {
+        'ready': is_ready(),
+        'status': state['status'],
+        'error': state['error'],
+        'preloaded': state['preloaded'],
+        'pid': state['pid'],
+        'timings_ms': dict(state['timings_ms'])
+    }
+
+
+def _loaded_tokenizers():
+    if _tokenizers is None:
+        warm_up()
+    return _tokenizers
+
+
+def sent_tokenize(text):
+    return _loaded_tokenizers()[0](text)
+
+
+def sent_spans(text):
+    """(start, end) offsets of each sentence of the text, as sent_tokenize would split it"""
+    return _loaded_tokenizers()[2](text)
+
+
+def word_tokenize(text, preserve_line=False):
+    return _loaded_tokenizers()[1](text, preserve_line=preserve_line)
+
+
+def stop_words():
+    """NLTK's English stopwords as a frozen set shared by every document"""
+    if _stop_words is None:
+        warm_up()
+    return _stop_words
+
+
+if __name__ == '__main__':
+    # Bundle the data: python resources.py [target directory]
+    target = sys.argv[1] if len(sys.argv) > 1 else NLTK_DATA_DIR
+    for _, package in NLTK_RESOURCES:
+        download(package, target)
+        print(f'{package} -> {target}')
@@ -20,6 +20,8 @@ const summaryText = document.getElementById("summaryText")
 const methodHint = document.getElementById("methodHint")
 
 let currentMethod = "normal"
+// Identifies this page's text to the server, which then re-analyzes only edited sentences
+const documentId = Date.now().toString(36) + Math.random().toString(36).slice(2)
 
 function initTheme() {
   const saved = localStorage.getItem("theme")
@@ -80,6 +82,7 @@ const methodBtns = document.querySelectorAll(".method-btn")
 const methodHints = {
   normal: "Standard summarization method",
   business_insights: "Business summary focused on key metrics, financial data, and strategic insights",
+  textrank: "Picks the sentences most similar to the rest of the text",
 }
 
 methodBtns.forEach((btn) => {
@@ -112,6 +115,7 @@ summarizeBtn.addEventListener("click", async () => {
         text: text,
         ratio: summaryRatio.value,
         method: currentMethod,
+        document_id: documentId,
       }),
     })
 
@@ -231,6 +235,7 @@ async function loadAnalytics() {
       const methodLabels = {
         normal: "Normal",
         business_insights: "Business Insights",
+        textrank: "TextRank",
         // Legacy method names (for backward compatibility - will be migrated on server)
         frequency: "Frequency",
         tfidf: "TF-IDF",
@@ -0,0 +1,253 @@
+import codecs
+import json
+import os
+from collections import Counter
+from math import log
+
+from redundancy import dedup_applies, select_diverse, sentence_signature
+from resources import sent_tokenize, stop_words
+from summarizer import (
+    normalize_text, content_words, ranked_keys, top_k, business_sentence_features,
+    combine_business_score, readability_totals, readability_from_totals
+)
+from textrank import textrank_scores
+from tokenization import get_tokenizer
+
+# Bytes read from the request body per chunk
+STREAM_CHUNK_BYTES = int(os.environ.get('SUMMAI_STREAM_CHUNK_BYTES', 64 * 1024))
+# Buffered text is only segmented once it reaches this many characters
+STREAM_SEGMENT_CHARS = int(os.environ.get('SUMMAI_STREAM_SEGMENT_CHARS', 64 * 1024))
+# A "sentence" without any boundary is cut off at this length
+STREAM_MAX_SENTENCE_CHARS = int(os.environ.get('SUMMAI_STREAM_MAX_SENTENCE_CHARS', 1024 * 1024))
+# Longest NDJSON line accepted; longer lines are rejected rather than buffered
+STREAM_MAX_LINE_CHARS = int(os.environ.get('SUMMAI_STREAM_MAX_LINE_CHARS', 1024 * 1024))
+# Candidate sentences kept for the final selection; also caps the summary length
+STREAM_CANDIDATES = int(os.environ.get('SUMMAI_STREAM_CANDIDATES', 500))
+# Distinct terms tracked before the rarest ones are pruned
+STREAM_MAX_TERMS = int(os.environ.get('SUMMAI_STREAM_MAX_TERMS', 200000))
+
+
+class SentenceSegmenter:
+    """
+    Incremental sentence splitting. The last sentence of the buffer is held
+    back until more text arrives, since a chunk boundary may cut it short.
+    """
+
+    def __init__(self, segment_chars=STREAM_SEGMENT_CHARS, max_sentence_chars=STREAM_MAX_SENTENCE_CHARS):
+        self.segment_chars = segment_chars
+        self.max_sentence_chars = max_sentence_chars
+        self.buffer = ''
+
+    def feed(self, chunk):
+        """Add text and return the sentences that are now complete"""
+        self.buffer += chunk
+        if len(self.buffer) < self.segment_chars:
+            return []
+        return self._split(final=False)
+
+    def close(self):
+        """Return every remaining sentence"""
+        return self._split(final=True)
+
+    def _split(self, final):
+        ends_with_space = self.buffer[-1:].isspace()
+        text = normalize_text(self.buffer)
+        sentences = sent_tokenize(text) if text else []
+        if final or not sentences:
+            self.buffer = ''
+            return sentences
+
+        carry = sentences.pop()
+        if len(carry) > self.max_sentence_chars:
+            sentences.append(carry)
+            carry = ''
+        # Keep the word boundary that normalization stripped from the end
+        self.buffer = carry + (' ' if ends_with_space and carry else '')
+        return sentences
+
+
+class StreamingSummarizer:
+    """
+    Summarizes text fed in chunks with roughly constant memory: running term
+    and sentence-frequency counts, readability totals and a bounded buffer
+    of candidate sentences, compacted against the running counts whenever
+    it doubles in size.
+    """
+
+    def __init__(self, summary_ratio=40, method='normal', max_candidates=STREAM_CANDIDATES,
+                 max_terms=STREAM_MAX_TERMS, tokenizer=None):
+        self.summary_ratio = summary_ratio
+        self.method = method
+        self.tokenize = get_tokenizer(tokenizer)
+        self.max_candidates = max_candidates
+        self.max_terms = max_terms
+        self.stop_words = stop_words()
+        self.segmenter = SentenceSegmenter()
+
+        self.term_counts = Counter()
+        self.doc_freq = Counter()
+        self.max_count = 0
+        self.sentence_count = 0
+        self.word_count = 0
+        self.readability = [0, 0, 0, 0]  # words, characters, syllables, polysyllabic words
+        # (position, sentence, content tokens, business features)
+        self.candidates = []
+
+    def feed(self, chunk):
+        for sentence in self.segmenter.feed(chunk):
+            self._add_sentence(sentence)
+
+    def _add_sentence(self, sentence):
+        tokens = self.tokenize(sentence)
+        words = content_words(tokens, self.stop_words)
+
+        self.word_count += len(sentence.split())
+        for i, value in enumerate(readability_totals(Counter(tokens))):
+            self.readability[i] += value
+
+        term_counts = self.term_counts
+        for word in words:
+            term_counts[word] += 1
+            if term_counts[word] > self.max_count:
+                self.max_count = term_counts[word]
+        self.doc_freq.update(set(words))
+        if len(term_counts) > self.max_terms:
+            self._prune_terms()
+
+        features = None
+        if self.method == 'business_insights':
+            features = business_sentence_features(sentence, tokens)
+        self.candidates.append((self.sentence_count, sentence, words, features))
+        self.sentence_count += 1
+
+        if len(self.candidates) >= 2 * self.max_candidates:
+            self.candidates = self._best_candidates(self.max_candidates)
+
+    def _prune_terms(self):
+        """Drop the rarest terms until the vocabulary is back under 80% of the cap"""
+        threshold = 1
+        while len(self.term_counts) > self.max_terms * 0.8:
+            for word in [w for w, c in self.term_counts.items() if c <= threshold]:
+                del self.term_counts[word]
+                self.doc_freq.pop(word, None)
+            threshold += 1
+
+    def _score(self, candidate, n_sentences):
+        position, _, words, features = candidate
+        max_count = self.max_count
+        score = (sum(self.term_counts.get(word, 0) / max_count for word in words)
+                 if max_count else 0)
+        if features is not None:
+            score = combine_business_score(score, features, position, n_sentences)
+        return score
+
+    def _best_candidates(self, k):
+        """The k best candidates under the current counts, in document order"""
+        # Positions are scored against the sentences seen so far
+        n_sentences = max(self.sentence_count, 1)
+        scores = {i: self._score(c, n_sentences) for i, c in enumerate(self.candidates)}
+        best = top_k(scores, k)
+        best.sort()
+        return [self.candidates[i] for i in best]
+
+    def keywords(self, num_keywords=8):
+        n_sentences = self.sentence_count
+        tfidf_scores = {
+            word: count * log(n_sentences / (self.doc_freq[word] + 1))
+            for word, count in self.term_counts.items()
+        }
+        return top_k(tfidf_scores, num_keywords)
+
+    def close(self, num_keywords=8):
+        """Finish the stream and return a result shaped like /api/summarize"""
+        for sentence in self.segmenter.close():
+            self._add_sentence(sentence)
+
+        if self.word_count < 3 or not self.sentence_count:
+            return {
+                'success': False,
+                'message': 'Text must contain at least 3 words',
+                'summary': '',
+                'original_length': self.word_count,
+                'summary_length': 0
+            }
+
+        summary_count = max(1, int(self.sentence_count * (self.summary_ratio / 100)))
+        summary_count = min(summary_count, self.max_candidates)
+        if self.method == 'textrank':
+            # The graph links the candidates kept by frequency, weighted by the whole stream's IDF
+            pool = self._best_candidates(self.max_candidates)
+            scores = textrank_scores([c[2] for c in pool], self.doc_freq, self.sentence_count)
+        else:
+            pool = self.candidates
+            n_sentences = max(self.sentence_count, 1)
+            scores = {i: self._score(c, n_sentences) for i, c in enumerate(pool)}
+        if dedup_applies(self.sentence_count):
+            signatures = [sentence_signature(self.tokenize(c[1])) for c in pool]
+            chosen = select_diverse(ranked_keys(scores), signatures, summary_count)
+        else:
+            chosen = top_k(scores, summary_count)
+        summary_sentences = [pool[i][1] for i in sorted(chosen)]
+        summary = ' '.join(summary_sentences)
+        summary_length = len(summary.split())
+
+        return {
+            'success': True,
+            'summary': summary,
+            'original_length': self.word_count,
+            'summary_length': summary_length,
+            'sentence_count_original': self.sentence_count,
+            'sentence_count_summary': len(summary_sentences),
+            'compression_ratio': round(summary_length / self.word_count * 100, 1),
+            'method': self.method,
+            'keywords': self.keywords(num_keywords),
+            'readability': readability_from_totals(self.sentence_count, *self.readability),
+            'streamed': True
+        }
+
+
+def iter_text_chunks(stream, ndjson=False, chunk_bytes=STREAM_CHUNK_BYTES,
+                     max_line_chars=STREAM_MAX_LINE_CHARS):
+    """
+    Decode a request body into text chunks without reading it whole. NDJSON
+    bodies carry one {"text": ...} object (or JSON string) per line; a line
+    longer than max_line_chars raises ValueError.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    # Pieces of the line still waiting for its newline; only new text is searched
+    partial = []
+    partial_chars = 0
+    while True:
+        raw = stream.read(chunk_bytes)
+        text = decoder.decode(raw, final=not raw)
+        if not ndjson:
+            if text:
+                yield text
+        else:
+            lines = []
+            start = 0
+            end = text.find('\n')
+            while end != -1:
+                partial.append(text[start:end])
+                lines.append(''.join(partial))
+                partial = []
+                partial_chars = 0
+                start = end + 1
+                end = text.find('\n', start)
+            if start < len(text):
+                partial.append(text[start:])
+                partial_chars += len(text) - start
+            if not raw:
+                lines.append(''.join(partial))
+            if partial_chars > max_line_chars or any(len(line) > max_line_chars for line in lines):
+                raise ValueError(f'NDJSON lines must be at most {max_line_chars} characters')
+            for line in lines:
+                if line.strip():
+                    record = json.loads(line)
+                    text = record.get('text', '') if isinstance(record, dict) else record
+                    if not isinstance(text, str):
+                        raise ValueError('each NDJSON line must be a JSON string or an object '
+                                         'whose "text" is a string')
+                    yield text + '\n'
+        if not raw:
+            break
@@ -0,0 +1,612 @@
+import heapq
+import os
+import string
+import re
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Sequence
+from functools import lru_cache
+from itertools import chain, compress
+from math import fsum, isfinite, log, sqrt
+
+from instrumentation import stage
+from lexicon import count_business_terms, has_action_word
+from redundancy import dedup_applies, select_diverse, sentence_signatures
+from resources import sent_spans, stop_words as load_stop_words
+from textrank import textrank_scores
+from tokenization import get_tokenizer, resolve_tokenizer
+
+# 'python' scores with dicts and Counters, 'numpy' with a vectorized term matrix
+SCORING_BACKEND = os.environ.get('SUMMAI_SCORING_BACKEND', 'python')
+
+if SCORING_BACKEND == 'numpy':
+    import vectorized
+
+# Numbers, percentages and dollar amounts mark financial metrics
+NUMBER_PATTERN = re.compile(r'\d+[%$]?|\$\d+')
+# Two whitespace characters in a row, or one that is not a plain space
+UNNORMALIZED_WHITESPACE = re.compile(r'\s\s|[^\S ]')
+# Each run of vowels is one syllable
+VOWEL_GROUPS = re.compile(r'[aeiouy]+')
+# Tokens with a letter or digit are words; punctuation tokens are not
+WORD_CHARACTER = re.compile(r'[^\W_]')
+# Distinct tokens whose readability counts are remembered
+SYLLABLE_CACHE_SIZE = 65536
+# Metrics calculate_readability_metrics adds when asked for extended metrics
+EXTENDED_READABILITY = ('flesch_reading_ease', 'smog_index')
+# Inputs of the business insights score, and the weight of each in the sum
+BUSINESS_FEATURES = ('frequency', 'keywords', 'numbers', 'actions', 'position', 'length')
+BUSINESS_WEIGHTS = (0.4, 0.2, 0.2, 0.1, 0.05, 0.05)
+
+
+def normalize_text(text):
+    """Collapse runs of whitespace into single spaces"""
+    text = text or ''
+    # Text that is already normalized is returned as is rather than split into a list of words
+    if not UNNORMALIZED_WHITESPACE.search(text) and text[:1] != ' ' and text[-1:] != ' ':
+        return text
+    # str.split() finds the same whitespace as \s+ and is several times faster than re.sub
+    return ' '.join(text.split())
+
+
+def tokenize_sentence(sentence, tokenizer=None):
+    """Lowercased word tokens of a single sentence, split by the named tokenizer"""
+    return get_tokenizer(tokenizer)(sentence)
+
+
+def content_words(tokens, stop_words):
+    """Tokens that carry meaning: no stopwords, punctuation or words of two letters or fewer"""
+    return [w for w in tokens if len(w) > 2 and w not in stop_words and w not in string.punctuation]
+
+
+class SentenceSpans(Sequence):
+    """
+    The sentences of a text as (start, end) offsets into it. Only the
+    sentences actually read are sliced out, instead of a second copy of
+    the whole text being held as a list of strings.
+    """
+    __slots__ = ('text', 'bounds')
+
+    def __init__(self, text, spans):
+        self.text = text
+        self.bounds = array('I', chain.from_iterable(spans))  # start, end of each sentence
+
+    def __len__(self):
+        return len(self.bounds) // 2
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return self.text[self.bounds[2 * i]:self.bounds[2 * i + 1]]
+
+    def __iter__(self):
+        text = self.text
+        for start, end in zip(self.bounds[::2], self.bounds[1::2]):
+            yield text[start:end]
+
+    def __sizeof__(self):
+        return object.__sizeof__(self) + sys.getsizeof(self.text) + sys.getsizeof(self.bounds)
+
+
+class TokenLists(Sequence):
+    """
+    Token lists of every sentence, stored as ids into a vocabulary of
+    distinct words: one array('I') of the ids of all sentences, in which
+    sentence i is ids[offsets[i]:offsets[i + 1]]. Indexing or iterating
+    builds a sentence's list of words on demand from the shared strings.
+    """
+    __slots__ = ('vocabulary', 'ids', 'offsets')
+
+    def __init__(self, vocabulary, ids, offsets):
+        self.vocabulary = vocabulary
+        self.ids = ids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        return list(map(self.vocabulary.__getitem__, self.ids[self.offsets[i]:self.offsets[i + 1]]))
+
+    def __iter__(self):
+        word = self.vocabulary.__getitem__
+        ids = self.ids
+        for start, end in zip(self.offsets, self.offsets[1:]):
+            yield list(map(word, ids[start:end]))
+
+    def __sizeof__(self):
+        # The vocabulary is shared between a document's token lists and counted by neither
+        return object.__sizeof__(self) + sys.getsizeof(self.ids) + sys.getsizeof(self.offsets)
+
+
+class AnalyzedDocument:
+    """
+    Tokenized view of a text, built once per request and shared by the
+    scorers, keyword extraction and readability metrics so that NLTK only
+    tokenizes the text a single time.
+
+    Each distinct word is stored once in `vocabulary`, in order of first
+    occurrence; sentence_tokens and content_tokens are TokenLists of ids
+    into it and sentences are offsets into the normalized text, so a
+    document takes a few bytes per token rather than a string object each.
+    """
+
+    def __init__(self, text, stop_words=None, tokenizer=None):
+        with stage('normalize'):
+            self.text = normalize_text(text)
+        self.stop_words = stop_words if stop_words is not None else load_stop_words()
+        self.tokenizer = resolve_tokenizer(tokenizer)
+        with stage('split_sentences'):
+            self.sentences = SentenceSpans(self.text, sent_spans(self.text) if self.text else ())
+        with stage('tokenize'):
+            tokenize = get_tokenizer(self.tokenizer)
+            word_ids = {}
+            ids = array('I')
+            offsets = array('I', [0])
+            for sentence in self.sentences:
+                # Repeated words resolve to the first string seen; the tokenizer's copies are dropped
+                ids.extend([word_ids.setdefault(token, len(word_ids)) for token in tokenize(sentence)])
+                offsets.append(len(ids))
+            self.vocabulary = list(word_ids)
+            self.sentence_tokens = TokenLists(self.vocabulary, ids, offsets)
+
+            is_content = list(map(self.is_content_word, self.vocabulary)).__getitem__
+            content_ids = array('I')
+            content_offsets = array('I', [0])
+            for start, end in zip(offsets, offsets[1:]):
+                sentence_ids = ids[start:end]
+                content_ids.extend(compress(sentence_ids, map(is_content, sentence_ids)))
+                content_offsets.append(len(content_ids))
+            self.content_tokens = TokenLists(self.vocabulary, content_ids, content_offsets)
+
+            self.term_counts = Counter(map(self.vocabulary.__getitem__, content_ids))
+        self._signatures = None
+
+    def is_content_word(self, word):
+        return len(word) > 2 and word not in self.stop_words and word not in string.punctuation
+
+    def token_counts(self):
+        """Occurrences of every token, punctuation included, counted without listing the tokens"""
+        return Counter(map(self.vocabulary.__getitem__, self.sentence_tokens.ids))
+
+    @property
+    def signatures(self):
+        """MinHash signature of each sentence, for redundancy-aware selection"""
+        if self._signatures is None:
+            self._signatures = sentence_signatures(self.sentence_tokens)
+        return self._signatures
+
+
+def _as_document(text_or_doc):
+    if isinstance(text_or_doc, AnalyzedDocument):
+        return text_or_doc
+    return AnalyzedDocument(text_or_doc)
+
+
+SUMMARY_METHODS = ('normal', 'business_insights', 'textrank')
+
+
+def score_sentences(doc, method):
+    """Score every sentence of the document with the given summarization method"""
+    with stage(f'score_{method}'):
+        if method == 'business_insights':
+            return calculate_business_insights_scores(doc)
+        if method == 'textrank':
+            return calculate_textrank_scores(doc)
+        return calculate_frequency_scores(doc)  # normal
+
+def top_k(scores, k):
+    """
+    Keys of the k highest values in a score dict, highest first. Ties keep
+    insertion order, exactly like sorted(..., reverse=True)[:k], but only a
+    k-sized heap is maintained instead of sorting every entry.
+    """
+    if k * 4 >= len(scores):
+        # Sorting wins when most entries are kept anyway
+        return sorted(scores, key=scores.__getitem__, reverse=True)[:k]
+    return heapq.nlargest(k, scores, key=scores.__getitem__)
+
+def ranked_keys(scores):
+    """
+    Keys of a score dict, highest first, in the order top_k gives. The heap
+    is built in linear time and popped only as far as the caller iterates,
+    so taking the first few keys costs O(n + k log n) rather than a sort.
+    """
+    heap = [(-value, position, key) for position, (key, value) in enumerate(scores.items())]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[2]
+
+def summary_indices(n_sentences, sentence_scores, summary_ratio, signatures=None):
+    """
+    Indices of the top-scoring sentences for the ratio, in original order.
+    With the sentences' MinHash `signatures`, near-duplicates of a sentence
+    already picked are passed over for the next best.
+    """
+    summary_count = max(1, int(n_sentences * (summary_ratio / 100)))
+
+    if sentence_scores:
+        if signatures is not None:
+            sorted_indices = select_diverse(ranked_keys(sentence_scores), signatures, summary_count)
+        else:
+            sorted_indices = top_k(sentence_scores, summary_count)
+        sorted_indices.sort()  # Maintain original order
+        return sorted_indices
+    return list(range(min(summary_count, n_sentences)))
+
+def select_summary(sentences, sentence_scores, summary_ratio, signatures=None):
+    """Pick the top-scoring sentences for the ratio, in original order"""
+    return [sentences[i] for i in summary_indices(len(sentences), sentence_scores,
+                                                  summary_ratio, signatures)]
+
+def validate_text(text):
+    """Return the error result for input too short to summarize, or None"""
+    if not text or len(text.strip()) == 0:
+        return {
+            'success': False,
+            'message': 'Please enter some text to summarize',
+            'summary': '',
+            'original_length': 0,
+            'summary_length': 0
+        }
+
+    word_count = len(text.split())
+    if word_count < 3:
+        return {
+            'success': False,
+            'message': 'Text must contain at least 3 words',
+            'summary': '',
+            'original_length': word_count,
+            'summary_length': 0
+        }
+    return None
+
+def generate_summary(text, summary_ratio=0.4, method='normal', doc=None, sentence_scores=None):
+    """
+    Generate summary using multiple methods
+
+    Methods:
+    - normal: Standard word frequency-based summarization
+    - business_insights: Enhanced summarization with business-focused insights
+    - textrank: Sentences most similar to the rest of the document (graph centrality)
+
+    Pass a prebuilt AnalyzedDocument as `doc` to reuse its tokenization, and
+    precomputed `sentence_scores` for it to skip scoring altogether.
+    """
+
+    error = validate_text(text)
+    if error:
+        return error
+
+    # Clean text
+    text = normalize_text(text)
+
+    try:
+        if doc is None:
+            doc = AnalyzedDocument(text)
+        sentences = doc.sentences
+
+        if len(sentences) == 0:
+            return {
+                'success': False,
+                'message': 'No sentences found in text',
+                'summary': '',
+                'original_length': 0,
+                'summary_length': 0
+            }
+
+        if sentence_scores is None:
+            sentence_scores = score_sentences(doc, method)
+
+        # Select sentences based on ratio
+        with stage('select'):
+            signatures = doc.signatures if dedup_applies(len(sentences)) else None
+            summary_sentences = select_summary(sentences, sentence_scores, summary_ratio, signatures)
+
+        summary = ' '.join(summary_sentences)
+        original_length = len(text.split())
+        summary_length = len(summary.split())
+
+        return {
+            'success': True,
+            'summary': summary,
+            'original_length': original_length,
+            'summary_length': summary_length,
+            'sentence_count_original': len(sentences),
+            'sentence_count_summary': len(summary_sentences),
+            'compression_ratio': round((summary_length / original_length) * 100, 1) if original_length else 0,
+            'method': method
+        }
+
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f'Error processing text: {str(e)}',
+            'summary': '',
+            'original_length': 0,
+            'summary_length': 0
+        }
+
+def calculate_frequency_scores(doc):
+    """Original frequency-based scoring"""
+    if SCORING_BACKEND == 'numpy':
+        return vectorized.frequency_scores(doc)
+
+    if not doc.term_counts:
+        return {}
+
+    max_freq = max(doc.term_counts.values())
+    word_freq = {word: count / max_freq for word, count in doc.term_counts.items()}
+
+    # Sum the normalized frequencies word by word, in sentence order
+    sentence_scores = {}
+    for i, words in enumerate(doc.content_tokens):
+        sentence_scores[i] = sum(word_freq[word] for word in words)
+
+    return sentence_scores
+
+def sentence_frequencies(doc):
+    """Number of sentences each content word occurs in"""
+    word_doc_freq = Counter()
+    for words in doc.content_tokens:
+        word_doc_freq.update(set(words))
+    return word_doc_freq
+
+def calculate_idf(doc):
+    """Inverse sentence frequency of every content word in the document"""
+    n_sentences = len(doc.sentences)
+    word_doc_freq = sentence_frequencies(doc)
+
+    return {word: log(n_sentences / (freq + 1)) for word, freq in word_doc_freq.items()}
+
+def calculate_textrank_scores(doc):
+    """Graph-based scoring - PageRank over a sparse TF-IDF sentence similarity graph"""
+    return textrank_scores(doc.content_tokens, sentence_frequencies(doc))
+
+def calculate_tfidf_scores(doc, idf=None):
+    """
+    TF-IDF based scoring - better for longer documents. `idf` maps words to
+    their inverse document frequency, such as a corpus's; by default it is
+    computed over the document's own sentences.
+    """
+    if idf is None:
+        if SCORING_BACKEND == 'numpy':
+            return vectorized.tfidf_scores(doc)
+        idf = calculate_idf(doc)
+
+    # Calculate TF-IDF scores
+    sentence_scores = {}
+    for i, words in enumerate(doc.content_tokens):
+        tf = Counter(words)
+        score = fsum(tf[word] * idf.get(word, 0) for word in tf)
+        sentence_scores[i] = score / (len(words) + 1)  # Normalize by sentence length
+
+    return sentence_scores
+
+def business_sentence_features(sentence, words):
+    """
+    Position-independent business features of one sentence and its lowercased
+    tokens: (business_count, number_bonus, action_bonus, length_bonus)
+    """
+    # Count business keywords and phrases such as 'market share'
+    business_count = count_business_terms(sentence, words)
+
+    # Check for numbers/percentages (financial metrics)
+    has_numbers = NUMBER_PATTERN.search(sentence) is not None
+    number_bonus = 1.5 if has_numbers else 0
+
+    # Check for action words (decisions, outcomes)
+    action_bonus = 1.2 if has_action_word(sentence) else 0
+
+    # Length preference (business summaries prefer medium-length sentences)
+    word_count = len(words)
+    if 8 <= word_count <= 25:
+        length_bonus = 1.0
+    elif word_count < 8:
+        length_bonus = 0.6
+    else:
+        length_bonus = 0.8
+
+    return business_count, number_bonus, action_bonus, length_bonus
+
+def business_feature_row(base_score, features, position, n_sentences):
+    """Inputs of the business insights score of the sentence at `position`, as in BUSINESS_FEATURES"""
+    business_count, number_bonus, action_bonus, length_bonus = features
+
+    # Position bonus (executive summaries often at beginning)
+    position_bonus = 1.0 - (position / n_sentences) * 0.3  # 1.0 for first, 0.7 for last
+
+    keyword_bonus = business_count * 0.3
+    return base_score, keyword_bonus, number_bonus, action_bonus, position_bonus, length_bonus
+
+def combine_business_score(base_score, features, position, n_sentences, weights=BUSINESS_WEIGHTS):
+    """Weighted business insights score of the sentence at `position`"""
+    score = 0.0
+    for value, weight in zip(business_feature_row(base_score, features, position, n_sentences), weights):
+        score += value * weight
+    return score
+
+def business_feature_matrix(doc, freq_scores=None):
+    """
+    Business insights features of every sentence, row by row in an
+    array('d') of len(BUSINESS_FEATURES) columns, so scores for any weights
+    are a weighted sum away
+    """
+    if freq_scores is None:
+        freq_scores = calculate_frequency_scores(doc)
+    n_sentences = len(doc.sentences)
+    matrix = array('d')
+    for i, sentence in enumerate(doc.sentences):
+        features = business_sentence_features(sentence, doc.sentence_tokens[i])
+        matrix.extend(business_feature_row(freq_scores.get(i, 0), features, i, n_sentences))
+    return matrix
+
+def weighted_scores(matrix, weights=BUSINESS_WEIGHTS):
+    """Sentence scores from a business feature matrix, summed in the same order as combine_business_score"""
+    width = len(BUSINESS_FEATURES)
+    scores = [0.0] * (len(matrix) // width)
+    for column, weight in enumerate(weights):
+        scores = [score + value * weight for score, value in zip(scores, matrix[column::width])]
+    return dict(enumerate(scores))
+
+def business_weights(overrides=None):
+    """
+    BUSINESS_WEIGHTS with the weights named in `overrides` ({feature: weight})
+    replaced; ValueError for an unknown feature or a weight that is not a
+    finite number
+    """
+    weights = dict(zip(BUSINESS_FEATURES, BUSINESS_WEIGHTS))
+    for name, weight in (overrides or {}).items():
+        if name not in weights:
+            raise ValueError(f'Unknown feature {name!r}; expected one of {", ".join(BUSINESS_FEATURES)}')
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)) or not isfinite(weight):
+            raise ValueError(f'Weight of {name!r} must be a finite number')
+        weights[name] = float(weight)
+    return tuple(weights[name] for name in BUSINESS_FEATURES)
+
+def calculate_business_insights_scores(doc):
+    """Business-focused scoring - prioritizes business keywords, metrics, and insights"""
+    return weighted_scores(business_feature_matrix(doc))
+
+def calculate_hybrid_scores(doc):
+    """Hybrid scoring - combines frequency, position, and length"""
+    n_sentences = len(doc.sentences)
+    freq_scores = calculate_frequency_scores(doc)
+
+    # Position bonus (earlier sentences score higher)
+    position_scores = {i: 1 - (i / n_sentences) for i in range(n_sentences)}
+
+    # Length penalty (avoid very short sentences)
+    length_scores = {}
+    for i, words in enumerate(doc.sentence_tokens):
+        length_scores[i] = 1 if len(words) > 5 else 0.5
+
+    # Combine scores
+    hybrid_scores = {}
+    for i in range(n_sentences):
+        freq = freq_scores.get(i, 0)
+        pos = position_scores.get(i, 0)
+        length = length_scores.get(i, 0)
+        hybrid_scores[i] = (freq * 0.6) + (pos * 0.2) + (length * 0.2)
+
+    return hybrid_scores
+
+def extract_keywords(text, num_keywords=10, idf=None):
+    """
+    Extract top keywords from text (or an AnalyzedDocument) using TF-IDF,
+    against the document's own sentences or, given `idf`, a corpus
+    """
+    doc = _as_document(text)
+    with stage('keywords'):
+        if idf is None:
+            if SCORING_BACKEND == 'numpy':
+                return vectorized.extract_keywords(doc, num_keywords)
+            idf = calculate_idf(doc)
+
+        tfidf_scores = {word: doc.term_counts[word] * idf.get(word, 0) for word in doc.term_counts}
+
+        return top_k(tfidf_scores, num_keywords)
+
+def calculate_readability_metrics(text, extended=False):
+    """
+    Calculate text readability metrics for a text or an AnalyzedDocument,
+    plus Flesch reading ease and the SMOG grade when `extended`
+    """
+    doc = _as_document(text)
+    with stage('readability'):
+        totals = readability_totals(doc.token_counts())
+        return readability_from_totals(len(doc.sentences), *totals, extended=extended)
+
+@lru_cache(maxsize=SYLLABLE_CACHE_SIZE)
+def token_readability(token):
+    """
+    (words, characters, syllables, polysyllabic words) one occurrence of a
+    token adds to the readability totals; nothing for punctuation
+    """
+    if not WORD_CHARACTER.search(token):
+        return 0, 0, 0, 0
+    syllables = count_syllables(token)
+    return 1, len(token), syllables, int(syllables >= 3)
+
+def readability_totals(token_counts):
+    """
+    [words, characters, syllables, polysyllabic words] of tokens given as
+    {token: occurrences}, so each distinct token is looked at once
+    """
+    words = chars = syllables = polysyllables = 0
+    for token, count in token_counts.items():
+        is_word, token_chars, token_syllables, polysyllabic = token_readability(token)
+        if is_word:
+            words += count
+            chars += token_chars * count
+            syllables += token_syllables * count
+            polysyllables += polysyllabic * count
+    return [words, chars, syllables, polysyllables]
+
+def readability_from_totals(sentence_count, word_count, total_chars, syllable_count,
+                            polysyllable_count=0, extended=False):
+    """
+    Readability metrics from running totals of sentences, words, their
+    characters, syllables and words of three or more syllables
+    """
+    if not sentence_count or not word_count:
+        metrics = {
+            'avg_words_per_sentence': 0,
+            'avg_chars_per_word': 0,
+            'flesch_kincaid_grade': 0,
+            'reading_time_minutes': 0
+        }
+        if extended:
+            metrics.update(dict.fromkeys(EXTENDED_READABILITY, 0))
+        return metrics
+
+    # Average words per sentence
+    avg_words_per_sentence = word_count / sentence_count
+
+    # Average characters per word
+    avg_chars_per_word = total_chars / word_count
+
+    # Simplified Flesch-Kincaid Grade Level
+    # Grade = 0.39 * (words / sentences) + 11.8 * (syllables / words) - 15.59
+    # Using approximation: syllables ≈ vowel count
+    flesch_kincaid = (
+        0.39 * avg_words_per_sentence +
+        11.8 * (syllable_count / word_count) -
+        15.59
+    )
+
+    # Reading time (average reading speed: 200 words/minute)
+    reading_time = word_count / 200
+
+    metrics = {
+        'avg_words_per_sentence': round(avg_words_per_sentence, 2),
+        'avg_chars_per_word': round(avg_chars_per_word, 2),
+        'flesch_kincaid_grade': max(0, round(flesch_kincaid, 1)),
+        'reading_time_minutes': round(reading_time, 2)
+    }
+    if extended:
+        # Flesch Reading Ease: 206.835 - 1.015 * (words / sentences) - 84.6 * (syllables / words)
+        reading_ease = 206.835 - 1.015 * avg_words_per_sentence - 84.6 * (syllable_count / word_count)
+        # SMOG grade: 1.043 * sqrt(polysyllabic words * 30 / sentences) + 3.1291
+        smog = 1.043 * sqrt(polysyllable_count * 30 / sentence_count) + 3.1291
+        metrics['flesch_reading_ease'] = round(reading_ease, 1)
+        metrics['smog_index'] = round(smog, 1)
+    return metrics
+
+def count_syllables(word):
+    """Approximate syllable count using vowel groups"""
+    word = word.lower()
+    syllable_count = len(VOWEL_GROUPS.findall(word))
+
+    # Adjust for silent e
+    if word.endswith('e'):
+        syllable_count -= 1
+
+    return max(1, syllable_count)
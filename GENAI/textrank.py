@@ -0,0 +1,120 @@
+"""
+TextRank sentence scoring over a sparse TF-IDF similarity graph.
+
+Sentences are linked by the cosine similarity of their TF-IDF vectors,
+computed from an inverted index rather than by comparing every pair: each
+term links only its TEXTRANK_MAX_POSTINGS heaviest occurrences, and each
+sentence keeps its TEXTRANK_NEIGHBORS most similar sentences. Both the
+graph and the similarity work therefore grow linearly with the document.
+PageRank then runs by power iteration until the scores move less than
+TEXTRANK_TOLERANCE, or for at most TEXTRANK_MAX_ITERATIONS rounds.
+"""
+import heapq
+import os
+from collections import defaultdict
+from math import log, sqrt
+from operator import mul
+
+# Edges kept per sentence, the most similar first
+TEXTRANK_NEIGHBORS = int(os.environ.get('SUMMAI_TEXTRANK_NEIGHBORS', 10))
+# Occurrences of a term used to link sentences; a term in more sentences links only its heaviest ones
+TEXTRANK_MAX_POSTINGS = int(os.environ.get('SUMMAI_TEXTRANK_MAX_POSTINGS', 64))
+# Cosine similarity below which sentences are not linked
+TEXTRANK_MIN_SIMILARITY = float(os.environ.get('SUMMAI_TEXTRANK_MIN_SIMILARITY', 0.05))
+# Power iteration stops once the scores change by less than this in total (L1)
+TEXTRANK_TOLERANCE = float(os.environ.get('SUMMAI_TEXTRANK_TOLERANCE', 1e-4))
+TEXTRANK_MAX_ITERATIONS = int(os.environ.get('SUMMAI_TEXTRANK_MAX_ITERATIONS', 50))
+DAMPING = 0.85
+
+
+def sentence_vectors(content_tokens, doc_freq, n_sentences=None):
+    """
+    L2-normalized TF-IDF vector {term: weight} of each sentence. Terms found
+    in nearly every sentence have no positive IDF and are left out.
+    """
+    if n_sentences is None:
+        n_sentences = len(content_tokens)
+    idf = {}
+    vectors = []
+    for words in content_tokens:
+        weights = {}
+        for word in words:
+            word_idf = idf.get(word)
+            if word_idf is None:
+                word_idf = idf[word] = log(n_sentences / (doc_freq.get(word, 0) + 1))
+            if word_idf > 0:
+                weights[word] = weights.get(word, 0.0) + word_idf
+        norm = sqrt(sum(weight * weight for weight in weights.values()))
+        vectors.append({word: weight / norm for word, weight in weights.items()} if norm else {})
+    return vectors
+
+
+def similarity_graph(vectors, neighbors=TEXTRANK_NEIGHBORS, max_postings=TEXTRANK_MAX_POSTINGS,
+                     min_similarity=TEXTRANK_MIN_SIMILARITY):
+    """Symmetric adjacency lists {sentence: {neighbor: similarity}} of the sparse graph"""
+    postings = defaultdict(list)
+    for i, vector in enumerate(vectors):
+        for word, weight in vector.items():
+            postings[word].append((weight, i))
+
+    # Dot products accumulate only over sentence pairs sharing a kept posting
+    similarities = defaultdict(float)
+    for entries in postings.values():
+        if len(entries) > max_postings:
+            entries = heapq.nlargest(max_postings, entries)
+            entries.sort(key=lambda entry: entry[1])
+        for a, (weight_a, i) in enumerate(entries):
+            for weight_b, j in entries[a + 1:]:
+                similarities[i, j] += weight_a * weight_b
+
+    candidates = defaultdict(list)
+    for (i, j), similarity in similarities.items():
+        if similarity >= min_similarity:
+            candidates[i].append((similarity, j))
+            candidates[j].append((similarity, i))
+
+    graph = [{} for _ in vectors]
+    for i, edges in candidates.items():
+        for similarity, j in heapq.nlargest(neighbors, edges) if len(edges) > neighbors else edges:
+            # A link either side keeps counts for both, so the graph stays undirected
+            graph[i][j] = similarity
+            graph[j][i] = similarity
+    return graph
+
+
+def pagerank(graph, damping=DAMPING, tolerance=TEXTRANK_TOLERANCE,
+             max_iterations=TEXTRANK_MAX_ITERATIONS):
+    """PageRank of each node of a weighted undirected graph, summing to 1"""
+    n = len(graph)
+    if n == 0:
+        return []
+    out_weights = [sum(edges.values()) for edges in graph]
+    dangling = [i for i, weight in enumerate(out_weights) if not weight]
+    # Each node's incoming edges as its sources and the share of each source's rank it gets
+    sources = [list(edges) for edges in graph]
+    shares = [[weight / out_weights[j] for j, weight in edges.items()] for edges in graph]
+
+    ranks = [1.0 / n] * n
+    for _ in range(max_iterations):
+        # Rank of sentences without links is spread evenly, as if they linked everything
+        base = (1 - damping) / n + damping * sum(ranks[i] for i in dangling) / n
+        rank_of = ranks.__getitem__
+        new_ranks = [base + damping * sum(map(mul, map(rank_of, node_sources), node_shares))
+                     for node_sources, node_shares in zip(sources, shares)]
+        delta = sum(abs(new - old) for new, old in zip(new_ranks, ranks))
+        ranks = new_ranks
+        if delta < tolerance:
+            break
+    return ranks
+
+
+def textrank_scores(content_tokens, doc_freq, n_sentences=None):
+    """
+    TextRank score of each sentence, given its content words and the number
+    of sentences each word occurs in. `n_sentences` is the size of the text
+    doc_freq was counted over, when only some of its sentences are ranked.
+    Scores average 1 across the ranked sentences.
+    """
+    vectors = sentence_vectors(content_tokens, doc_freq, n_sentences)
+    ranks = pagerank(similarity_graph(vectors))
+    return {i: rank * len(ranks) for i, rank in enumerate(ranks)}
@@ -0,0 +1,50 @@
+"""
+Word tokenizers for single sentences. Every tokenizer takes one sentence and
+returns its lowercased tokens, punctuation included.
+
+- nltk: NLTK's Treebank word_tokenize, the reference implementation
+- regex: one precompiled pattern; several times faster and close to the
+  NLTK tokens for ordinary prose (see benchmarks/tokenizer_accuracy.py)
+"""
+import os
+import re
+
+from resources import word_tokenize
+
+# Tokenizer used when a request does not name one
+DEFAULT_TOKENIZER = os.environ.get('SUMMAI_TOKENIZER', 'nltk')
+
+# Numbers keep their separators ('3,400', '12.5') and words their inner
+# hyphens ('e-mail'); clitics ("'s", "n't") and every other punctuation mark
+# become separate tokens, as they do in the Treebank tokenizer
+WORD_PATTERN = re.compile(r"\d+(?:[.,]\d+)+|\w+(?=n't)|n't|\w+(?:[-.]\w+)*|'\w+|[^\w\s]")
+
+
+def nltk_tokenize(sentence):
+    # The input is already a punkt sentence, so skip the second sentence
+    # split word_tokenize would otherwise run
+    return word_tokenize(sentence.lower(), preserve_line=True)
+
+
+def regex_tokenize(sentence):
+    return WORD_PATTERN.findall(sentence.lower())
+
+
+TOKENIZERS = {
+    'nltk': nltk_tokenize,
+    'regex': regex_tokenize
+}
+
+
+def register_tokenizer(name, tokenize):
+    """Make a tokenizer selectable by name; `tokenize` maps a sentence to lowercased tokens"""
+    TOKENIZERS[name] = tokenize
+
+
+def resolve_tokenizer(name):
+    """The given tokenizer name if it is registered, otherwise the default"""
+    return name if name in TOKENIZERS else DEFAULT_TOKENIZER
+
+
+def get_tokenizer(name=None):
+    return TOKENIZERS[resolve_tokenizer(name)]
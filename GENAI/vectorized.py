@@ -0,0 +1,137 @@
+from math import fsum, log
+
+import numpy as np
+
+
+class TermMatrix:
+    """
+    Sentence-by-term count matrix of a document's content words in CSR form.
+
+    Term ids follow first-occurrence order, matching the iteration order of
+    the document's term_counts, so rankings and ties agree with the dict path.
+    The document's content word ids are read in place from their array.
+    """
+
+    def __init__(self, doc):
+        content = doc.content_tokens
+        self.n_sentences = len(doc.sentences)
+        # Token offsets of each sentence into the flat token_ids array
+        self.token_ptr = np.frombuffer(content.offsets, dtype=np.uint32).astype(np.int64)
+        lengths = np.diff(self.token_ptr)
+        self.sentence_lengths = lengths
+
+        if len(content.ids):
+            # Vocabulary ids are numbered in first-occurrence order, so sorting them keeps it
+            terms, inverse = np.unique(np.frombuffer(content.ids, dtype=np.uint32),
+                                       return_inverse=True)
+            self.vocabulary = [content.vocabulary[word_id] for word_id in terms.tolist()]
+            self.token_ids = inverse.ravel().astype(np.int64)
+        else:
+            self.vocabulary = []
+            self.token_ids = np.zeros(0, dtype=np.int64)
+
+        n_terms = len(self.vocabulary)
+        self.term_counts = np.bincount(self.token_ids, minlength=n_terms)
+
+        # Collapse (sentence, term) pairs into CSR rows with per-sentence counts
+        token_sentence = np.repeat(np.arange(self.n_sentences, dtype=np.int64), lengths)
+        pairs, counts = np.unique(token_sentence * max(n_terms, 1) + self.token_ids,
+                                  return_counts=True)
+        self.indices = pairs % max(n_terms, 1)
+        self.data = counts
+        self.indptr = np.zeros(self.n_sentences + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pairs // max(n_terms, 1), minlength=self.n_sentences),
+                  out=self.indptr[1:])
+        self.document_frequency = np.bincount(self.indices, minlength=n_terms)
+
+    def idf(self):
+        """log(n_sentences / (df + 1)) per term, via math.log so values match the dict path"""
+        distinct, inverse = np.unique(self.document_frequency, return_inverse=True)
+        table = np.array([log(self.n_sentences / (df + 1)) for df in distinct.tolist()],
+                         dtype=np.float64)
+        return table[inverse.ravel()]
+
+
+def term_matrix(doc):
+    """Return the document's TermMatrix, building it on first use"""
+    matrix = getattr(doc, '_term_matrix', None)
+    if matrix is None:
+        matrix = doc._term_matrix = TermMatrix(doc)
+    return matrix
+
+
+def _sequential_sums(values, ptr):
+    """
+    Sum each sentence's values left to right, as Python's sum() does, so the
+    float results match the dict path bit for bit (np.add.reduceat sums
+    pairwise and can round differently). Step j adds every sentence's j-th
+    value at once; sentences are visited longest first, so the ones still
+    being summed are always a prefix and the total work stays linear.
+    """
+    lengths = np.diff(ptr)
+    order = np.argsort(-lengths, kind='stable')
+    starts = ptr[:-1][order]
+    remaining = lengths[order]
+    sums = np.zeros(len(order), dtype=np.float64)
+    longest = int(remaining[0]) if len(remaining) else 0
+    # Number of sentences longer than j, for every step j
+    active = np.searchsorted(-remaining, -np.arange(longest), side='left').tolist()
+    for j in range(longest):
+        n = active[j]
+        sums[:n] += values[starts[:n] + j]
+    result = np.empty_like(sums)
+    result[order] = sums
+    return result
+
+
+def frequency_scores(doc):
+    """Vectorized calculate_frequency_scores"""
+    matrix = term_matrix(doc)
+    if not len(matrix.term_counts):
+        return {}
+    word_freq = matrix.term_counts / matrix.term_counts.max()
+    scores = _sequential_sums(word_freq[matrix.token_ids], matrix.token_ptr)
+    return dict(enumerate(scores.tolist()))
+
+
+def tfidf_scores(doc):
+    """Vectorized calculate_tfidf_scores"""
+    matrix = term_matrix(doc)
+    weighted = (matrix.data * matrix.idf()[matrix.indices]).tolist()
+    indptr = matrix.indptr.tolist()
+    lengths = matrix.sentence_lengths.tolist()
+    # fsum is correctly rounded, so row sums do not depend on term order
+    return {
+        i: fsum(weighted[indptr[i]:indptr[i + 1]]) / (lengths[i] + 1)
+        for i in range(matrix.n_sentences)
+    }
+
+
+def keyword_scores(doc):
+    """TF-IDF score of every term, returned with the vocabulary in first-occurrence order"""
+    matrix = term_matrix(doc)
+    return matrix.vocabulary, matrix.term_counts * matrix.idf()
+
+
+def top_k_indices(scores, k):
+    """
+    Indices of the k highest scores, highest first with ties broken by lower
+    index - the order a stable descending sort gives - using np.partition so
+    only the selected entries are sorted.
+    """
+    n = len(scores)
+    if k >= n:
+        return np.argsort(-scores, kind='stable')
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    kth = np.partition(scores, n - k)[n - k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:k - len(above)]
+    chosen = np.concatenate([above, ties])
+    return chosen[np.lexsort((chosen, -scores[chosen]))]
+
+
+def extract_keywords(doc, num_keywords=10):
+    """Vectorized extract_keywords"""
+    vocabulary, scores = keyword_scores(doc)
+    return [vocabulary[i] for i in top_k_indices(scores, num_keywords).tolist()]
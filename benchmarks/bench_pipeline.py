@@ -0,0 +1,218 @@
+"""
+Benchmark suite and regression harness for the summarization pipeline.
+
+Times tokenization alone (AnalyzedDocument), generate_summary (normal,
+business_insights and textrank), extract_keywords and
+calculate_readability_metrics on synthetic corpora of several sizes,
+vocabularies and styles, and drives the Flask endpoints through the test
+client. Reports throughput, p50/p95/p99 latency and peak traced memory.
+
+Results can be saved as a baseline JSON file. A later run compared against
+it fails (exit status 1) when a case's latency or peak memory grows by more
+than --threshold. Runs offline once the NLTK data is available locally (see
+`python GENAI/resources.py`).
+
+Usage:
+    python benchmarks/bench_pipeline.py [--quick] [--filter large] [--output results.json]
+    python benchmarks/bench_pipeline.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_pipeline.py --baseline benchmarks/baseline.json [--threshold 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+GENAI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'GENAI')
+sys.path.insert(0, GENAI_DIR)
+
+# Keep benchmark runs off the network and out of the working directory's databases
+os.environ.setdefault('SUMMAI_WARMUP', 'eager')
+os.environ.setdefault('SUMMAI_JOB_WORKERS', '0')
+os.environ.setdefault('SUMMAI_ANALYTICS_FLUSH_INTERVAL', '0')
+# Every request comes from one client as fast as it can, which a rate limit would refuse
+os.environ.setdefault('SUMMAI_RATE_LIMIT', '0')
+# No result caching, in this process or the batch pool's workers (which keep caches of
+# their own), so every call measures the full pipeline
+os.environ.setdefault('SUMMAI_CACHE_ENTRIES', '0')
+_ORIGINAL_CWD = os.getcwd()
+# Batch pool workers import this module too; they share the parent's scratch directory
+_WORKDIR = os.environ.get('SUMMAI_BENCH_WORKDIR')
+if _WORKDIR is None:
+    _WORKDIR = os.environ['SUMMAI_BENCH_WORKDIR'] = tempfile.mkdtemp(prefix='summai-bench-')
+os.environ.setdefault('SUMMAI_JOBS_DB', os.path.join(_WORKDIR, 'jobs.db'))
+os.environ.setdefault('SUMMAI_CORPUS_DB', os.path.join(_WORKDIR, 'corpus.db'))
+os.environ.setdefault('SUMMAI_CORPUS_IDF_FILE', os.path.join(_WORKDIR, 'corpus_idf.bin'))
+
+from synthetic import corpus  # noqa: E402
+
+# name -> (documents, sentences per document, vocabulary size, style)
+CORPORA = {
+    'generic-small': (20, 10, 2000, 'generic'),
+    'generic-medium': (10, 100, 5000, 'generic'),
+    'generic-large': (3, 1000, 20000, 'generic'),
+    'narrow-vocab-large': (3, 1000, 300, 'generic'),
+    'business-medium': (10, 100, 5000, 'business'),
+    'business-large': (3, 1000, 20000, 'business'),
+}
+QUICK_CORPORA = ('generic-small', 'generic-medium', 'business-medium')
+
+METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'peak_kb')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def measure(func, inputs, rounds, words):
+    """Time func over every input for several rounds, then trace one pass for peak memory"""
+    func(inputs[0])  # Warm caches and lazy imports outside the timings
+    latencies = []
+    for _ in range(rounds):
+        for item in inputs:
+            start = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    peak = 0
+    for item in inputs:
+        tracemalloc.reset_peak()
+        func(item)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    latencies.sort()
+    total = sum(latencies)
+    return {
+        'calls': len(latencies),
+        'throughput_per_s': round(len(latencies) / total, 2),
+        'words_per_s': round(words * rounds / total),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'peak_kb': round(peak / 1024, 1)
+    }
+
+
+def build_cases(names):
+    """(case name, function, inputs, word count) for every benchmark"""
+    from summarizer import (
+        AnalyzedDocument, generate_summary, extract_keywords, calculate_readability_metrics
+    )
+    import app as webapp
+
+    client = webapp.app.test_client()
+
+    def post(path, payload):
+        response = client.post(path, json=payload)
+        assert response.status_code == 200, response.get_json()
+        return response
+
+    cases = []
+    for name in names:
+        n_docs, n_sentences, vocabulary, style = CORPORA[name]
+        docs = corpus(n_docs, n_sentences, vocabulary, style, seed=len(name))
+        words = sum(len(doc.split()) for doc in docs)
+        cases.extend([
+            # Peak memory of this case is the size of one tokenized document
+            (f'{name}/analyze', AnalyzedDocument, docs, words),
+            (f'{name}/summary-normal', lambda d: generate_summary(d, 40, 'normal'), docs, words),
+            (f'{name}/summary-business', lambda d: generate_summary(d, 40, 'business_insights'),
+             docs, words),
+            (f'{name}/summary-textrank', lambda d: generate_summary(d, 40, 'textrank'), docs, words),
+            (f'{name}/keywords', lambda d: extract_keywords(d, 10), docs, words),
+            (f'{name}/readability', calculate_readability_metrics, docs, words),
+            (f'{name}/api-summarize',
+             lambda d: post('/api/summarize', {'text': d, 'ratio': 40}), docs, words),
+            (f'{name}/api-analyze', lambda d: post('/api/analyze', {'text': d}), docs, words),
+        ])
+        # The whole corpus as one batch request
+        cases.append((f'{name}/api-batch',
+                      lambda batch: post('/api/batch-summarize', {'texts': batch}), [docs], words))
+    return cases
+
+
+def compare(results, baseline, threshold):
+    """Descriptions of every metric that regressed by more than threshold"""
+    regressions = []
+    for case, metrics in results.items():
+        before = baseline.get(case)
+        if before is None:
+            continue
+        for metric in METRICS:
+            old, new = before.get(metric), metrics.get(metric)
+            # Ignore sub-millisecond noise on tiny absolute values
+            if old and new > old * (1 + threshold) and new - old > 0.5:
+                regressions.append(f'{case} {metric}: {old} -> {new} (+{(new / old - 1):.0%})')
+    return regressions
+
+
+def environment():
+    import nltk
+    from summarizer import SCORING_BACKEND
+    from tokenization import DEFAULT_TOKENIZER
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'nltk': nltk.__version__,
+        'scoring_backend': SCORING_BACKEND,
+        'tokenizer': DEFAULT_TOKENIZER,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='small corpora only, one round')
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--filter', default='', help='run only cases containing this text')
+    parser.add_argument('--output', help='write the results JSON here')
+    parser.add_argument('--save-baseline', metavar='PATH', help='write the results as a baseline')
+    parser.add_argument('--baseline', metavar='PATH', help='compare against this baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed relative growth of latency or peak memory (default: 0.25)')
+    args = parser.parse_args()
+
+    # Analytics and other relative-path databases land in a scratch directory
+    os.chdir(_WORKDIR)
+    names = QUICK_CORPORA if args.quick else tuple(CORPORA)
+    rounds = 1 if args.quick else args.rounds
+
+    results = {}
+    print(f'{"case":<40} {"calls/s":>9} {"p50 ms":>9} {"p95 ms":>9} {"p99 ms":>9} {"peak KB":>9}')
+    for case, func, inputs, words in build_cases(names):
+        if args.filter not in case:
+            continue
+        r = results[case] = measure(func, inputs, rounds, words)
+        print(f'{case:<40} {r["throughput_per_s"]:>9.1f} {r["p50_ms"]:>9.2f} '
+              f'{r["p95_ms"]:>9.2f} {r["p99_ms"]:>9.2f} {r["peak_kb"]:>9.0f}')
+
+    report = {'environment': environment(), 'rounds': rounds, 'results': results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(os.path.join(_ORIGINAL_CWD, path), 'w') as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+            print(f'wrote {path}')
+
+    if args.baseline:
+        with open(os.path.join(_ORIGINAL_CWD, args.baseline)) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) over {args.threshold:.0%}:')
+            for line in regressions:
+                print(f'  {line}')
+            sys.exit(1)
+        print(f'\nno regressions over {args.threshold:.0%} against {args.baseline}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Throughput benchmark: NLTK versus regex word tokenization.
+
+Measures word tokenization alone (sentences per second and tokens per
+second over pre-split sentences) and whole-document analysis through
+AnalyzedDocument plus generate_summary (documents per second).
+
+Usage: python benchmarks/bench_tokenizer.py [PATH ...] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'GENAI'))
+
+from resources import sent_tokenize, warm_up  # noqa: E402
+from summarizer import AnalyzedDocument, generate_summary, normalize_text  # noqa: E402
+from tokenization import TOKENIZERS  # noqa: E402
+from tokenizer_accuracy import load_corpus  # noqa: E402
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', help='.txt files or directories (default: synthetic corpus)')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    warm_up()
+    docs = [normalize_text(doc) for doc in load_corpus(args.paths)]
+    sentences = [s for doc in docs for s in sent_tokenize(doc)]
+    print(f'{len(docs)} documents, {len(sentences)} sentences')
+    print(f'{"tokenizer":<10} {"sent/s":>10} {"tokens/s":>12} {"docs/s":>8}')
+
+    for name, tokenize in TOKENIZERS.items():
+        elapsed, n_tokens = best_of(lambda: sum(len(tokenize(s)) for s in sentences), args.repeat)
+
+        def summarize_all():
+            for doc in docs:
+                analyzed = AnalyzedDocument(doc, tokenizer=name)
+                generate_summary(doc, 40, 'normal', doc=analyzed)
+
+        doc_elapsed, _ = best_of(summarize_all, args.repeat)
+        print(f'{name:<10} {len(sentences) / elapsed:>10.0f} {n_tokens / elapsed:>12.0f} '
+              f'{len(docs) / doc_elapsed:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""
+Micro-benchmark: top-k selection versus a full sort.
+
+Compares the full sort generate_summary and extract_keywords used to do
+against summarizer.top_k (heap) and vectorized.top_k_indices (partition),
+checking that every path returns the same keys in the same order.
+
+Usage: python benchmarks/bench_topk.py [--sizes 10000 100000] [--k 8 400]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'GENAI'))
+
+from summarizer import top_k  # noqa: E402
+
+try:
+    import numpy as np
+    from vectorized import top_k_indices
+except ImportError:
+    np = None
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def make_scores(size, seed=0):
+    # Few distinct values so ties are common, as with short sentences and rare keywords
+    rng = random.Random(seed)
+    return {i: rng.randint(0, size // 10) / 7 for i in range(size)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 500000])
+    parser.add_argument('--k', type=int, nargs='+', default=[8, 15, 400])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'entries':>8} {'k':>5} {'sorted ms':>10} {'heap ms':>9} {'numpy ms':>9} {'speedup':>8}")
+    for size in args.sizes:
+        scores = make_scores(size)
+        array = np.array(list(scores.values())) if np is not None else None
+        for k in args.k:
+            sort_time, expected = best_of(
+                lambda: sorted(scores, key=lambda x: scores[x], reverse=True)[:k], args.repeat)
+            heap_time, heap_result = best_of(lambda: top_k(scores, k), args.repeat)
+            assert heap_result == expected, 'heap top-k disagrees with sorted()'
+            numpy_ms = '-'
+            if array is not None:
+                numpy_time, numpy_result = best_of(lambda: top_k_indices(array, k), args.repeat)
+                assert numpy_result.tolist() == expected, 'numpy top-k disagrees with sorted()'
+                numpy_ms = f'{numpy_time * 1000:.2f}'
+            print(f'{size:>8} {k:>5} {sort_time * 1000:>10.2f} {heap_time * 1000:>9.2f} '
+                  f'{numpy_ms:>9} {sort_time / heap_time:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
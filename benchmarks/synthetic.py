@@ -0,0 +1,108 @@
+"""
+Deterministic synthetic corpora for the benchmarks.
+
+Documents are built from a seeded random generator, so every run on every
+machine sees the same text and no corpus has to be downloaded. Words are
+drawn with a Zipf-like skew from a vocabulary of made-up words of the
+requested size. 'business' text mixes in business terms, action words,
+figures and percentages, which exercises the business_insights scorer.
+'mixed' text adds clitics, hyphens and abbreviations for tokenizer checks.
+"""
+import random
+
+_SYLLABLES = ['ka', 'lo', 'mer', 'ti', 'dan', 'sor', 'vel', 'nu', 'pra', 'gis',
+              'tor', 'en', 'ba', 'lin', 'cu', 'ro', 'fe', 'dor', 'mi', 'stra']
+_FUNCTION_WORDS = ['the', 'of', 'and', 'to', 'in', 'a', 'is', 'that', 'for', 'it',
+                   'with', 'as', 'was', 'on', 'by', 'this', 'be', 'are', 'from', 'at']
+_BUSINESS_TERMS = ['revenue', 'profit', 'growth', 'sales', 'market', 'customer', 'strategy',
+                   'quarter', 'investment', 'budget', 'margin', 'earnings', 'forecast',
+                   'market share', 'acquisition', 'partnership', 'risk', 'opportunity']
+_ACTION_WORDS = ['increased', 'reduced', 'announced', 'achieved', 'launched', 'expanded',
+                 'completed', 'exceeded', 'acquired', 'improved']
+
+_SUBJECTS = ['The company', 'Our team', "The board's committee", 'Management', 'Each region',
+             'The U.S. division', 'A key competitor', 'Customer support']
+_VERBS = ['increased', 'reduced', 'announced', "didn't change", 'reviewed', 'launched',
+          'expanded', "won't report", 'achieved', 'discussed']
+_OBJECTS = ['annual revenue', 'operating costs', 'market share', 'the e-commerce platform',
+            'its pricing strategy', "the client's budget", 'quarterly earnings',
+            'a new partnership', 'long-term investment', 'employee productivity']
+_TAILS = ['by {n}%', 'to ${m}', 'in Q{q}', 'after a {n}-day review', 'ahead of forecast',
+          '(up from {d})', 'despite higher risk', 'across {n} markets', '', '']
+
+
+def make_vocabulary(size, seed=0):
+    """`size` distinct made-up words"""
+    rng = random.Random(seed)
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def _zipf_weights(size):
+    return [1 / (rank + 1) for rank in range(size)]
+
+
+def generic_document(rng, n_sentences, vocabulary, weights):
+    sentences = []
+    for _ in range(n_sentences):
+        length = rng.randint(6, 28)
+        words = rng.choices(vocabulary, weights, k=length)
+        # Roughly every third word is a stopword, as in ordinary prose
+        for i in range(0, length, 3):
+            words[i] = rng.choice(_FUNCTION_WORDS)
+        words[0] = words[0].capitalize()
+        sentences.append(' '.join(words) + rng.choice(['.', '.', '.', '?', '!']))
+    return ' '.join(sentences)
+
+
+def business_document(rng, n_sentences, vocabulary, weights):
+    sentences = []
+    for _ in range(n_sentences):
+        words = rng.choices(vocabulary, weights, k=rng.randint(5, 22))
+        for i in range(0, len(words), 3):
+            words[i] = rng.choice(_FUNCTION_WORDS)
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(_BUSINESS_TERMS))
+        if rng.random() < 0.4:
+            words.insert(rng.randrange(1, len(words) + 1), rng.choice(_ACTION_WORDS))
+        if rng.random() < 0.35:
+            words.append(rng.choice([f'{rng.randint(1, 99)}%', f'${rng.randint(1, 999)}M',
+                                     f'{rng.randint(2015, 2030)}']))
+        words[0] = words[0].capitalize()
+        sentences.append(' '.join(words) + '.')
+    return ' '.join(sentences)
+
+
+def mixed_document(rng, n_sentences):
+    """Business-style sentences with numbers, clitics, hyphens and abbreviations"""
+    sentences = []
+    for _ in range(n_sentences):
+        tail = rng.choice(_TAILS).format(n=rng.randint(2, 95), q=rng.randint(1, 4),
+                                         m=f'{rng.randint(1, 900)},{rng.randint(100, 999)}',
+                                         d=f'{rng.uniform(1, 20):.1f}')
+        parts = [rng.choice(_SUBJECTS), rng.choice(_VERBS), rng.choice(_OBJECTS), tail]
+        sentence = ' '.join(p for p in parts if p)
+        sentences.append(sentence + rng.choice(['.', '.', '.', '!', '?']))
+    return ' '.join(sentences)
+
+
+def corpus(n_docs, n_sentences, vocabulary_size=2000, style='generic', seed=0):
+    """
+    `n_docs` documents of `n_sentences` sentences each. `style` is 'generic',
+    'business' or 'mixed'; `n_sentences` may be a (low, high) range.
+    """
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(vocabulary_size, seed)
+    weights = _zipf_weights(len(vocabulary))
+    docs = []
+    for _ in range(n_docs):
+        size = rng.randint(*n_sentences) if isinstance(n_sentences, tuple) else n_sentences
+        if style == 'business':
+            docs.append(business_document(rng, size, vocabulary, weights))
+        elif style == 'mixed':
+            docs.append(mixed_document(rng, size))
+        else:
+            docs.append(generic_document(rng, size, vocabulary, weights))
+    return docs
@@ -0,0 +1,117 @@
+"""
+Accuracy harness: how closely the regex tokenizer tracks the NLTK one.
+
+Tokenizes every document of a corpus with both tokenizers and compares the
+content words, the sentences each summary picks (as Jaccard overlap of
+sentence indices), the top keywords and the Flesch-Kincaid grade.
+
+The corpus is every .txt file under the given paths, or a synthetic
+business corpus when none are given. Exits non-zero when the mean summary
+overlap falls below --min-overlap.
+
+Usage: python benchmarks/tokenizer_accuracy.py [PATH ...] [--tokenizer regex] [--min-overlap 0.9]
+"""
+import argparse
+import os
+import statistics
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'GENAI'))
+
+from summarizer import (  # noqa: E402
+    SUMMARY_METHODS, AnalyzedDocument, score_sentences, select_summary,
+    extract_keywords, calculate_readability_metrics
+)
+from synthetic import corpus  # noqa: E402
+
+RATIOS = (20, 40)
+NUM_KEYWORDS = 10
+
+
+def load_corpus(paths):
+    """Text of every .txt file under the paths, or the synthetic corpus"""
+    if not paths:
+        # Business-style text with numbers, clitics, hyphens and abbreviations
+        return corpus(40, (8, 60), style='mixed')
+    docs = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                docs.extend(_read(os.path.join(root, f)) for f in sorted(files) if f.endswith('.txt'))
+        else:
+            docs.append(_read(path))
+    return [doc for doc in docs if doc.strip()]
+
+
+def _read(path):
+    with open(path, encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def jaccard(a, b):
+    a, b = set(a), set(b)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def multiset_overlap(a, b):
+    """Shared tokens (with multiplicity) over the larger token count"""
+    a, b = Counter(a), Counter(b)
+    larger = max(sum(a.values()), sum(b.values()))
+    return sum((a & b).values()) / larger if larger else 1.0
+
+
+def compare(text, tokenizer):
+    reference = AnalyzedDocument(text, tokenizer='nltk')
+    candidate = AnalyzedDocument(text, tokenizer=tokenizer)
+    indices = list(range(len(reference.sentences)))
+
+    summaries = []
+    for method in SUMMARY_METHODS:
+        ref_scores = score_sentences(reference, method)
+        cand_scores = score_sentences(candidate, method)
+        for ratio in RATIOS:
+            summaries.append(jaccard(select_summary(indices, ref_scores, ratio),
+                                     select_summary(indices, cand_scores, ratio)))
+
+    ref_keywords = extract_keywords(reference, NUM_KEYWORDS)
+    cand_keywords = extract_keywords(candidate, NUM_KEYWORDS)
+    return {
+        'content_words': multiset_overlap(
+            [w for words in reference.content_tokens for w in words],
+            [w for words in candidate.content_tokens for w in words]),
+        'summaries': summaries,
+        'keywords': len(set(ref_keywords) & set(cand_keywords)) / max(len(ref_keywords), 1),
+        'grade_delta': abs(calculate_readability_metrics(reference)['flesch_kincaid_grade'] -
+                           calculate_readability_metrics(candidate)['flesch_kincaid_grade'])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('paths', nargs='*', help='.txt files or directories (default: synthetic corpus)')
+    parser.add_argument('--tokenizer', default='regex')
+    parser.add_argument('--min-overlap', type=float, default=0.0,
+                        help='fail when the mean summary overlap is lower')
+    args = parser.parse_args()
+
+    docs = load_corpus(args.paths)
+    results = [compare(doc, args.tokenizer) for doc in docs]
+    overlaps = [o for r in results for o in r['summaries']]
+    mean_overlap = statistics.mean(overlaps)
+
+    print(f'{len(docs)} documents, {args.tokenizer} vs nltk')
+    print(f'content word overlap   {statistics.mean(r["content_words"] for r in results):.3f}')
+    print(f'summary overlap        {mean_overlap:.3f} mean, {min(overlaps):.3f} min, '
+          f'{sum(o == 1.0 for o in overlaps) / len(overlaps):.1%} identical')
+    print(f'top-{NUM_KEYWORDS} keyword overlap  {statistics.mean(r["keywords"] for r in results):.3f}')
+    print(f'grade level delta      {statistics.mean(r["grade_delta"] for r in results):.2f} mean, '
+          f'{max(r["grade_delta"] for r in results):.2f} max')
+
+    if mean_overlap < args.min_overlap:
+        print(f'FAIL: mean summary overlap below {args.min_overlap}')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,19 @@
+import os
+import sys
+import tempfile
+
+GENAI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'GENAI')
+sys.path.insert(0, GENAI_DIR)
+
+# Keep test runs out of the working directory's databases and off background threads
+_WORKDIR = tempfile.mkdtemp(prefix='summai-tests-')
+os.environ.setdefault('SUMMAI_WARMUP', 'eager')
+os.environ.setdefault('SUMMAI_JOB_WORKERS', '0')
+os.environ.setdefault('SUMMAI_BATCH_WORKERS', '1')
+os.environ.setdefault('SUMMAI_ANALYTICS_FLUSH_INTERVAL', '0')
+os.environ.setdefault('SUMMAI_RATE_LIMIT', '0')
+os.environ.setdefault('SUMMAI_JOBS_DB', os.path.join(_WORKDIR, 'jobs.db'))
+os.environ.setdefault('SUMMAI_CORPUS_DB', os.path.join(_WORKDIR, 'corpus.db'))
+os.environ.setdefault('SUMMAI_CORPUS_IDF_FILE', os.path.join(_WORKDIR, 'corpus_idf.bin'))
+# Analytics files are relative to the working directory
+os.chdir(_WORKDIR)
@@ -0,0 +1,32 @@
+import pytest
+
+import app as webapp
+
+
+@pytest.fixture
+def client():
+    return webapp.app.test_client()
+
+
+def test_reset_is_refused_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(webapp, 'ADMIN_TOKEN', '')
+    # Refused even from a loopback address, which a local reverse proxy gives every client
+    response = client.post('/api/analytics/reset', environ_base={'REMOTE_ADDR': '127.0.0.1'})
+    assert response.status_code == 403
+
+
+def test_reset_requires_the_bearer_token(client, monkeypatch):
+    monkeypatch.setattr(webapp, 'ADMIN_TOKEN', 'secret')
+    assert client.post('/api/analytics/reset').status_code == 401
+    wrong = {'Authorization': 'Bearer guess'}
+    assert client.post('/api/analytics/reset', headers=wrong).status_code == 403
+    right = {'Authorization': 'Bearer secret'}
+    assert client.post('/api/analytics/reset', headers=right).status_code == 200
+
+
+def test_oversized_stream_body_gets_413(client, monkeypatch):
+    monkeypatch.setattr(webapp, 'MAX_STREAM_BYTES', 1024)
+    response = client.post('/api/summarize/stream', data=b'Revenue grew this quarter. ' * 100,
+                           content_type='text/plain')
+    assert response.status_code == 413
+    assert response.get_json()['success'] is False
@@ -0,0 +1,57 @@
+import pytest
+
+from analytics_store import AnalyticsTracker, JSONFileBackend, SQLiteBackend
+
+
+@pytest.fixture(params=['sqlite', 'json'])
+def backend(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteBackend(str(tmp_path / 'analytics.db'), legacy_file=None)
+    return JSONFileBackend(str(tmp_path / 'analytics.json'))
+
+
+def make_tracker(backend, flush_events=100):
+    return AnalyticsTracker(backend=backend, flush_events=flush_events, flush_interval=0)
+
+
+def test_flushed_events_are_summed_in_the_backend(backend):
+    tracker = make_tracker(backend)
+    tracker.track_summary('normal', 100, 20, 'pdf')
+    tracker.track_summaries([('textrank', 50, 10, None), ('normal', 10, 5, 'txt')])
+    tracker.flush()
+
+    # A second tracker over the same store sees only what was persisted
+    stats = make_tracker(backend).get_stats()
+    assert stats['total_summaries'] == 3
+    assert stats['total_words_processed'] == 160
+    assert stats['total_words_generated'] == 35
+    assert stats['methods_used']['normal'] == 2
+    assert stats['methods_used']['textrank'] == 1
+    assert stats['file_types_uploaded'] == {'pdf': 1, 'txt': 1}
+
+
+def test_pending_events_are_visible_before_a_flush(backend):
+    tracker = make_tracker(backend)
+    tracker.track_summary('normal', 10, 2)
+    assert tracker.get_stats()['total_summaries'] == 1
+    assert make_tracker(backend).get_stats()['total_summaries'] == 0
+
+    # Reaching flush_events writes the batch without an explicit flush
+    tracker = make_tracker(backend, flush_events=2)
+    tracker.track_summaries([('normal', 10, 2, None), ('normal', 10, 2, None)])
+    assert make_tracker(backend).get_stats()['total_summaries'] == 2
+
+
+def test_sessions_count_once_per_idle_client_and_reset_clears_everything(backend):
+    tracker = make_tracker(backend)
+    assert tracker.track_session('client-a')
+    assert not tracker.track_session('client-a')
+    assert tracker.track_session('client-b')
+    tracker.track_summary('normal', 10, 2)
+    tracker.flush()
+    assert tracker.get_stats()['sessions'] == 2
+
+    tracker.reset()
+    stats = tracker.get_stats()
+    assert stats['sessions'] == stats['total_summaries'] == 0
+    assert tracker.track_session('client-a')
@@ -0,0 +1,65 @@
+import cache
+from cache import LRUCache, SummaryCache
+
+TEXT = ('Revenue grew by 12 percent in the third quarter. The company expanded into two new markets. '
+        'Operating costs fell after the restructuring. Analysts expect further growth next year. '
+        'The board approved a new dividend policy.')
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_returns_the_stored_object_until_it_expires(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, 'monotonic', clock)
+    lru = LRUCache(max_entries=4, max_bytes=1000, ttl=10)
+    value = {'summary': 'x'}
+    lru.put('a', value, size=1)
+    assert lru.get('a') is value
+
+    clock.now += 11
+    assert lru.get('a') is None
+    stats = lru.get_stats()
+    assert stats['entries'] == stats['bytes'] == 0
+    assert (stats['hits'], stats['misses']) == (1, 1)
+
+
+def test_least_recently_used_entry_is_evicted_by_count_and_bytes():
+    lru = LRUCache(max_entries=2, max_bytes=10, ttl=60)
+    lru.put('a', 'A', size=1)
+    lru.put('b', 'B', size=1)
+    lru.get('a')
+    lru.put('c', 'C', size=1)
+    assert lru.get('b') is None and lru.get('a') == 'A' and lru.get('c') == 'C'
+
+    # A large entry pushes out the oldest ones until the byte budget holds
+    lru.put('d', 'D', size=10)
+    assert lru.get_stats()['entries'] == 1
+    assert lru.get('a') is None and lru.get('c') is None and lru.get('d') == 'D'
+    assert lru.get_stats()['evictions'] == 3
+    # An entry larger than the whole budget is never stored
+    lru.put('e', 'E', size=11)
+    assert lru.get('e') is None and lru.get('d') == 'D'
+
+
+def test_new_ratio_reuses_the_analysis_and_repeat_hits_the_summary_layer():
+    summaries = SummaryCache(max_entries=8, max_bytes=1 << 20, ttl=60)
+    first = summaries.summarize(TEXT, 40, 'normal')
+    analysis = summaries.analyses.get(next(iter(summaries.analyses.entries)))
+
+    other = summaries.summarize(TEXT, 80, 'normal')
+    assert other['sentence_count_summary'] > first['sentence_count_summary']
+    assert summaries.get_stats()['analysis']['entries'] == 1
+    assert summaries.analyses.get(next(iter(summaries.analyses.entries))) is analysis
+
+    again = summaries.summarize(TEXT, 40, 'normal')
+    assert again == first
+    # Callers get a copy, so changing a result cannot corrupt the cache
+    again['keywords'].append('mutated')
+    assert summaries.summarize(TEXT, 40, 'normal') == first
+    assert summaries.get_stats()['summary']['hits'] == 2
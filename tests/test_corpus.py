@@ -0,0 +1,67 @@
+import pytest
+
+from corpus_index import CorpusIndex
+
+ADMIN = {'Authorization': 'Bearer secret'}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return CorpusIndex(str(tmp_path / 'corpus.db'), str(tmp_path / 'corpus_idf.bin'))
+
+
+def test_deleting_a_document_updates_the_idf(index):
+    index.add([('q1', 'Revenue grew strongly this quarter.'),
+               ('q2', 'Revenue fell after the merger.'),
+               ('hr', 'Hiring slowed across the company.')])
+    idf = index.idf()
+    assert idf.documents == 3
+    assert idf.document_frequency('revenue') == 2
+
+    assert index.delete('q1')
+    idf = index.idf()
+    assert idf.documents == 2
+    assert idf.document_frequency('revenue') == 1
+    assert idf.document_frequency('strongly') == 0
+    assert not index.delete('q1')
+
+
+def test_search_ranks_documents_by_the_query_words(index):
+    index.add([('a', 'Margins improved. Margins widened again in Europe.'),
+               ('b', 'Margins held steady while revenue grew.'),
+               ('c', 'The office moved downtown.')])
+    results = index.search('margins')
+    assert [result['id'] for result in results] == ['a', 'b']
+    # Replacing a document reindexes it
+    index.add([('a', 'The office opened a cafeteria.')])
+    assert [result['id'] for result in index.search('margins')] == ['b']
+
+
+def test_corpus_endpoints_add_search_and_delete(monkeypatch):
+    import app as webapp
+
+    monkeypatch.setattr(webapp, 'ADMIN_TOKEN', 'secret')
+    client = webapp.app.test_client()
+    document = {'id': 'endpoint-doc', 'text': 'Quarterly dividends rose for shareholders.'}
+
+    assert client.post('/api/corpus/documents', json=document).status_code == 401
+    assert client.delete('/api/corpus/documents/endpoint-doc').status_code == 401
+    response = client.post('/api/corpus/documents', json=document, headers=ADMIN)
+    assert response.status_code == 201 and response.get_json()['ids'] == ['endpoint-doc']
+
+    results = client.get('/api/corpus/search?q=dividends').get_json()['results']
+    assert [result['id'] for result in results] == ['endpoint-doc']
+
+    assert client.delete('/api/corpus/documents/endpoint-doc', headers=ADMIN).status_code == 200
+    assert client.get('/api/corpus/search?q=dividends').get_json()['results'] == []
+    assert client.delete('/api/corpus/documents/endpoint-doc', headers=ADMIN).status_code == 404
+
+
+@pytest.mark.parametrize('options', [{'max_sentences': 'abc'}, {'max_sentences': None},
+                                     {'max_sentences': [3]}, {'ratio': 'high'}])
+def test_corpus_summary_rejects_malformed_options(options):
+    import app as webapp
+
+    response = webapp.app.test_client().post('/api/corpus/summarize', json={'ids': ['any'], **options})
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
@@ -0,0 +1,50 @@
+import pytest
+
+import app as webapp
+from summarizer import BUSINESS_FEATURES
+
+TEXT = ('Revenue grew 12% to $4.2M this quarter. The office moved to a new floor. '
+        'We achieved record market share in Europe. Lunch was served at noon. '
+        'Profit margins improved after the cost review. The weather stayed mild all week.')
+
+
+@pytest.fixture
+def client():
+    return webapp.app.test_client()
+
+
+def explain(client, **body):
+    return client.post('/api/summarize/explain', json=body)
+
+
+def test_scores_are_the_weighted_features_and_match_business_insights(client):
+    result = explain(client, text=TEXT, ratio=50).get_json()
+    assert result['success'] and result['feature_names'] == list(BUSINESS_FEATURES)
+    weights = [result['weights'][name] for name in result['feature_names']]
+    for sentence in result['sentences']:
+        expected = sum(value * weight for value, weight in zip(sentence['features'], weights))
+        assert sentence['score'] == pytest.approx(expected)
+        assert sentence['selected'] == (sentence['index'] in result['selected'])
+
+    summary = client.post('/api/summarize', json={
+        'text': TEXT, 'ratio': 50, 'method': 'business_insights'}).get_json()
+    assert result['summary'] == summary['summary']
+
+
+def test_analysis_id_re_ranks_with_other_weights(client):
+    first = explain(client, text=TEXT, ratio=50).get_json()
+    # Only position counts: the opening sentences win
+    weights = {name: 0 for name in first['feature_names']}
+    weights['position'] = 1
+    again = explain(client, analysis_id=first['analysis_id'], ratio=50, weights=weights).get_json()
+    assert again['success'] and again['analysis_id'] == first['analysis_id']
+    assert again['selected'] == [0, 1, 2]
+    assert again['weights']['frequency'] == 0
+
+
+def test_unknown_analysis_and_bad_weights_are_rejected(client):
+    assert explain(client, analysis_id='0' * 32).status_code == 404
+    assert explain(client, text=TEXT, weights={'novelty': 1}).status_code == 400
+    assert explain(client, text=TEXT, weights={'position': 'high'}).status_code == 400
+    assert explain(client, text=TEXT, weights=[1, 2]).status_code == 400
+
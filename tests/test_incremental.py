@@ -0,0 +1,52 @@
+import pytest
+
+from cache import CachedAnalysis, KEYWORD_CACHE_DEPTH
+from incremental import DocumentRevision
+from summarizer import AnalyzedDocument, normalize_text
+
+TEXT = normalize_text(
+    'Revenue grew 12% in Q3. Mr. Smith said the team shipped two products. '
+    'Costs fell after the restructuring. The board approved a dividend. '
+    'Customers renewed at record rates. Margins improved in every region. '
+    'The outlook for next year remains strong.'
+)
+
+EDITS = [
+    # Insert a sentence in the middle
+    TEXT.replace('Costs fell', 'Cash flow doubled. Costs fell'),
+    # Delete a sentence
+    TEXT.replace('The board approved a dividend. ', ''),
+    # Drop a period, merging two sentences
+    TEXT.replace('restructuring. The', 'restructuring the'),
+    # Append at the end and prepend at the start
+    TEXT + ' Hiring will resume in March.',
+    'Summary first. ' + TEXT,
+]
+
+
+def assert_matches_full_analysis(revision, text, tokenizer):
+    doc = AnalyzedDocument(text, tokenizer=tokenizer)
+    full = CachedAnalysis(doc)
+    assert revision.sentences == list(doc.sentences)
+    assert revision.content_tokens == list(doc.content_tokens)
+    for method in ('normal', 'business_insights'):
+        assert revision.score(method) == full.scores[method]
+    assert revision.keywords == full.keywords
+    assert revision.readability == full.readability
+
+
+@pytest.mark.parametrize('tokenizer', ['nltk', 'regex'])
+@pytest.mark.parametrize('edited', EDITS)
+def test_revision_matches_a_full_analysis(edited, tokenizer):
+    original = DocumentRevision(TEXT, tokenizer, KEYWORD_CACHE_DEPTH)
+    revision = original.revise(normalize_text(edited))
+    assert_matches_full_analysis(revision, normalize_text(edited), tokenizer)
+    # The previous revision is left as it was
+    assert_matches_full_analysis(original, TEXT, tokenizer)
+
+
+def test_unchanged_sentences_are_not_tokenized_again():
+    original = DocumentRevision(TEXT, 'nltk', KEYWORD_CACHE_DEPTH)
+    revision = original.revise(TEXT + ' Hiring will resume in March.')
+    assert revision.records[0] is original.records[0]
+    assert original.revise(TEXT) is original
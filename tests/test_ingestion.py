@@ -0,0 +1,83 @@
+import io
+import zipfile
+
+import pytest
+
+from ingestion import DocumentReader, UnsupportedDocumentError
+
+W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+
+
+def docx(*paragraphs):
+    body = ''.join(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>' for text in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('word/document.xml',
+                         f'<w:document xmlns:w="{W}"><w:body>{body}</w:body></w:document>')
+    buffer.seek(0)
+    return buffer
+
+
+def pdf(*pages):
+    """A minimal PDF with one line of Helvetica text per page"""
+    n = len(pages)
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>',
+               '<< /Type /Pages /Kids [%s] /Count %d >>' % (
+                   ' '.join(f'{4 + 2 * i} 0 R' for i in range(n)), n),
+               '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    for i, text in enumerate(pages):
+        stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'
+        objects.append('<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>')
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream')
+    out = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{body}\nendobj\n'.encode('latin-1')
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('latin-1')
+    out += b''.join(f'{offset:010d} 00000 n \n'.encode('latin-1') for offset in offsets)
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode(
+        'latin-1')
+    return io.BytesIO(out)
+
+
+def test_docx_is_read_a_paragraph_at_a_time():
+    reader = DocumentReader(docx('Revenue grew 12%.', 'Costs fell.'), 'report.docx')
+    assert list(reader) == ['Revenue grew 12%.\n', 'Costs fell.\n']
+    assert reader.info()['format'] == 'docx' and reader.info()['paragraphs'] == 2
+
+
+def test_pdf_is_read_a_page_at_a_time():
+    pytest.importorskip('pypdf')
+    reader = DocumentReader(pdf('Revenue grew this quarter.', 'Costs fell.'), 'upload')
+    pages = list(reader)
+    assert [page.strip() for page in pages] == ['Revenue grew this quarter.', 'Costs fell.']
+    assert reader.info()['pages'] == 2
+
+
+def test_format_comes_from_content_before_extension():
+    assert DocumentReader(io.BytesIO('Plain text.'.encode()), 'notes.txt').format == 'txt'
+    # A PDF named .txt is still a PDF
+    assert DocumentReader(pdf('Text.'), 'notes.txt').format == 'pdf'
+    with pytest.raises(ValueError):
+        DocumentReader(io.BytesIO(b'not a pdf'), 'report.pdf')
+    with pytest.raises(UnsupportedDocumentError):
+        DocumentReader(io.BytesIO(b'\x89PNG\r\n'), 'image.png')
+
+
+def test_upload_endpoint_summarizes_a_docx_and_rejects_other_formats():
+    import app as webapp
+
+    client = webapp.app.test_client()
+    paragraphs = [f'Revenue grew in region {i} after the launch.' for i in range(10)]
+    response = client.post('/api/summarize/upload', data={'file': (docx(*paragraphs), 'report.docx')})
+    assert response.status_code == 200
+    result = response.get_json()
+    assert result['success'] and result['document']['format'] == 'docx'
+    assert result['sentence_count_original'] == 10
+
+    response = client.post('/api/summarize/upload',
+                           data={'file': (io.BytesIO(b'\x89PNG\r\n'), 'image.png')})
+    assert response.status_code == 415
@@ -0,0 +1,30 @@
+import pytest
+
+from jobs import JobStore, JobLostError, COMPLETED, RUNNING
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs.db'))
+
+
+def test_stale_job_is_reclaimed_under_a_new_token(store):
+    job_id = store.create('batch', {'texts': ['a']}, 1)
+    first = store.claim()
+    # A negative staleness makes the running job count as abandoned at once
+    second = store.claim(stale_seconds=-1)
+    assert first['id'] == second['id'] == job_id
+    assert first['claim_token'] != second['claim_token']
+
+    # The first worker has lost the job: it can neither report progress nor finish
+    with pytest.raises(JobLostError):
+        store.progress(job_id, 1, first['claim_token'])
+    assert not store.finish(job_id, COMPLETED, first['claim_token'], result=['stale'])
+    assert store.get(job_id)['status'] == RUNNING
+
+    assert store.progress(job_id, 1, second['claim_token']) is False
+    assert store.finish(job_id, COMPLETED, second['claim_token'], result=['current'])
+    job = store.get(job_id)
+    assert job['status'] == COMPLETED and job['result'] == '["current"]'
+    # A finished job cannot be finished again
+    assert not store.finish(job_id, COMPLETED, second['claim_token'], result=['again'])
@@ -0,0 +1,25 @@
+import pytest
+
+from lexicon import BUSINESS_PHRASE_WEIGHT, count_business_terms
+from tokenization import get_tokenizer
+
+
+def business_terms(sentence, tokenizer='nltk'):
+    return count_business_terms(sentence, get_tokenizer(tokenizer)(sentence))
+
+
+@pytest.mark.parametrize('tokenizer', ['nltk', 'regex'])
+def test_phrase_counts_once(tokenizer):
+    # 'market share' is one term; its word 'market' is not counted again
+    assert business_terms('We gained market share.', tokenizer) == BUSINESS_PHRASE_WEIGHT
+    assert business_terms('Market   Share rose.', tokenizer) == BUSINESS_PHRASE_WEIGHT
+
+
+@pytest.mark.parametrize('tokenizer', ['nltk', 'regex'])
+def test_phrase_outweighs_its_bare_keyword(tokenizer):
+    assert business_terms('We gained market share.', tokenizer) > business_terms('We gained market.', tokenizer)
+
+
+def test_keyword_outside_phrase_still_counts():
+    assert business_terms('The market grew and market share rose.') == 1 + BUSINESS_PHRASE_WEIGHT
+    assert business_terms('Revenue and profit grew.') == 2
@@ -0,0 +1,14 @@
+import pytest
+
+import resources
+
+
+def test_missing_data_fails_without_downloading(monkeypatch):
+    def download(package, download_dir=None):
+        raise AssertionError('downloaded ' + package)
+
+    monkeypatch.setattr(resources, 'NLTK_DOWNLOAD', False)
+    monkeypatch.setattr(resources, 'NLTK_RESOURCES', (('corpora/no_such_corpus', 'no_such_corpus'),))
+    monkeypatch.setattr(resources, 'download', download)
+    with pytest.raises(LookupError, match='no_such_corpus'):
+        resources.ensure_nltk_data()
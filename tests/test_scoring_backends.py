@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+import summarizer
+from summarizer import AnalyzedDocument
+
+vectorized = pytest.importorskip('vectorized', exc_type=ImportError)
+
+WORDS = ['revenue', 'growth', 'market', 'share', 'quarter', 'profit', 'team', 'launch',
+         'customer', 'strategy', 'cost', 'margin', 'product', 'region', 'forecast']
+
+
+def synthetic_text(seed, sentences=40):
+    rng = random.Random(seed)
+    return ' '.join(
+        ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 18))).capitalize() + '.'
+        for _ in range(sentences)
+    )
+
+
+DOCUMENTS = [
+    'Revenue grew 12% in Q3. The team shipped two products. Revenue and margin both improved.',
+    # Repeated sentences give exactly tied scores, whose order must agree too
+    'Costs fell. Costs fell. Profit rose sharply this quarter. Costs fell.',
+    # Quotients that round when summed (0.1 + 0.2) must round the same way in both
+    'Alpha and beta. Beta and gamma. ' + 'Gamma rose. ' * 9,
+] + [synthetic_text(seed) for seed in range(5)]
+
+
+@pytest.fixture(params=DOCUMENTS)
+def doc(request, monkeypatch):
+    monkeypatch.setattr(summarizer, 'SCORING_BACKEND', 'python')
+    return AnalyzedDocument(request.param)
+
+
+def test_frequency_scores_agree(doc):
+    assert summarizer.calculate_frequency_scores(doc) == vectorized.frequency_scores(doc)
+
+
+def test_tfidf_scores_agree(doc):
+    assert summarizer.calculate_tfidf_scores(doc) == vectorized.tfidf_scores(doc)
+
+
+def test_keywords_agree(doc):
+    assert summarizer.extract_keywords(doc, 10) == vectorized.extract_keywords(doc, 10)
+
+
+def test_summaries_agree(doc, monkeypatch):
+    python_summary = summarizer.generate_summary(doc.text, 40, 'normal', doc=doc)
+    monkeypatch.setattr(summarizer, 'SCORING_BACKEND', 'numpy')
+    monkeypatch.setattr(summarizer, 'vectorized', vectorized, raising=False)
+    assert summarizer.generate_summary(doc.text, 40, 'normal', doc=doc) == python_summary
@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+from streaming import iter_text_chunks
+
+
+def ndjson(*lines):
+    return io.BytesIO('\n'.join(lines).encode('utf-8'))
+
+
+def test_ndjson_records_yield_their_text():
+    chunks = iter_text_chunks(ndjson('{"text": "First part."}', '"Second part."', ''), ndjson=True)
+    assert list(chunks) == ['First part.\n', 'Second part.\n']
+
+
+def test_ndjson_lines_split_across_reads_are_joined():
+    body = ndjson('{"text": "First part."}', '{"text": "Second part."}')
+    chunks = iter_text_chunks(body, ndjson=True, chunk_bytes=5)
+    assert list(chunks) == ['First part.\n', 'Second part.\n']
+
+
+def test_ndjson_line_over_the_cap_is_rejected_before_it_ends():
+    class Endless(io.RawIOBase):
+        reads = 0
+
+        def read(self, size=-1):
+            self.reads += 1
+            return b'{"text": "' + b'a' * (size - 10)
+
+    body = Endless()
+    with pytest.raises(ValueError, match='at most 1000 characters'):
+        list(iter_text_chunks(body, ndjson=True, chunk_bytes=100, max_line_chars=1000))
+    assert body.reads == 11
+
+
+@pytest.mark.parametrize('line', ['{"text": 42}', '{"text": ["a", "b"]}', '{"text": null}', '7'])
+def test_ndjson_text_must_be_a_string(line):
+    with pytest.raises(ValueError):
+        list(iter_text_chunks(ndjson('{"text": "Fine."}', line), ndjson=True))
+
+
+def test_stream_endpoint_rejects_non_string_text():
+    import app as webapp
+
+    response = webapp.app.test_client().post(
+        '/api/summarize/stream', data=b'{"text": "One sentence here."}\n{"text": 5}\n',
+        content_type='application/x-ndjson')
+    assert response.status_code == 400
+    assert response.get_json()['success'] is False
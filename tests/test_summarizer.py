@@ -0,0 +1,38 @@
+import summarizer
+from summarizer import AnalyzedDocument
+
+
+def test_sentence_final_period_is_a_separate_token():
+    # Each sentence is tokenized on its own. Counting words over the sentences joined
+    # and lowercased ("... in 2028. it was ...") left the period attached as '2028.'
+    doc = AnalyzedDocument('The plan ends in 2028. It was approved by the board.', tokenizer='nltk')
+    assert list(doc.sentence_tokens) == [
+        ['the', 'plan', 'ends', 'in', '2028', '.'],
+        ['it', 'was', 'approved', 'by', 'the', 'board', '.'],
+    ]
+    assert doc.term_counts['2028'] == 1
+    assert '2028.' not in doc.term_counts
+
+
+def test_frequency_scores_sum_each_words_normalized_frequency():
+    # Word counts are divided by the top count before summing, as releases always did;
+    # summing counts and dividing once rounds differently and reorders near-ties
+    doc = AnalyzedDocument('Alpha and beta. Beta and gamma. ' + 'Gamma rose. ' * 9, tokenizer='nltk')
+    word_freq = {word: count / max(doc.term_counts.values()) for word, count in doc.term_counts.items()}
+    expected = {}
+    for i, words in enumerate(doc.content_tokens):
+        expected[i] = 0
+        for word in words:
+            expected[i] += word_freq[word]
+    assert summarizer.calculate_frequency_scores(doc) == expected
+    # gamma is the top word with 10 occurrences: 0.1 + 0.2 is not 0.3 in floating point
+    assert doc.term_counts['gamma'] == 10
+    assert expected[0] == 0.1 + 0.2 != 3 / 10
+
+
+def test_ranked_keys_match_top_k_and_are_produced_lazily():
+    scores = {0: 1.0, 1: 3.0, 2: 1.0, 3: 2.0, 4: 3.0, 5: 0.5}
+    assert list(summarizer.ranked_keys(scores)) == summarizer.top_k(scores, len(scores))
+    assert list(summarizer.ranked_keys(scores)) == [1, 4, 3, 0, 2, 5]
+    ranked = summarizer.ranked_keys(scores)
+    assert [next(ranked), next(ranked)] == [1, 4]
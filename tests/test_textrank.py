@@ -0,0 +1,68 @@
+import pytest
+
+from textrank import DAMPING, pagerank, similarity_graph, textrank_scores
+
+
+def dense_pagerank(graph, iterations=200):
+    """Textbook power iteration over the full matrix, with dangling rank spread evenly"""
+    n = len(graph)
+    out_weights = [sum(edges.values()) for edges in graph]
+    ranks = [1.0 / n] * n
+    for _ in range(iterations):
+        dangling = sum(ranks[j] for j in range(n) if not out_weights[j])
+        ranks = [(1 - DAMPING) / n + DAMPING * dangling / n +
+                 DAMPING * sum(ranks[j] * graph[j].get(i, 0) / out_weights[j]
+                               for j in range(n) if out_weights[j])
+                 for i in range(n)]
+    return ranks
+
+
+def test_pagerank_matches_dense_power_iteration():
+    graph = [{1: 0.5, 2: 0.2}, {0: 0.5, 2: 0.9}, {0: 0.2, 1: 0.9}, {}]
+    ranks = pagerank(graph, tolerance=1e-12, max_iterations=200)
+    assert sum(ranks) == pytest.approx(1)
+    assert ranks == pytest.approx(dense_pagerank(graph), abs=1e-9)
+
+
+def test_sentence_sharing_words_with_every_other_ranks_first():
+    content_tokens = [
+        ['revenue', 'growth', 'margin', 'customers'],
+        ['revenue', 'rose'],
+        ['growth', 'slowed'],
+        ['margin', 'improved'],
+        ['customers', 'renewed'],
+        ['weather', 'mild'],
+    ]
+    doc_freq = {}
+    for words in content_tokens:
+        for word in set(words):
+            doc_freq[word] = doc_freq.get(word, 0) + 1
+    scores = textrank_scores(content_tokens, doc_freq)
+
+    assert max(scores, key=scores.get) == 0
+    # The unlinked sentence gets only the base rank
+    assert min(scores, key=scores.get) == 5
+    assert sum(scores.values()) / len(scores) == pytest.approx(1)
+
+
+def test_graph_drops_weak_links_and_stays_symmetric():
+    vectors = [{'a': 1.0}] + [{'a': 0.6, f'w{i}': 0.8} for i in range(5)]
+    # Sentences 1-5 are 0.36 similar to each other, below the threshold
+    graph = similarity_graph(vectors, neighbors=2, min_similarity=0.5)
+    # Sentence 0 keeps its 2 best links, but every sentence that chose it links back
+    assert sorted(graph[0]) == [1, 2, 3, 4, 5]
+    for i in range(1, 6):
+        assert graph[i] == {0: pytest.approx(0.6)}
+
+
+def test_textrank_summary_through_the_api():
+    import app as webapp
+
+    text = ' '.join(f'Revenue grew in region {i} after the product launch.' for i in range(6))
+    text += ' The weather was mild.'
+    response = webapp.app.test_client().post(
+        '/api/summarize', json={'text': text, 'ratio': 30, 'method': 'textrank'})
+    result = response.get_json()
+    assert response.status_code == 200 and result['success']
+    assert result['method'] == 'textrank'
+    assert 'weather' not in result['summary']